@@ -0,0 +1,468 @@
+"""
+Load test the REST handler in-process with API Gateway REST events.
+
+`seed` loads generated customers, uploads and transaction rollups into the
+local Postgres, and writes the transaction files to a local stand-in of the
+banks bucket: a directory with its {year}/{bank}.parquet layout, which the
+reports read through ANALYTICS_DATASET. `run` replays a mix of GET /customers
+with various filters, GET /customers/<customer_id>, GET /uploads and
+GET /reports/banks events against rest_handler.main.handler across worker
+processes, each importing the handler once like a Lambda container, and
+reports the throughput and the latency percentiles of each route. Its results
+can be saved as a baseline, and later runs compared against it. Run from the
+repository root with the DATABASE_* environment variables set:
+
+    python benchmarks/load_test.py seed --customers 2000
+    python benchmarks/load_test.py run --requests 5000 --save-baseline benchmarks/baseline.json
+    python benchmarks/load_test.py run --requests 5000 --baseline benchmarks/baseline.json
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import statistics
+import sys
+import time
+import uuid
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+ROOT = Path(__file__).parents[1]
+HANDLER_DIR = ROOT / "oysirs/api/functions/rest_handler"
+INTERNAL_SRC = ROOT / "oysirs/shared/layers/python_sdk/internal/src"
+
+DEFAULT_DATASET = "/tmp/oysirs-load-test/banks"
+BANKS = ["access", "first-bank", "gtbank", "uba", "zenith"]
+FIRST_NAMES = ["Adebayo", "Chiamaka", "Emeka", "Fatima", "Funmilayo", "Ibrahim", "Kemi", "Ngozi", "Olumide", "Tunde", "Yetunde", "Zainab"]
+LAST_NAMES = ["Adeyemi", "Bello", "Eze", "Ogunleye", "Okafor", "Olawale", "Oyelaran", "Salami", "Usman", "Yusuf"]
+STREETS = ["Ring Road", "Bodija Road", "Iwo Road", "Dugbe Market Road", "Challenge Road", "Agodi Gate"]
+
+# Share of each route in the replayed requests
+ROUTE_WEIGHTS = {
+    "GET /customers": 0.35,
+    "GET /customers/<customer_id>": 0.40,
+    "GET /uploads": 0.15,
+    "GET /reports/banks": 0.10,
+}
+# Latency percentiles reported and compared against the baseline
+PERCENTILES = (50, 95, 99)
+
+
+class LambdaContext:
+    function_name = "rest-handler-load-test"
+    memory_limit_in_mb = 512
+    invoked_function_arn = "arn:aws:lambda:af-south-1:000000000000:function:rest-handler-load-test"
+    aws_request_id = ""
+
+
+def setup_environment(dataset: str, no_cache: bool = False, threads: int = 1) -> None:
+    """
+    Set the environment the handler reads on import, then make it importable.
+    """
+    os.environ.setdefault("AWS_REGION", "af-south-1")
+    os.environ.setdefault("POWERTOOLS_LOG_LEVEL", "WARNING")
+    os.environ.setdefault("BANKS_BUCKET_NAME", "banks")
+    os.environ["ANALYTICS_DATASET"] = dataset
+    if no_cache:
+        os.environ["CUSTOMER_CACHE_TTL_SECONDS"] = "0"
+        os.environ["REPORT_CACHE_TTL_SECONDS"] = "0"
+    if threads > 1:
+        # The async path runs on one event loop per container, which threads cannot share
+        os.environ["DATABASE_ASYNC"] = "false"
+    for path in (str(HANDLER_DIR), str(INTERNAL_SRC)):
+        if path not in sys.path:
+            sys.path.insert(0, path)
+
+
+# --- Data generator ---
+
+def generate_customer(idx: int, rng: random.Random) -> dict:
+    """
+    Generate the identifiers of a customer, the same ones for the same index,
+    so seeding again updates the customers instead of adding new ones.
+    """
+    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    customer = {
+        "name": f"{first} {last}",
+        "email": f"{first}.{last}.{idx}@example.com".lower(),
+        "mobile_no": f"080{idx:08d}",
+        "address": f"{rng.randint(1, 200)} {rng.choice(STREETS)}, Ibadan",
+        "tin": None,
+        "rc": None,
+    }
+    if rng.random() < 0.6:
+        customer["tin"] = f"{10_000_000 + idx}-0001"
+    if rng.random() < 0.2:
+        customer["rc"] = f"RC{100_000 + idx}"
+    return customer
+
+def generate_transactions(customer_ids: list[int], year: int, rng: random.Random):
+    """
+    Generate the transactions of a bank for a year, for about half the customers.
+    """
+    import pandas as pd
+
+    rows = []
+    start = date(year, 1, 1)
+    for customer_id in customer_ids:
+        if rng.random() < 0.5:
+            continue
+        for _ in range(rng.randint(1, 24)):
+            rows.append((
+                customer_id,
+                round(rng.lognormvariate(10, 1.5), 2),
+                datetime.combine(start + timedelta(days=rng.randrange(365)), datetime.min.time()),
+            ))
+    return pd.DataFrame(rows, columns=["CUSTOMER_ID", "TRXN_AMOUNT", "TRXN_DATE"])
+
+def seed(args: argparse.Namespace) -> None:
+    setup_environment(args.dataset)
+    import pandas as pd
+    from internal.database.helpers.customer import insert_or_update_customer, resolve_customer_id
+    from internal.database.helpers.transaction import refresh_leaderboards, replace_trxn_monthly, replace_trxn_summaries
+    from internal.database.helpers.upload import insert_or_update_upload
+    from internal.database.models.customer import (
+        CustomerAddressModel, CustomerEmailModel, CustomerMobileNoModel, CustomerModel,
+        CustomerNameModel, CustomerRcModel, CustomerTinModel,
+    )
+    from internal.database.models.transaction import TransactionMonthlyRollupModel, TransactionRollupModel
+    from internal.database.models.upload import UploadModel, UploadStatus
+
+    rng = random.Random(args.seed)
+    started_at = time.perf_counter()
+    customers = []
+    for idx in range(args.customers):
+        customer = generate_customer(idx, rng)
+        tins = [customer["tin"]] if customer["tin"] else []
+        rcs = [customer["rc"]] if customer["rc"] else []
+        customer_id = resolve_customer_id(
+            emails=[customer["email"]],
+            mobile_nos=[customer["mobile_no"]],
+            tax_ids=[],
+            tins=tins,
+            rcs=rcs,
+        )
+        customer_id = insert_or_update_customer(CustomerModel(
+            id=customer_id,
+            names=[CustomerNameModel(name=customer["name"])],
+            emails=[CustomerEmailModel(email=customer["email"])],
+            mobiles=[CustomerMobileNoModel(mobile_no=customer["mobile_no"])],
+            addresses=[CustomerAddressModel(address=customer["address"])],
+            tax_ids=[],
+            tins=[CustomerTinModel(tin=tin) for tin in tins],
+            rcs=[CustomerRcModel(rc=rc) for rc in rcs],
+        ))
+        customers.append({"id": customer_id, **customer})
+    print(f"Seeded {len(customers)} customers in {time.perf_counter() - started_at:.1f} s")
+
+    customer_ids = [customer["id"] for customer in customers]
+    for year in args.years:
+        for bank in BANKS:
+            # Laid out and sorted like the files of the processor
+            df = generate_transactions(customer_ids, year, rng).sort_values("CUSTOMER_ID", kind="stable")
+            path = Path(args.dataset) / str(year) / f"{bank}.parquet"
+            path.parent.mkdir(parents=True, exist_ok=True)
+            df.to_parquet(path, engine="fastparquet", row_group_offsets=50_000)
+
+            rollups = df.groupby("CUSTOMER_ID").agg(
+                total_trxns=("TRXN_AMOUNT", "size"),
+                total_amount=("TRXN_AMOUNT", "sum"),
+            ).reset_index()
+            replace_trxn_summaries(year=year, bank=bank, rollups=[
+                TransactionRollupModel(customer_id=row.CUSTOMER_ID, total_trxns=row.total_trxns, total_amount=row.total_amount)
+                for row in rollups.itertuples(index=False)
+            ])
+            refresh_leaderboards(year=year, bank=bank)
+            monthly = df.assign(MONTH=pd.to_datetime(df["TRXN_DATE"]).dt.to_period("M").dt.start_time).groupby(["CUSTOMER_ID", "MONTH"]).agg(
+                total_trxns=("TRXN_AMOUNT", "size"),
+                total_amount=("TRXN_AMOUNT", "sum"),
+            ).reset_index()
+            replace_trxn_monthly(year=year, bank=bank, rollups=[
+                TransactionMonthlyRollupModel(
+                    customer_id=row.CUSTOMER_ID,
+                    month=row.MONTH.date(),
+                    total_trxns=row.total_trxns,
+                    total_amount=row.total_amount,
+                )
+                for row in monthly.itertuples(index=False)
+            ])
+            insert_or_update_upload(UploadModel(
+                year=year,
+                bank=bank,
+                status=UploadStatus.COMPLETED,
+                progress=100,
+                message="Seeded by the load test",
+            ))
+            print(f"Seeded {len(df)} transactions of {year}/{bank}")
+
+    manifest = {"years": args.years, "banks": BANKS, "customers": customers}
+    (Path(args.dataset) / "manifest.json").write_text(json.dumps(manifest))
+    print(f"Seeded in {time.perf_counter() - started_at:.1f} s, manifest in {args.dataset}/manifest.json")
+
+
+# --- Events ---
+
+def make_event(method: str, path: str, query: dict | None = None, headers: dict | None = None) -> dict:
+    """
+    Build an API Gateway REST proxy event, as sent for a request authorized by the Cognito authorizer.
+    """
+    query = {key: str(value) for key, value in (query or {}).items()}
+    headers = {
+        "Accept": "application/json",
+        "Authorization": "Bearer load-test",
+        "Host": "api.example.com",
+        "User-Agent": "oysirs-load-test",
+        "X-Forwarded-Proto": "https",
+        **(headers or {}),
+    }
+    request_id = str(uuid.uuid4())
+    return {
+        "resource": "/{proxy+}",
+        "path": path,
+        "httpMethod": method,
+        "headers": headers,
+        "multiValueHeaders": {key: [value] for key, value in headers.items()},
+        "queryStringParameters": query or None,
+        "multiValueQueryStringParameters": {key: [value] for key, value in query.items()} or None,
+        "pathParameters": {"proxy": path.lstrip("/")},
+        "stageVariables": None,
+        "requestContext": {
+            "resourcePath": "/{proxy+}",
+            "httpMethod": method,
+            "path": f"/prod{path}",
+            "stage": "prod",
+            "requestId": request_id,
+            "accountId": "000000000000",
+            "apiId": "loadtest",
+            "protocol": "HTTP/1.1",
+            "requestTimeEpoch": int(time.time() * 1000),
+            "identity": {"sourceIp": "127.0.0.1", "userAgent": headers["User-Agent"]},
+            "authorizer": {"claims": {"sub": "load-test", "cognito:groups": "[staff]", "token_use": "id"}},
+        },
+        "body": None,
+        "isBase64Encoded": False,
+    }
+
+def generate_requests(manifest: dict, count: int, rng: random.Random) -> list[tuple[str, dict]]:
+    """
+    Generate the (route, event) requests of a run, mixed by ROUTE_WEIGHTS.
+    """
+    customers, years, banks = manifest["customers"], manifest["years"], manifest["banks"]
+    # Only 60% of the customers have a TIN, the TIN filter looks up one of them
+    tins = [customer["tin"] for customer in customers if customer["tin"]]
+    routes = rng.choices(list(ROUTE_WEIGHTS), weights=list(ROUTE_WEIGHTS.values()), k=count)
+    requests = []
+    for route in routes:
+        customer = rng.choice(customers)
+        if route == "GET /customers":
+            limit = rng.choice([10, 20, 50])
+            queries = [
+                {"offset": rng.randrange(0, max(1, len(customers) - limit)), "limit": limit},
+                {"name": customer["name"].split()[-1], "limit": limit},
+                {"email": customer["email"]},
+                {"mobile_no": customer["mobile_no"]},
+            ]
+            if tins:
+                queries.append({"tin": rng.choice(tins)})
+            query = rng.choice(queries)
+            event = make_event("GET", "/customers", query)
+        elif route == "GET /customers/<customer_id>":
+            query = {"year": rng.choice(years)}
+            if rng.random() < 0.3:
+                query["bank"] = rng.choice(banks)
+            event = make_event("GET", f"/customers/{customer['id']}", query)
+        elif route == "GET /uploads":
+            query = rng.choice([{}, {"year": rng.choice(years)}, {"status": "completed", "limit": 20}])
+            event = make_event("GET", "/uploads", query)
+        else:
+            event = make_event("GET", "/reports/banks", {"year": rng.choice(years)})
+        requests.append((route, event))
+    return requests
+
+
+# --- Workers ---
+
+def init_worker(dataset: str, no_cache: bool, threads: int) -> None:
+    # The handler is imported before the run, so cold starts are not measured
+    setup_environment(dataset, no_cache=no_cache, threads=threads)
+    import main  # noqa: F401
+
+def run_worker(requests: list[tuple[str, dict]], warmup: int, threads: int) -> dict:
+    """
+    Send requests to the handler of this process, and time them.
+
+    Returns:
+        dict: The latencies and errors by route, and the wall clock bounds of the measured requests.
+    """
+    import main
+
+    latencies, errors = defaultdict(list), Counter()
+
+    def send(request: tuple[str, dict]) -> tuple[str, float, int]:
+        route, event = request
+        started_at = time.perf_counter()
+        response = main.handler(event, LambdaContext())
+        return route, time.perf_counter() - started_at, response["statusCode"]
+
+    for request in requests[:warmup]:
+        send(request)
+    started_at = time.time()
+    if threads > 1:
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            results = list(executor.map(send, requests[warmup:]))
+    else:
+        results = [send(request) for request in requests[warmup:]]
+    finished_at = time.time()
+
+    for route, latency, status_code in results:
+        latencies[route].append(latency)
+        if status_code >= 400:
+            errors[route] += 1
+    return {"latencies": dict(latencies), "errors": dict(errors), "started_at": started_at, "finished_at": finished_at}
+
+
+# --- Results ---
+
+def summarize(results: list[dict]) -> dict:
+    """
+    Merge the results of the workers into the throughput and latency percentiles of each route.
+    """
+    latencies, errors = defaultdict(list), Counter()
+    for result in results:
+        for route, values in result["latencies"].items():
+            latencies[route].extend(values)
+        errors.update(result["errors"])
+    duration = max(r["finished_at"] for r in results) - min(r["started_at"] for r in results)
+
+    def route_summary(values: list[float], route_errors: int) -> dict:
+        quantiles = statistics.quantiles(values, n=100, method="inclusive") if len(values) > 1 else values * 99
+        return {
+            "requests": len(values),
+            "errors": route_errors,
+            "throughput_rps": round(len(values) / duration, 1),
+            **{f"p{p}_ms": round(quantiles[p - 1] * 1000, 2) for p in PERCENTILES},
+        }
+
+    routes = {route: route_summary(values, errors[route]) for route, values in sorted(latencies.items())}
+    routes["all"] = route_summary([v for values in latencies.values() for v in values], sum(errors.values()))
+    return {"duration_s": round(duration, 2), "routes": routes}
+
+def print_summary(summary: dict, baseline: dict | None = None) -> None:
+    columns = ["requests", "errors", "throughput_rps"] + [f"p{p}_ms" for p in PERCENTILES]
+    print(f"{'route':<32}" + "".join(f"{column:>16}" for column in columns))
+    for route, values in summary["routes"].items():
+        print(f"{route:<32}" + "".join(f"{values[column]:>16}" for column in columns))
+        base = (baseline or {}).get("routes", {}).get(route)
+        if base:
+            changes = [f"{change(base[c], values[c]):>+15.1f}%" if c not in ("requests", "errors") else f"{'':>16}" for c in columns]
+            print(f"{'  vs baseline':<32}" + "".join(changes))
+
+def change(base: float, current: float) -> float:
+    return (current - base) / base * 100 if base else 0.0
+
+def compare(summary: dict, baseline: dict, tolerance: float) -> list[str]:
+    """
+    Compare a run with a baseline.
+
+    Args:
+        summary (dict): The summary of the run.
+        baseline (dict): The summary of the baseline run.
+        tolerance (float): The relative slowdown allowed, e.g. 0.2 for 20%.
+    Returns:
+        list[str]: The regressions, empty when the run is within the tolerance.
+    """
+    regressions = []
+    for route, base in baseline["routes"].items():
+        current = summary["routes"].get(route)
+        if current is None:
+            continue
+        for p in PERCENTILES:
+            key = f"p{p}_ms"
+            if current[key] > base[key] * (1 + tolerance):
+                regressions.append(f"{route} {key}: {base[key]} -> {current[key]} ({change(base[key], current[key]):+.1f}%)")
+        if current["throughput_rps"] < base["throughput_rps"] * (1 - tolerance):
+            regressions.append(
+                f"{route} throughput_rps: {base['throughput_rps']} -> {current['throughput_rps']}"
+                f" ({change(base['throughput_rps'], current['throughput_rps']):+.1f}%)"
+            )
+        if current["errors"] > base["errors"]:
+            regressions.append(f"{route} errors: {base['errors']} -> {current['errors']}")
+    return regressions
+
+def run(args: argparse.Namespace) -> int:
+    manifest_path = Path(args.dataset) / "manifest.json"
+    if not manifest_path.exists():
+        raise SystemExit(f"No {manifest_path}, seed the data first")
+    manifest = json.loads(manifest_path.read_text())
+
+    rng = random.Random(args.seed)
+    requests_per_worker = -(-args.requests // args.processes)
+    chunks = [
+        generate_requests(manifest, args.warmup + requests_per_worker, rng)
+        for _ in range(args.processes)
+    ]
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(
+            max_workers=args.processes,
+            mp_context=context,
+            initializer=init_worker,
+            initargs=(args.dataset, args.no_cache, args.threads),
+    ) as executor:
+        results = list(executor.map(run_worker, chunks, [args.warmup] * args.processes, [args.threads] * args.processes))
+
+    config = {key: getattr(args, key) for key in ("requests", "processes", "threads", "warmup", "no_cache", "seed")}
+    summary = {"config": config, "customers": len(manifest["customers"]), **summarize(results)}
+    baseline = json.loads(Path(args.baseline).read_text()) if args.baseline else None
+
+    print(f"{summary['routes']['all']['requests']} requests in {summary['duration_s']} s across "
+          f"{args.processes} processes x {args.threads} threads, {summary['customers']} customers")
+    print_summary(summary, baseline)
+
+    if args.save_baseline:
+        Path(args.save_baseline).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.save_baseline).write_text(json.dumps(summary, indent=2))
+        print(f"Saved the baseline to {args.save_baseline}")
+    if baseline:
+        if baseline.get("config") != config or baseline.get("customers") != summary["customers"]:
+            print(f"Warning: the baseline ran with {baseline.get('config')} and {baseline.get('customers')} customers")
+        regressions = compare(summary, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"Regression: {regression}")
+        if regressions:
+            return 1
+        print(f"Within {args.tolerance:.0%} of the baseline")
+    return 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--dataset", default=DEFAULT_DATASET, help="Local stand-in of the banks bucket")
+    parser.add_argument("--seed", type=int, default=42, help="Seed of the generated data and requests")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    seed_parser = commands.add_parser("seed", help="Generate customers, uploads and transactions")
+    seed_parser.add_argument("--customers", type=int, default=2000)
+    seed_parser.add_argument("--years", type=int, nargs="+", default=[date.today().year - 1, date.today().year])
+
+    run_parser = commands.add_parser("run", help="Replay requests against the handler")
+    run_parser.add_argument("--requests", type=int, default=2000, help="Measured requests, across the processes")
+    run_parser.add_argument("--processes", type=int, default=min(4, os.cpu_count() or 1))
+    run_parser.add_argument("--threads", type=int, default=1, help="Concurrent requests per process, 1 like a Lambda container")
+    run_parser.add_argument("--warmup", type=int, default=50, help="Requests per process before measuring")
+    run_parser.add_argument("--no-cache", action="store_true", help="Disable the customer and report caches")
+    run_parser.add_argument("--baseline", help="Compare with the results saved by --save-baseline")
+    run_parser.add_argument("--save-baseline", help="Save the results as a baseline")
+    run_parser.add_argument("--tolerance", type=float, default=0.2, help="Relative slowdown allowed against the baseline")
+
+    args = parser.parse_args()
+    if args.command == "seed":
+        seed(args)
+    else:
+        sys.exit(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -4,11 +4,7 @@ from aws_lambda_powertools.utilities.data_classes import event_source, S3Event
 from internal.database.helpers.customer import (
     get_customer_by_id,
     list_customers, 
-    get_customer_id_from_emails,
-    get_customer_id_from_mobile_nos,
-    get_customer_id_from_tax_ids,
-    get_customer_id_from_tins,
-    get_customer_id_from_rcs,
+    resolve_customer_id,
     insert_or_update_customer,
 )
 from internal.database.helpers.upload import (
@@ -16,12 +12,30 @@ from internal.database.helpers.upload import (
     list_uploads,
     insert_or_update_upload,
 )
+from internal.database.helpers.transaction import (
+    replace_trxn_summaries,
+    replace_trxn_monthly,
+    refresh_leaderboards,
+)
+from internal.analytics.banks import validate_bank
+from internal.analytics.sketches import (
+    build_sketches,
+    sketches_key,
+)
+from internal.storage.transactions import (
+    transaction_rollups,
+    transaction_monthly_rollups,
+)
+from internal.cache.backends import get_cache
+from internal.cache.tags import upload_tags
 from internal.database.helpers.idx import (
     generate_id
 )
 from internal.database.schemas.base import tz_now
+from internal.database.instrumentation import track_statements
 from internal.database.models.customer import *
 from internal.database.models.upload import *
+from internal.database.models.transaction import *
 import os
 import boto3
 import io
@@ -41,6 +55,8 @@ bucket_name = os.environ['BUCKET_NAME']
 object_key = os.environ['OBJECT_KEY']
 aws_region = os.getenv('AWS_REGION')
 
+ROW_GROUP_SIZE = 50_000
+
 s3_client = boto3.client(
     's3', 
     region_name=aws_region,
@@ -64,6 +80,8 @@ def handler():
     df = pd.read_excel(data)
     customer_ids = []
     try:
+        # The bank is part of the keys written at the end, the upload fails before anything is
+        validate_bank(bank)
         total_rows = len(df)
         progress_step = max(1, total_rows // 10)  # every 10%
         logger.info(f"Progress: 0% (1/{total_rows})")
@@ -76,62 +94,82 @@ def handler():
                 message="Started processing"
             )
         )
-        for idx, row in df.iterrows():
-            emails = parse_email(row.get("EMAIL"))
-            mobile_nos = parse_mobile_no(row.get("MOBILE_NO"))
-            names = parse_name(row.get("NAME"))
-            address = parse_address(row.get("ADDRESS"))
-            tax_ids = parse_name(row.get("TAX_ID"))  # Reuse parse_name for simple string parsing
-            tins = parse_name(row.get("TIN"))
-            rcs = parse_name(row.get("RC"))
-
-            customer_id = get_customer_id_from_emails(emails)
-            if not customer_id:
-                customer_id = get_customer_id_from_mobile_nos(mobile_nos)
-            if not customer_id and tax_ids:
-                customer_id = get_customer_id_from_tax_ids(tax_ids)
-            if not customer_id and tins:
-                customer_id = get_customer_id_from_tins(tins)
-            if not customer_id and rcs:
-                customer_id = get_customer_id_from_rcs(rcs)
-            customer_id = insert_or_update_customer(
-                CustomerModel(
-                    id=customer_id,
-                    names=[CustomerNameModel(name=n) for n in names],
-                    emails=[CustomerEmailModel(email=e) for e in emails],
-                    mobiles=[CustomerMobileNoModel(mobile_no=m) for m in mobile_nos],
-                    addresses=[CustomerAddressModel(address=address)] if address else [],
-                    tax_ids=[CustomerTaxIdModel(tax_id=t) for t in tax_ids],
-                    tins=[CustomerTinModel(tin=t) for t in tins],
-                    rcs=[CustomerRcModel(rc=r) for r in rcs]
-                )
-            )
-            customer_ids.append(customer_id)
-            # --- Progress reporting ---
-            if (idx + 1) % progress_step == 0 or (idx + 1) == total_rows:
-                percent = int(((idx + 1) / total_rows) * 100)
-                logger.info(f"Progress: {percent}% ({idx + 1}/{total_rows})")
-                insert_or_update_upload(
-                    UploadModel(
-                        year=year,
-                        bank=bank,
-                        status=UploadStatus.IN_PROGRESS,
-                        progress=percent,
-                        message=f"Processed {idx + 1} of {total_rows} rows: elapsed { calc_time_diff_mins(start_time, tz_now()) }"
+        for chunk_start in range(0, total_rows, progress_step):
+            chunk = df.iloc[chunk_start:chunk_start + progress_step]
+            # The statements of a chunk are tracked together, repeated ones are logged as possible N+1s
+            with track_statements(f"{object_key} rows {chunk_start + 1}-{chunk_start + len(chunk)}"):
+                for idx, row in chunk.iterrows():
+                    emails = parse_email(row.get("EMAIL"))
+                    mobile_nos = parse_mobile_no(row.get("MOBILE_NO"))
+                    names = parse_name(row.get("NAME"))
+                    address = parse_address(row.get("ADDRESS"))
+                    tax_ids = parse_name(row.get("TAX_ID"))  # Reuse parse_name for simple string parsing
+                    tins = parse_name(row.get("TIN"))
+                    rcs = parse_name(row.get("RC"))
+
+                    customer_id = resolve_customer_id(
+                        emails=emails,
+                        mobile_nos=mobile_nos,
+                        tax_ids=tax_ids,
+                        tins=tins,
+                        rcs=rcs,
                     )
-                )
+                    customer_id = insert_or_update_customer(
+                        CustomerModel(
+                            id=customer_id,
+                            names=[CustomerNameModel(name=n) for n in names],
+                            emails=[CustomerEmailModel(email=e) for e in emails],
+                            mobiles=[CustomerMobileNoModel(mobile_no=m) for m in mobile_nos],
+                            addresses=[CustomerAddressModel(address=address)] if address else [],
+                            tax_ids=[CustomerTaxIdModel(tax_id=t) for t in tax_ids],
+                            tins=[CustomerTinModel(tin=t) for t in tins],
+                            rcs=[CustomerRcModel(rc=r) for r in rcs]
+                        )
+                    )
+                    customer_ids.append(customer_id)
+                    # --- Progress reporting ---
+                    if (idx + 1) % progress_step == 0 or (idx + 1) == total_rows:
+                        percent = int(((idx + 1) / total_rows) * 100)
+                        logger.info(f"Progress: {percent}% ({idx + 1}/{total_rows})")
+                        insert_or_update_upload(
+                            UploadModel(
+                                year=year,
+                                bank=bank,
+                                status=UploadStatus.IN_PROGRESS,
+                                progress=percent,
+                                message=f"Processed {idx + 1} of {total_rows} rows: elapsed { calc_time_diff_mins(start_time, tz_now()) }"
+                            )
+                        )
         
         df['CUSTOMER_ID'] = customer_ids
         df = df[["CUSTOMER_ID", "TRXN_AMOUNT", "TRXN_DATE"]]
+        # Sorted customers give each row group a narrow CUSTOMER_ID range, so readers
+        # can skip every row group but the customer's using the min/max statistics
+        df = df.sort_values("CUSTOMER_ID", kind="stable").reset_index(drop=True)
 
         trxn_data = io.BytesIO()
-        df.to_parquet(trxn_data, engine='fastparquet')
+        df.to_parquet(trxn_data, engine='fastparquet', row_group_offsets=ROW_GROUP_SIZE)
 
         s3_client.put_object(
             Bucket=banks_bucket,
             Key=f"{year}/{bank}.parquet",
             Body=trxn_data.getvalue()
         )
+        # Mergeable distinct-customer and amount sketches, served by GET /reports/sketches
+        s3_client.put_object(
+            Bucket=banks_bucket,
+            Key=sketches_key(year, bank),
+            Body=build_sketches(df["CUSTOMER_ID"].to_numpy(), pd.to_numeric(df["TRXN_AMOUNT"], errors="coerce").to_numpy()),
+        )
+
+        # Per-customer rollups served by GET /customers/<customer_id>
+        total_rollups = replace_trxn_summaries(year=year, bank=bank, rollups=transaction_rollups(df))
+        logger.info(f"Stored {total_rollups} customer transaction rollups for {year}/{bank}")
+        refresh_leaderboards(year=year, bank=bank)
+
+        # Per-customer monthly rollups served by GET /customers/<customer_id>/timeseries
+        total_monthly = replace_trxn_monthly(year=year, bank=bank, rollups=transaction_monthly_rollups(df))
+        logger.info(f"Stored {total_monthly} customer monthly transaction rollups for {year}/{bank}")
 
         s3_client.delete_object(Bucket=bucket_name, Key=object_key)
         logger.info(f"Finished processing file {object_key} from bucket {bucket_name}")
@@ -144,6 +182,11 @@ def handler():
                 message=f"Processing completed: elapsed { calc_time_diff_mins(start_time, tz_now()) }"
             )
         )
+        # The cached customer details and reports of the year are stale from now on
+        try:
+            get_cache().invalidate(*upload_tags(year))
+        except Exception as e:
+            logger.exception(f"Failed to invalidate the cache for {year}/{bank}: {e}")
     except Exception as e:
         logger.exception(f"Error processing file {object_key} from bucket {bucket_name}: {e}")
         insert_or_update_upload(
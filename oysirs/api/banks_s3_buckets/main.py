@@ -49,6 +49,10 @@ class BanksS3Buckets(Construct):
             "BANKS_BUCKET_NAME": self.banks_bucket.bucket_name,
         }
 
+        # The backfill rebuilds the transaction rollups from the files of the banks bucket
+        config['databases'].backfill_lambda.add_environment("BANKS_BUCKET_NAME", self.banks_bucket.bucket_name)
+        self.banks_bucket.grant_read(config['databases'].backfill_lambda)
+
         fargate_security_group = ec2.SecurityGroup(
             self, "FargateTaskSecurityGroup",
             vpc=config['shared'].vpc,
@@ -0,0 +1,65 @@
+from aws_lambda_powertools.utilities.typing import LambdaContext
+from aws_lambda_powertools import Logger, Tracer
+from internal.database.models.export import *
+from internal.database.helpers.export import (
+    get_customer_export,
+    update_customer_export,
+)
+from internal.database.session import read_your_writes
+from internal.storage.exports import write_customers_csv
+import os
+import boto3
+
+
+exports_bucket_name = os.environ['EXPORTS_BUCKET_NAME']
+aws_region = os.getenv('AWS_REGION')
+
+s3_client = boto3.client(
+    's3',
+    region_name=aws_region,
+    endpoint_url=f'https://s3.{aws_region}.amazonaws.com'
+)
+
+logger = Logger()
+tracer = Tracer()
+
+
+@logger.inject_lambda_context
+@tracer.capture_lambda_handler
+def handler(event: dict, context: LambdaContext):
+    export_id = int(event['export_id'])
+    # The export was just created by the API, the replica may not have it yet
+    with read_your_writes():
+        export = get_customer_export(export_id)
+    if not export or export.status != ExportStatus.PENDING:
+        logger.warning(f"Skipping export {export_id}: {export.status if export else 'not found'}")
+        return
+
+    key = f"customers/{export_id}.csv.gz"
+    path = f"/tmp/customers-export-{export_id}.csv.gz"
+    update_customer_export(export_id, ExportStatus.IN_PROGRESS, message="Started exporting")
+    try:
+        # Stage the compressed file on local storage, upload_file then sends it as a multipart upload
+        with open(path, "wb") as f:
+            total_rows = write_customers_csv(export.filters, f)
+        s3_client.upload_file(
+            path,
+            exports_bucket_name,
+            key,
+            ExtraArgs={"ContentType": "application/gzip"},
+        )
+        update_customer_export(
+            export_id,
+            ExportStatus.COMPLETED,
+            total_rows=total_rows,
+            key=key,
+            message=f"Exported {total_rows} customers",
+        )
+        logger.info(f"Exported {total_rows} customers to {exports_bucket_name}/{key}")
+    except Exception as e:
+        logger.exception(f"Error exporting customers for export {export_id}: {e}")
+        update_customer_export(export_id, ExportStatus.FAILED, message=f"Export failed: {str(e)}")
+        raise e
+    finally:
+        if os.path.exists(path):
+            os.remove(path)
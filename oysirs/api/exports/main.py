@@ -0,0 +1,68 @@
+from aws_cdk import (
+    aws_s3 as s3,
+    aws_lambda as _lambda,
+    aws_iam as iam,
+    Duration,
+    Size,
+)
+from constructs import Construct
+from typing import TypedDict
+from pathlib import Path
+
+from oysirs.shared.main import Shared
+from oysirs.databases.main import Databases
+
+
+class ExportsConfig(TypedDict):
+    shared: Shared
+    databases: Databases
+
+
+class Exports(Construct):
+    def __init__(self, scope: Construct, id: str, config: ExportsConfig) -> None:
+        super().__init__(scope, id)
+
+        self.exports_bucket = s3.Bucket(
+            self, "ExportsBucket",
+            bucket_name="oysirs-exports-bucket",
+            removal_policy=config['shared'].removal_policy,
+            auto_delete_objects=True,
+            lifecycle_rules=[
+                # Exports are downloaded through short-lived presigned URLs
+                s3.LifecycleRule(expiration=Duration.days(7)),
+            ],
+        )
+
+        self.customers_export_lambda = _lambda.Function(
+            self, "CustomersExportLambda",
+            description="Worker writing customer search exports to S3",
+            runtime=_lambda.Runtime.PYTHON_3_12,
+            handler="main.handler",
+            code=_lambda.Code.from_asset(
+                path=str((Path(__file__).parent / "functions/customers_export_handler").resolve())
+            ),
+            memory_size=512,
+            ephemeral_storage_size=Size.gibibytes(2),
+            timeout=Duration.minutes(15),
+            retry_attempts=0,
+            environment={
+                **config['shared'].default_env_vars,
+                **config['databases'].env_vars,
+                "EXPORTS_BUCKET_NAME": self.exports_bucket.bucket_name,
+            },
+            layers=[
+                config['shared'].powertools_layer,
+                config['shared'].common_layer,
+                config['shared'].internal_layer,
+            ],
+        )
+        self.exports_bucket.grant_write(self.customers_export_lambda)
+
+        self.env_vars = {
+            "EXPORTS_BUCKET_NAME": self.exports_bucket.bucket_name,
+            "CUSTOMERS_EXPORT_FUNCTION_NAME": self.customers_export_lambda.function_name,
+        }
+
+    def grant_start_and_download(self, identity: iam.IGrantable) -> None:
+        self.customers_export_lambda.grant_invoke(identity)
+        self.exports_bucket.grant_read(identity)
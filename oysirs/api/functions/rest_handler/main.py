@@ -1,11 +1,15 @@
 from aws_lambda_powertools.utilities.typing import LambdaContext
 from aws_lambda_powertools import Logger, Tracer
 from aws_lambda_powertools.event_handler import APIGatewayRestResolver, CORSConfig
+from internal.database.instrumentation import track_statements
 import json
 
 from routes.health import router as health_router
 from routes.customers import router as customers_router
 from routes.uploads import router as uploads_router
+from routes.reports import router as reports_router
+from routes.exports import router as exports_router
+from routes.admin import router as admin_router
 
 
 logger = Logger()
@@ -20,7 +24,9 @@ app = APIGatewayRestResolver(
             "X-Requested-With",
             "Accept",
             "Origin",
-        ]
+            "If-None-Match",
+        ],
+        expose_headers=["ETag"],
     )
 )
 app.enable_swagger(path="/swagger")
@@ -28,6 +34,9 @@ app.enable_swagger(path="/swagger")
 app.include_router(health_router)
 app.include_router(customers_router)
 app.include_router(uploads_router)
+app.include_router(reports_router)
+app.include_router(exports_router)
+app.include_router(admin_router)
 
 
 @logger.inject_lambda_context
@@ -35,7 +44,8 @@ app.include_router(uploads_router)
 def handler(event: dict, context: LambdaContext):
     logger.info("Lambda handler started")
     try:
-        return app.resolve(event, context)
+        with track_statements(f"{event.get('httpMethod')} {event.get('path')}"):
+            return app.resolve(event, context)
     except Exception as e:
         logger.error(f"Error in handler: {e}")
         return {
@@ -0,0 +1,26 @@
+from aws_lambda_powertools.event_handler.api_gateway import Router
+from aws_lambda_powertools import Logger
+from aws_lambda_powertools.event_handler.openapi.params import Query
+from typing import Annotated
+from internal.database.models.slow_query import *
+from internal.database.models.user import UserGroup
+
+from utils.auth import require_group
+
+
+logger = Logger()
+router = Router()
+
+
+@router.get("/admin/slow-queries")
+def list_slow_queries(
+    helper: Annotated[str | None, Query()] = None,
+    limit: Annotated[int, Query(ge=1, le=200)] = 50,
+) -> SlowQueryListModel:
+    """
+    List the slow queries recorded with their plans, the latest first. Only for superusers.
+    """
+    from internal.database.helpers import slow_query
+
+    require_group(router.current_event, UserGroup.SUPERUSER)
+    return slow_query.list_slow_queries(helper=helper, limit=limit)
@@ -1,39 +1,71 @@
 from aws_lambda_powertools.event_handler.api_gateway import Router
+from aws_lambda_powertools.event_handler import Response, content_types
+from aws_lambda_powertools.event_handler.exceptions import BadRequestError
 from aws_lambda_powertools import Logger
 from aws_lambda_powertools.event_handler.openapi.params import Query
 from typing import Annotated
 from internal.database.models.customer import (
-    CustomerModel,
     CustomerListModel,
     CustomerWithStatsModel,
-    TransactionSummaryModel,
+    CustomerLookupModel,
+    CustomerLookupRequestModel,
 )
-from internal.database.helpers.customer import (
-    list_customers as db_list_customers,
-    get_customer_by_id
-)
-import boto3
+from internal.database.models.transaction import TransactionListModel, TransactionTimeseriesListModel
+from utils.aws import get_client
+from utils.http import make_etag, not_modified, json_response
+import threading
+import json
 import os
-import io
-from pathlib import Path
-import pandas as pd
 from datetime import date
 
 
 banks_bucket_name = os.getenv('BANKS_BUCKET_NAME')
-aws_region = os.getenv('AWS_REGION')
+# Upper bound of the IDs and identifiers of a single lookup request
+lookup_max_items = int(os.getenv('CUSTOMER_LOOKUP_MAX_ITEMS', '1000'))
+# Clients revalidate with If-None-Match, customer data is never stored by shared caches
+customer_cache_control = os.getenv('CUSTOMER_CACHE_CONTROL', 'private, no-cache')
+# Serve the customer detail from the async driver, its queries then run concurrently
+async_database = os.getenv('DATABASE_ASYNC', 'false').lower() == 'true'
+# Customer details are shared by the containers through the cache, keyed by their version
+customer_cache_ttl = int(os.getenv('CUSTOMER_CACHE_TTL_SECONDS', '300'))
 
 logger = Logger()
 router = Router()
 
-s3_client = boto3.client(
-    's3', 
-    region_name=aws_region,
-    endpoint_url=f'https://s3.{aws_region}.amazonaws.com'
-)
+# The database helpers and pyarrow are imported by the routes that use them,
+# so they are only loaded on the first request that needs them
+_dataset_cache = None
+_dataset_cache_lock = threading.Lock()
+
+
+def get_dataset_cache():
+    """
+    Get the cache of decoded transaction files, reused across invocations of a warm container.
+    """
+    global _dataset_cache
+    with _dataset_cache_lock:
+        if _dataset_cache is None:
+            from utils.dataset_cache import DatasetCache
 
+            _dataset_cache = DatasetCache(
+                get_client('s3'),
+                directory=os.getenv('DATASET_CACHE_DIR', '/tmp/dataset-cache'),
+                max_memory_bytes=int(os.getenv('DATASET_CACHE_MEMORY_MB', '128')) * 1024 * 1024,
+                max_disk_bytes=int(os.getenv('DATASET_CACHE_DISK_MB', '256')) * 1024 * 1024,
+                max_object_bytes=int(os.getenv('DATASET_CACHE_MAX_OBJECT_MB', '64')) * 1024 * 1024,
+            )
+    return _dataset_cache
 
-@router.get("/customers")
+
+@router.get(
+    "/customers",
+    responses={
+        200: {
+            "description": "Successful Response",
+            "content": {"application/json": {"model": CustomerListModel}},
+        },
+    },
+)
 def list_customers(
     name: Annotated[str | None, Query()] = None,
     email: Annotated[str | None, Query()] = None,
@@ -43,11 +75,14 @@ def list_customers(
     rc: Annotated[str | None, Query()] = None,
     offset: Annotated[int, Query()] = 0,
     limit: Annotated[int, Query()] = 10,
-) -> CustomerListModel:
+) -> Response[str]:
     """
     List customers with optional pagination.
+    The CustomerListModel JSON is assembled by the database and returned as is.
     """
-    customers = db_list_customers(
+    from internal.database.helpers.customer import list_customers_json
+
+    customers = list_customers_json(
         name=name,
         email=email,
         mobile_no=mobile_no,
@@ -57,36 +92,142 @@ def list_customers(
         offset=offset,
         limit=limit,
     )
-    return customers
+    return Response(
+        status_code=200,
+        content_type=content_types.APPLICATION_JSON,
+        body=customers,
+    )
+
+@router.post(
+    "/customers/lookup",
+    responses={
+        200: {
+            "description": "Successful Response",
+            "content": {"application/json": {"model": CustomerLookupModel}},
+        },
+    },
+)
+def lookup_customers(lookup: CustomerLookupRequestModel) -> Response[str]:
+    """
+    Resolve up to CUSTOMER_LOOKUP_MAX_ITEMS customer IDs and identifiers in one request.
+    Customers are returned by ID and each identifier is mapped to its customer ID.
+    """
+    from internal.database.helpers.customer import lookup_customers_json
+
+    total_items = sum(len(values) for values in lookup.model_dump().values())
+    if total_items > lookup_max_items:
+        raise BadRequestError(f"A lookup accepts at most {lookup_max_items} IDs and identifiers, got {total_items}")
+    return Response(
+        status_code=200,
+        content_type=content_types.APPLICATION_JSON,
+        body=lookup_customers_json(lookup),
+    )
 
-@router.get("/customers/<customer_id>")
+@router.get(
+    "/customers/<customer_id>",
+    responses={
+        200: {
+            "description": "Successful Response",
+            "content": {"application/json": {"model": CustomerWithStatsModel}},
+        },
+    },
+)
 def get_customer(
     customer_id: int,
     year: Annotated[int, Query()] = date.today().year,
     bank: Annotated[str, Query()] = "all",
-) -> CustomerWithStatsModel | None:
+) -> Response[str]:
     """
     Get a customer by their ID, including transaction statistics for a given year and bank.
+    The version of the customer is read on every request, requests with its ETag
+    in If-None-Match get a 304, and the customer is cached under that version.
     """
-    customer = get_customer_by_id(customer_id)
+    from internal.cache.backends import get_cache
+    from internal.cache.tags import CUSTOMERS_TAG, transactions_tag
+
+    bank = None if bank.lower() == "all" else bank
+
+    customer = None
+    if async_database:
+        from internal.database.aio import run
+        from internal.database.helpers.customer import get_customer_detail_async
+
+        version, customer = run(get_customer_detail_async(customer_id, year=year, bank=bank))
+    else:
+        from internal.database.helpers.customer import get_customer_version
+
+        version = get_customer_version(customer_id, year=year, bank=bank)
+    if version:
+        etag = make_etag("customer", version)
+        response = not_modified(router.current_event, etag, customer_cache_control)
+        if response:
+            return response
+        if customer is None:
+            from internal.database.helpers.customer import get_customer_with_stats_json
+
+            # Keyed by the version, so an older customer is never served once it
+            # changed, the invalidated tags only evict the superseded versions early
+            customer = get_cache().get_or_set(
+                f"customer:{customer_id}:{year}:{bank or 'all'}:{version}",
+                lambda: get_customer_with_stats_json(customer_id, year=year, bank=bank),
+                ttl=customer_cache_ttl,
+                tags=[CUSTOMERS_TAG, transactions_tag(year)],
+            )
     if not customer:
-        return None, 404
-
-    # Here you would typically fetch the transaction statistics based on the year and bank
-    trxn_summary = []
-    obj_list = s3_client.list_objects_v2(Bucket=banks_bucket_name, Prefix=f"{year}/")
-    for obj in obj_list.get('Contents', []):
-        if (bank.lower() == "all" or f"{bank}" in obj['Key']) and obj['Key'].endswith('.parquet'):
-            trxn_key = obj['Key']
-            bank_name = Path(trxn_key).stem
-            obj = s3_client.get_object(Bucket=banks_bucket_name, Key=trxn_key)
-            trxn_data = io.BytesIO(obj['Body'].read())
-            df = pd.read_parquet(trxn_data)
-            customer_trxns = df[df['CUSTOMER_ID'] == customer_id]
-            trxn_summary.append(TransactionSummaryModel(
-                bank=bank_name,
-                total_trxns=len(customer_trxns),
-                total_amount=float(customer_trxns['TRXN_AMOUNT'].sum()),
-            ))
-
-    return CustomerWithStatsModel(customer=customer, trxn_summary=trxn_summary)
\ No newline at end of file
+        return Response(
+            status_code=404,
+            content_type=content_types.APPLICATION_JSON,
+            body=json.dumps({"message": "Customer not found"}),
+        )
+    return json_response(customer, etag, customer_cache_control)
+
+@router.get("/customers/<customer_id>/transactions")
+def list_transactions(
+    customer_id: int,
+    year: Annotated[int, Query()] = date.today().year,
+    bank: Annotated[str, Query()] = "all",
+    offset: Annotated[int, Query()] = 0,
+    limit: Annotated[int, Query()] = 10,
+) -> TransactionListModel:
+    """
+    List a customer's transactions for a given year and bank, with pagination.
+    Only the files of the banks the customer is present in are opened. Cached
+    transaction files are reused, otherwise only the parquet row groups that
+    can contain the customer are read from S3.
+    """
+    from internal.database.helpers.transaction import get_customer_banks
+    from internal.storage.transactions import list_customer_transactions
+
+    dataset_cache = get_dataset_cache()
+    bank = None if bank.lower() == "all" else bank
+    transactions = list_customer_transactions(
+        banks_bucket_name,
+        customer_id=customer_id,
+        year=year,
+        bank=bank,
+        offset=offset,
+        limit=limit,
+        cache=dataset_cache,
+        banks=None if bank else get_customer_banks(customer_id, year),
+    )
+    logger.info("Dataset cache stats", extra=dataset_cache.stats())
+    return transactions
+
+
+@router.get("/customers/<customer_id>/timeseries")
+def get_timeseries(
+    customer_id: int,
+    year: Annotated[int, Query()] = date.today().year,
+    bank: Annotated[str, Query()] = "all",
+) -> TransactionTimeseriesListModel:
+    """
+    Get a customer's monthly transaction counts and amounts per bank for a given year.
+    Served from the monthly rollups written on upload, the transaction files are not read.
+    """
+    from internal.database.helpers.transaction import get_customer_timeseries
+
+    return get_customer_timeseries(
+        customer_id,
+        year=year,
+        bank=None if bank.lower() == "all" else bank,
+    )
@@ -0,0 +1,58 @@
+from aws_lambda_powertools.event_handler.api_gateway import Router
+from aws_lambda_powertools.event_handler.exceptions import NotFoundError
+from aws_lambda_powertools import Logger
+from internal.database.models.export import *
+from utils.aws import get_client
+import json
+import os
+
+
+exports_bucket_name = os.getenv('EXPORTS_BUCKET_NAME')
+customers_export_function_name = os.getenv('CUSTOMERS_EXPORT_FUNCTION_NAME')
+
+logger = Logger()
+router = Router()
+
+
+@router.post("/exports/customers")
+def start_customers_export(filters: CustomerExportFiltersModel) -> CustomerExportModel:
+    """
+    Start exporting the customers matching the same filters as GET /customers.
+    The export runs in the background, poll it by its ID for the download URL.
+    """
+    from internal.database.helpers.export import create_customer_export
+
+    export = create_customer_export(filters)
+    get_client('lambda').invoke(
+        FunctionName=customers_export_function_name,
+        InvocationType='Event',
+        Payload=json.dumps({"export_id": export.id}),
+    )
+    logger.info(f"Started customers export {export.id}", extra={"filters": export.filters.model_dump()})
+    return export
+
+@router.get("/exports/customers/<export_id>")
+def get_customers_export(export_id: int) -> CustomerExportModel:
+    """
+    Get the status of a customers export, with a presigned download URL once completed.
+    """
+    from internal.database.helpers.export import get_customer_export
+    from internal.database.session import read_your_writes
+
+    export = get_customer_export(export_id)
+    if not export:
+        # Polled right after it was started, the replica may not have it yet
+        with read_your_writes():
+            export = get_customer_export(export_id)
+    if not export:
+        raise NotFoundError("Export not found")
+    if export.status == ExportStatus.COMPLETED and export.key:
+        export.download_url = get_client('s3').generate_presigned_url(
+            'get_object',
+            Params={
+                'Bucket': exports_bucket_name,
+                'Key': export.key,
+            },
+            ExpiresIn=3600  # URL expires in 1 hour
+        )
+    return export
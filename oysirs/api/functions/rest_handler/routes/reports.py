@@ -0,0 +1,160 @@
+from aws_lambda_powertools.event_handler.api_gateway import Router
+from aws_lambda_powertools.event_handler.exceptions import BadRequestError
+from aws_lambda_powertools import Logger
+from aws_lambda_powertools.event_handler.openapi.params import Query
+from typing import Annotated, Callable, TypeVar
+from internal.database.models.report import *
+from pydantic import BaseModel
+import json
+import os
+from datetime import date
+
+
+banks_bucket_name = os.getenv('BANKS_BUCKET_NAME')
+# The banks bucket, or a local directory with the same layout
+analytics_dataset = os.getenv('ANALYTICS_DATASET', f"s3://{banks_bucket_name}")
+# Reports are shared by the containers through the cache, keyed by the version of the uploads of their years
+report_cache_ttl = int(os.getenv('REPORT_CACHE_TTL_SECONDS', '900'))
+
+logger = Logger()
+router = Router()
+
+T = TypeVar("T", bound=BaseModel)
+
+
+def cached_report(model: type[T], name: str, params: dict, years: list[int], compute: Callable[[], T]) -> T:
+    """
+    Get a report from the cache, computing it on a miss. The version of the
+    uploads of its years is read on every request and is part of its key, so
+    a completed upload makes the reports built before it unreachable.
+
+    Args:
+        model (type[T]): The model of the report.
+        name (str): The name of the report.
+        params (dict): The parameters of the report, part of its cache key.
+        years (list[int]): The years of the transactions the report is built from.
+        compute (Callable[[], T]): Computes the report.
+    Returns:
+        T: The report.
+    """
+    from internal.cache.backends import get_cache
+    from internal.cache.tags import transactions_tag
+    from internal.database.helpers.upload import get_uploads_version
+
+    version = get_uploads_version(years=years)
+    report = get_cache().get_or_set(
+        f"report:{name}:{json.dumps(params, sort_keys=True)}:{version}",
+        lambda: compute().model_dump_json(),
+        ttl=report_cache_ttl,
+        tags=[transactions_tag(year) for year in years],
+    )
+    return model.model_validate_json(report)
+
+
+@router.get("/reports/customer-inflows")
+def customer_inflows(
+    year: Annotated[int, Query()] = date.today().year,
+    bank: Annotated[str, Query()] = "all",
+    min_amount: Annotated[float, Query()] = 0,
+    limit: Annotated[int, Query()] = 100,
+) -> CustomerInflowListModel:
+    """
+    Total inflows per customer for a year, across all banks or for one bank.
+    """
+    from internal.analytics import reports
+
+    bank = None if bank.lower() == "all" else bank
+    try:
+        return cached_report(
+            CustomerInflowListModel, "customer-inflows",
+            dict(year=year, bank=bank, min_amount=min_amount, limit=limit),
+            [year],
+            lambda: reports.customer_inflows(analytics_dataset, year=year, bank=bank, min_amount=min_amount, limit=limit),
+        )
+    except ValueError as e:
+        raise BadRequestError(str(e))
+
+@router.get("/reports/banks")
+def bank_totals(
+    year: Annotated[int, Query()] = date.today().year,
+    limit: Annotated[int, Query()] = 100,
+) -> BankTotalListModel:
+    """
+    Customers, transactions and total amount per bank for a year.
+    """
+    from internal.analytics import reports
+
+    return cached_report(
+        BankTotalListModel, "banks",
+        dict(year=year, limit=limit),
+        [year],
+        lambda: reports.bank_totals(analytics_dataset, year=year, limit=limit),
+    )
+
+@router.get("/reports/monthly")
+def monthly_totals(
+    year: Annotated[int, Query()] = date.today().year,
+    bank: Annotated[str, Query()] = "all",
+    customer_id: Annotated[int | None, Query()] = None,
+    limit: Annotated[int, Query()] = 100,
+) -> MonthlyTotalListModel:
+    """
+    Customers, transactions and total amount per month for a year.
+    """
+    from internal.analytics import reports
+
+    bank = None if bank.lower() == "all" else bank
+    try:
+        return cached_report(
+            MonthlyTotalListModel, "monthly",
+            dict(year=year, bank=bank, customer_id=customer_id, limit=limit),
+            [year],
+            lambda: reports.monthly_totals(analytics_dataset, year=year, bank=bank, customer_id=customer_id, limit=limit),
+        )
+    except ValueError as e:
+        raise BadRequestError(str(e))
+
+@router.get("/reports/top-customers")
+def top_customers(
+    year: Annotated[int, Query()] = date.today().year,
+    bank: Annotated[str, Query()] = "all",
+    limit: Annotated[int, Query()] = 100,
+) -> TopCustomerListModel:
+    """
+    Top customers by transaction amount for a year, across all banks or for one bank.
+    Served from the leaderboards precomputed when uploads are processed.
+    """
+    from internal.database.helpers.transaction import get_top_customers
+
+    bank = None if bank.lower() == "all" else bank
+    return cached_report(
+        TopCustomerListModel, "top-customers",
+        dict(year=year, bank=bank, limit=limit),
+        [year],
+        lambda: get_top_customers(year=year, bank=bank, limit=limit),
+    )
+
+@router.get("/reports/sketches")
+def merged_sketches(
+    years: Annotated[str, Query()] = str(date.today().year),
+    banks: Annotated[str, Query()] = "all",
+    quantiles: Annotated[str, Query()] = "0.5,0.9,0.99",
+) -> SketchSummaryModel:
+    """
+    Approximate distinct customers and transaction amount quantiles across the
+    given comma-separated years and banks, merged from the sketches written on upload.
+    """
+    from internal.analytics import sketches
+
+    try:
+        years = sorted({int(year) for year in years.split(",")})
+        banks = None if banks.lower() == "all" else sorted({bank.strip() for bank in banks.split(",")})
+        ranks = [float(rank) for rank in quantiles.split(",")]
+        return cached_report(
+            SketchSummaryModel, "sketches",
+            dict(years=years, banks=banks, ranks=ranks),
+            years,
+            lambda: sketches.merge_sketches(analytics_dataset, years=years, banks=banks, ranks=ranks),
+        )
+    except ValueError as e:
+        raise BadRequestError(str(e))
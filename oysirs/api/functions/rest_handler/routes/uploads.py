@@ -1,27 +1,25 @@
 from aws_lambda_powertools.event_handler.api_gateway import Router
+from aws_lambda_powertools.event_handler.exceptions import BadRequestError
+from aws_lambda_powertools.event_handler import Response
 from aws_lambda_powertools import Logger
-import boto3
+from aws_lambda_powertools.event_handler.openapi.params import Query
+from typing import Annotated
 from internal.database.models.upload import *
-from internal.database.helpers.upload import (
-    insert_or_update_upload,
-    get_upload_by_id,
-    list_uploads,
-)
+from internal.analytics.banks import validate_bank
+from utils.aws import get_client
+from utils.http import make_etag, not_modified, json_response
 import os
 
 
 banks_raw_bucket_name = os.getenv('BANKS_RAW_BUCKET_NAME')
-aws_region = os.getenv('AWS_REGION')
+# Clients revalidate with If-None-Match, so polling is answered with 304s while nothing changes
+uploads_cache_control = os.getenv('UPLOADS_CACHE_CONTROL', 'private, no-cache')
+# Upper bound of the long-poll wait, below the 29 seconds API Gateway integration timeout
+upload_events_max_wait = float(os.getenv('UPLOAD_EVENTS_MAX_WAIT_SECONDS', '20'))
 
 logger = Logger()
 router = Router()
 
-s3_client = boto3.client(
-    's3', 
-    region_name=aws_region,
-    endpoint_url=f'https://s3.{aws_region}.amazonaws.com'
-)
-logger.info(f"S3 Client initialized for region: {aws_region}")
 logger.info(f"Bucket name from env: {banks_raw_bucket_name}")
 
 @router.post("/uploads/ingest")
@@ -31,8 +29,14 @@ def ingest_upload(body: UploadIngestModel) -> UploadUrlModel:
     Args:
         body (UploadIngestModel): The upload ingestion data.
     """
+    from internal.database.helpers.upload import insert_or_update_upload
+
+    try:
+        validate_bank(body.bank)
+    except ValueError as e:
+        raise BadRequestError(str(e))
     # Generate a presigned URL for uploading the file to S3
-    presigned_url = s3_client.generate_presigned_url(
+    presigned_url = get_client('s3').generate_presigned_url(
         'put_object',
         Params={
             'Bucket': banks_raw_bucket_name,
@@ -53,11 +57,60 @@ def ingest_upload(body: UploadIngestModel) -> UploadUrlModel:
     logger.info(f"New upload ingested: {new_upload.model_dump()}")
     return UploadUrlModel(url=presigned_url)
 
-@router.get("/uploads")
-def list_all_uploads() -> UploadListModel:
+@router.get(
+    "/uploads",
+    responses={
+        200: {
+            "description": "Successful Response",
+            "content": {"application/json": {"model": UploadListModel}},
+        },
+    },
+)
+def list_all_uploads(
+    year: Annotated[int | None, Query()] = None,
+    bank: Annotated[str, Query()] = "all",
+    status: Annotated[UploadStatus | None, Query()] = None,
+    cursor: Annotated[str | None, Query()] = None,
+    limit: Annotated[int | None, Query()] = None,
+) -> Response[str]:
     """
-    List all uploads.
+    List uploads with optional filters, most recently updated first.
+    Without a limit all of them are listed, with one (at most 100) they are
+    paged: pass the returned next_cursor as `cursor` to get the next page.
+    Requests with the ETag of the current version in If-None-Match get a 304
+    without the uploads being loaded.
     """
-    uploads = list_uploads()
-    logger.info(f"Retrieved {len(uploads.uploads)} uploads")
-    return uploads
\ No newline at end of file
+    from internal.database.helpers.upload import get_uploads_version, list_uploads
+
+    bank = None if bank.lower() == "all" else bank
+    if limit is not None:
+        limit = max(1, min(limit, 100))
+    etag = make_etag("uploads", get_uploads_version(), year, bank, status, cursor, limit)
+    response = not_modified(router.current_event, etag, uploads_cache_control)
+    if response:
+        return response
+    try:
+        uploads = list_uploads(year=year, bank=bank, status=status, cursor=cursor, limit=limit)
+    except ValueError as e:
+        raise BadRequestError(str(e))
+    logger.info(f"Retrieved {len(uploads.uploads)} of {uploads.total} uploads")
+    return json_response(uploads.model_dump_json(), etag, uploads_cache_control)
+
+@router.get("/uploads/events")
+def list_upload_events(
+    since: Annotated[int, Query()] = 0,
+    wait: Annotated[float, Query()] = upload_events_max_wait,
+    limit: Annotated[int, Query()] = 100,
+) -> UploadEventListModel:
+    """
+    Long-poll the upload changes after the `since` sequence number.
+    Returns as soon as there are changes, or with no events after `wait` seconds.
+    Pass the returned last_seq as `since` of the next request.
+    """
+    from internal.database.helpers.upload import wait_for_upload_events
+
+    return wait_for_upload_events(
+        since=since,
+        timeout=max(0.0, min(wait, upload_events_max_wait)),
+        limit=max(1, min(limit, 1000)),
+    )
@@ -0,0 +1,34 @@
+from aws_lambda_powertools.event_handler.exceptions import ForbiddenError
+from aws_lambda_powertools.utilities.data_classes import APIGatewayProxyEvent
+from internal.database.models.user import UserGroup
+import re
+
+
+def get_groups(event: APIGatewayProxyEvent) -> set[str]:
+    """
+    Get the Cognito groups of the caller, from the claims the API Gateway
+    authorizer verified.
+
+    Args:
+        event (APIGatewayProxyEvent): The current request.
+    Returns:
+        set[str]: The names of the groups.
+    """
+    groups = event.request_context.authorizer.claims.get("cognito:groups") or []
+    if isinstance(groups, str):
+        # API Gateway flattens the list claims, e.g. "[staff superuser]" or "staff,superuser"
+        groups = re.split(r"[\s,]+", groups.strip("[]"))
+    return {group for group in groups if group}
+
+def require_group(event: APIGatewayProxyEvent, group: UserGroup) -> None:
+    """
+    Reject the request unless the caller is in a group.
+
+    Args:
+        event (APIGatewayProxyEvent): The current request.
+        group (UserGroup): The required group.
+    Raises:
+        ForbiddenError: If the caller is not in the group.
+    """
+    if group.value not in get_groups(event):
+        raise ForbiddenError(f"Only the {group.value} group can access this resource")
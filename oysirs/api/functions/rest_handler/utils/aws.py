@@ -0,0 +1,28 @@
+import threading
+import os
+
+
+aws_region = os.getenv('AWS_REGION')
+
+# Clients are created on first use, so routes that do not need them skip loading boto3
+_clients: dict = {}
+_lock = threading.Lock()
+
+
+def get_client(service_name: str):
+    """
+    Get the boto3 client of a service, shared by the routes of the container.
+
+    Args:
+        service_name (str): The AWS service name, e.g. 's3'.
+    Returns:
+        The boto3 client.
+    """
+    with _lock:
+        if service_name not in _clients:
+            import boto3
+
+            # S3 uses the regional endpoint, so presigned URLs are valid right after bucket creation
+            endpoint_url = f'https://s3.{aws_region}.amazonaws.com' if service_name == 's3' else None
+            _clients[service_name] = boto3.client(service_name, region_name=aws_region, endpoint_url=endpoint_url)
+        return _clients[service_name]
@@ -0,0 +1,134 @@
+from botocore.exceptions import ClientError
+from collections import OrderedDict
+from pathlib import Path
+import pyarrow as pa
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+import hashlib
+import threading
+import os
+import io
+
+
+class DatasetCache:
+    """
+    Two-tier cache of decoded transaction datasets for warm Lambda containers.
+
+    Tier one is an LRU of Arrow tables bounded by their size in memory. Tier two
+    is a directory of Arrow IPC (Feather) files, memory-mapped when read so they
+    are not copied into memory. Entries are keyed by the S3 key and ETag of the
+    object, and every lookup revalidates the ETag with a head_object call, so a
+    re-uploaded file is never served stale.
+    """
+
+    def __init__(
+            self,
+            s3_client,
+            directory: str,
+            max_memory_bytes: int,
+            max_disk_bytes: int,
+            max_object_bytes: int,
+    ) -> None:
+        self.s3_client = s3_client
+        self.directory = Path(directory)
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.max_object_bytes = max_object_bytes
+        self.counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "bypasses": 0}
+        self._tables: OrderedDict[str, pa.Table] = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+
+    def get_table(self, bucket: str, key: str, columns: list[str]) -> pa.Table | None:
+        """
+        Get the given columns of a parquet object, from memory, disk or S3.
+
+        Args:
+            bucket (str): The bucket of the object.
+            key (str): The key of the object.
+            columns (list[str]): The columns to decode and cache.
+        Returns:
+            pa.Table | None: The decoded columns, or None when the object is too
+                large to cache and should be read from S3 directly.
+        """
+        try:
+            head = self.s3_client.head_object(Bucket=bucket, Key=key)
+        except ClientError as e:
+            if e.response["Error"]["Code"] in ("404", "NoSuchKey"):
+                raise FileNotFoundError(f"{bucket}/{key}") from e
+            raise
+        if head["ContentLength"] > self.max_object_bytes:
+            self._count("bypasses")
+            return None
+
+        cache_key = hashlib.sha256(f"{bucket}/{key}:{head['ETag']}:{','.join(columns)}".encode()).hexdigest()
+        with self._lock:
+            table = self._tables.get(cache_key)
+            if table is not None:
+                self._tables.move_to_end(cache_key)
+                self.counters["memory_hits"] += 1
+                return table
+
+        path = self.directory / f"{cache_key}.arrow"
+        if path.exists():
+            table = ipc.open_file(pa.memory_map(str(path), "r")).read_all()
+            path.touch()
+            self._count("disk_hits")
+        else:
+            obj = self.s3_client.get_object(Bucket=bucket, Key=key, IfMatch=head["ETag"])
+            table = pq.read_table(io.BytesIO(obj["Body"].read()), columns=columns)
+            self._write(path, table)
+            self._count("misses")
+
+        self._remember(cache_key, table)
+        return table
+
+    def stats(self) -> dict:
+        """
+        Get the hit and miss counters and the current size of both tiers.
+        """
+        with self._lock:
+            return {
+                **self.counters,
+                "memory_entries": len(self._tables),
+                "memory_bytes": self._memory_bytes,
+            }
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            self.counters[counter] += 1
+
+    def _remember(self, cache_key: str, table: pa.Table) -> None:
+        if table.nbytes > self.max_memory_bytes:
+            return
+        with self._lock:
+            if cache_key in self._tables:
+                return
+            self._tables[cache_key] = table
+            self._memory_bytes += table.nbytes
+            while self._memory_bytes > self.max_memory_bytes:
+                _, evicted = self._tables.popitem(last=False)
+                self._memory_bytes -= evicted.nbytes
+
+    def _write(self, path: Path, table: pa.Table) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # Write to a temporary file first, so concurrent readers never map a partial file
+        tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+        with ipc.new_file(str(tmp_path), table.schema) as writer:
+            writer.write_table(table)
+        os.replace(tmp_path, path)
+
+        entries = []
+        for f in self.directory.glob("*.arrow"):
+            try:
+                stat = f.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, f))
+        total_bytes = sum(size for _, size, _ in entries)
+        for _, size, f in sorted(entries):
+            if total_bytes <= self.max_disk_bytes:
+                break
+            if f != path:
+                f.unlink(missing_ok=True)
+                total_bytes -= size
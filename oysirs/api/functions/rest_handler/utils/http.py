@@ -0,0 +1,47 @@
+from aws_lambda_powertools.event_handler import Response, content_types
+from aws_lambda_powertools.utilities.data_classes import APIGatewayProxyEvent
+import hashlib
+
+
+def make_etag(*parts) -> str:
+    """
+    Build a strong ETag from the version parts of a response.
+    """
+    return '"' + hashlib.sha256(repr(parts).encode()).hexdigest()[:32] + '"'
+
+
+def not_modified(event: APIGatewayProxyEvent, etag: str, cache_control: str) -> Response | None:
+    """
+    Get a 304 response when the request's If-None-Match matches the ETag.
+
+    Args:
+        event (APIGatewayProxyEvent): The current request.
+        etag (str): The ETag of the current version of the resource.
+        cache_control (str): The Cache-Control header of the resource.
+    Returns:
+        Response | None: The 304 response, or None when the resource must be sent.
+    """
+    if_none_match = event.headers.get("If-None-Match")
+    if not if_none_match:
+        return None
+    # Weak comparison, as required for If-None-Match
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    if "*" not in candidates and etag not in candidates:
+        return None
+    return Response(
+        status_code=304,
+        body="",
+        headers={"ETag": etag, "Cache-Control": cache_control},
+    )
+
+
+def json_response(body: str, etag: str, cache_control: str) -> Response:
+    """
+    Build a 200 JSON response with its validators.
+    """
+    return Response(
+        status_code=200,
+        content_type=content_types.APPLICATION_JSON,
+        body=body,
+        headers={"ETag": etag, "Cache-Control": cache_control},
+    )
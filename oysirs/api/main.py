@@ -13,6 +13,7 @@ from ..authentications.main import Authentications
 from ..databases.main import Databases
 from .rest_api import RestApi
 from .banks_s3_buckets.main import BanksS3Buckets
+from .exports.main import Exports
 
 class OysirsApiConfig(TypedDict):
     shared: Shared
@@ -31,10 +32,18 @@ class OysirsApi(Construct):
             }
         )
 
+        exports = Exports(
+            self, "Exports",
+            config={
+                **config,
+            }
+        )
+
         RestApi(
             self, "OysirsApi",
             config={
                 **config,
                 'banks_s3_buckets': banks_s3_buckets,
+                'exports': exports,
             }
         )
\ No newline at end of file
@@ -7,12 +7,12 @@ from aws_cdk import (
 )
 from constructs import Construct
 from typing import TypedDict
-from pathlib import Path
 
 from ..shared.main import Shared
 from ..authentications.main import Authentications
 from ..databases.main import Databases
 from .banks_s3_buckets.main import BanksS3Buckets
+from .exports.main import Exports
 
 
 class RestApiConfig(TypedDict):
@@ -20,6 +20,7 @@ class RestApiConfig(TypedDict):
     authentications: Authentications
     databases: Databases
     banks_s3_buckets: BanksS3Buckets
+    exports: Exports
 
 
 class RestApi(Construct):
@@ -34,34 +35,28 @@ class RestApi(Construct):
             allow_all_outbound=True,
         )
 
-        default_lambda = _lambda.Function(
+        # An image rather than layers, the reports and transactions routes import the analytics requirements
+        default_lambda = _lambda.DockerImageFunction(
             self, "OysirsRestApiHandler",
             # function_name="oysirs-rest-api-handler",
             description="Handler for Oysirs REST API",
-            runtime=_lambda.Runtime.PYTHON_3_12,
             architecture=_lambda.Architecture.X86_64,
-            handler="main.handler",
-            code=_lambda.Code.from_asset(
-                path=str(Path(__file__).parent.joinpath("functions/rest_handler").resolve())
-            ),
+            code=config['shared'].analytics_image_code("oysirs/api/functions/rest_handler"),
             # vpc=config['shared'].vpc,
             # security_groups=[api_security_group],
-            layers=[
-                config['shared'].powertools_layer,
-                config['shared'].common_layer,
-                config['shared'].internal_layer,
-            ],
             environment={
                 **config['shared'].default_env_vars,
                 **config['authentications'].env_vars,
                 **config['databases'].env_vars,
                 **config['banks_s3_buckets'].env_vars,
+                **config['exports'].env_vars,
             },
             timeout=Duration.minutes(10),
             memory_size=512,
             # allow_public_subnet=True,
         )
         config['banks_s3_buckets'].grant_read_write(default_lambda.role)
+        config['exports'].grant_start_and_download(default_lambda.role)
 
         cognito_authorizer = apigw.CognitoUserPoolsAuthorizer(
             self, "CognitoAuthorizer",
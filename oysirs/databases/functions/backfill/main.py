@@ -0,0 +1,122 @@
+from aws_lambda_powertools.logging import Logger
+from internal.database.helpers.customer import backfill_canonical_identifiers
+from internal.database.helpers.transaction import (
+    has_trxn_rollups,
+    replace_trxn_summaries,
+    replace_trxn_monthly,
+    refresh_leaderboards,
+)
+from internal.storage.transactions import (
+    list_transaction_files,
+    read_transactions,
+    transaction_rollups,
+    transaction_monthly_rollups,
+)
+from internal.cache.backends import get_cache
+from internal.cache.tags import upload_tags
+import boto3
+import json
+import time
+import os
+
+logger = Logger()
+
+BATCH_SIZE = int(os.getenv('BACKFILL_BATCH_SIZE', '1000'))
+PAUSE_SECONDS = float(os.getenv('BACKFILL_PAUSE_SECONDS', '0.5'))
+# Time kept for the last batch and the next invocation
+TIME_MARGIN_MS = 60_000
+# Phase of the invocations rebuilding the transaction rollups, once the canonical keys are done
+TRXN_ROLLUPS_PHASE = 'trxn_rollups'
+
+banks_bucket = os.getenv('BANKS_BUCKET_NAME')
+lambda_client = boto3.client('lambda')
+
+
+def backfill_trxn_rollups(after: tuple[int, str] | None, max_seconds: float) -> tuple[int, tuple[int, str] | None]:
+    """
+    Rebuild the transaction rollups, leaderboards and monthly rollups of the
+    uploads processed before they existed, from their `{year}/{bank}.parquet`
+    files, one upload at a time until max_seconds have passed.
+
+    Args:
+        after (tuple[int, str] | None): The last (year, bank) looked at by the previous invocation.
+        max_seconds (float): The time after which no other upload is started.
+    Returns:
+        tuple[int, tuple[int, str] | None]: The number of uploads rebuilt, and
+            the last (year, bank) looked at, None when all of them were.
+    """
+    started_at, started_after = time.monotonic(), after
+    total = 0
+    for year, bank in list_transaction_files(banks_bucket):
+        if after is not None and (year, bank) <= after:
+            continue
+        # At least one upload is looked at per invocation
+        if time.monotonic() - started_at >= max_seconds and after != started_after:
+            return total, after
+        if not has_trxn_rollups(year, bank):
+            df = read_transactions(banks_bucket, year, bank)
+            replace_trxn_summaries(year=year, bank=bank, rollups=transaction_rollups(df))
+            refresh_leaderboards(year=year, bank=bank)
+            replace_trxn_monthly(year=year, bank=bank, rollups=transaction_monthly_rollups(df))
+            logger.info(f"Rebuilt the transaction rollups of {year}/{bank}")
+            try:
+                get_cache().invalidate(*upload_tags(year))
+            except Exception as e:
+                logger.exception(f"Failed to invalidate the cache for {year}/{bank}: {e}")
+            total += 1
+            time.sleep(PAUSE_SECONDS)
+        after = (year, bank)
+    return total, None
+
+
+def handler(event, context):
+    """
+    Backfill the canonical keys of customer identifiers, then the transaction
+    rollups of the uploads processed before they existed, until the invocation
+    runs out of time, then carry on in a new invocation until there is nothing
+    left to backfill. Started after each deployment of the migrations.
+    """
+    event = event or {}
+    max_seconds = max(0, context.get_remaining_time_in_millis() - TIME_MARGIN_MS) / 1000
+
+    if event.get('phase') != TRXN_ROLLUPS_PHASE:
+        total = backfill_canonical_identifiers(
+            batch_size=BATCH_SIZE,
+            pause_seconds=PAUSE_SECONDS,
+            max_seconds=max_seconds,
+        )
+        logger.info(f"Backfilled the canonical keys of {total} customer identifiers")
+        invoke(context, event if total else {'phase': TRXN_ROLLUPS_PHASE})
+        return {
+            'statusCode': 200,
+            'body': f'Backfilled {total} customer identifiers.'
+        }
+
+    if not banks_bucket:
+        logger.warning("BANKS_BUCKET_NAME is not set, skipping the transaction rollups")
+        return {
+            'statusCode': 200,
+            'body': 'Backfilled 0 uploads.'
+        }
+    total, after = backfill_trxn_rollups(
+        after=tuple(event['after']) if event.get('after') else None,
+        max_seconds=max_seconds,
+    )
+    logger.info(f"Backfilled the transaction rollups of {total} uploads")
+    if after is not None:
+        invoke(context, {'phase': TRXN_ROLLUPS_PHASE, 'after': list(after)})
+    return {
+        'statusCode': 200,
+        'body': f'Backfilled {total} uploads.'
+    }
+
+
+def invoke(context, event: dict) -> None:
+    """
+    Carry on the backfill in a new asynchronous invocation.
+    """
+    lambda_client.invoke(
+        FunctionName=context.function_name,
+        InvocationType='Event',
+        Payload=json.dumps(event),
+    )
@@ -0,0 +1,36 @@
+"""add customer identifiers canonical
+
+Revision ID: 0d7f3b9e5a2c
+Revises: 9c6e2a8f4b1d
+Create Date: 2026-10-19 17:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0d7f3b9e5a2c'
+down_revision: Union[str, Sequence[str], None] = '9c6e2a8f4b1d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Nullable, the existing rows are filled in by the backfill Lambda after the migration
+    op.add_column('customer_identifiers', sa.Column('canonical', sa.String(), nullable=True))
+    # Built without blocking the writes to customer_identifiers
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_customer_identifiers_kind_canonical', 'customer_identifiers', ['kind', 'canonical'],
+            unique=False, postgresql_concurrently=True, if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_customer_identifiers_kind_canonical', table_name='customer_identifiers')
+    op.drop_column('customer_identifiers', 'canonical')
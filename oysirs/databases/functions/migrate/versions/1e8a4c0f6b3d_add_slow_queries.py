@@ -0,0 +1,42 @@
+"""add slow queries
+
+Revision ID: 1e8a4c0f6b3d
+Revises: 0d7f3b9e5a2c
+Create Date: 2026-10-19 18:15:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1e8a4c0f6b3d'
+down_revision: Union[str, Sequence[str], None] = '0d7f3b9e5a2c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Plans of the statements slower than DATABASE_SLOW_QUERY_MS, without their parameters
+    op.create_table('slow_queries',
+    sa.Column('statement', sa.String(), nullable=False),
+    sa.Column('helper', sa.String(), nullable=True),
+    sa.Column('scope', sa.String(), nullable=True),
+    sa.Column('duration_ms', sa.Float(), nullable=False),
+    sa.Column('plan', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_slow_queries_created_at', 'slow_queries', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_slow_queries_created_at', table_name='slow_queries')
+    op.drop_table('slow_queries')
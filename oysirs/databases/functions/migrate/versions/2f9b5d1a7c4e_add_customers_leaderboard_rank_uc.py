@@ -0,0 +1,38 @@
+"""add customers leaderboard rank unique constraint
+
+Revision ID: 2f9b5d1a7c4e
+Revises: 1e8a4c0f6b3d
+Create Date: 2026-10-19 19:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2f9b5d1a7c4e'
+down_revision: Union[str, Sequence[str], None] = '1e8a4c0f6b3d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Concurrent refreshes could insert a rank twice, keep the latest row of each
+    op.execute(
+        "DELETE FROM customers_leaderboard a USING customers_leaderboard b "
+        "WHERE a.year = b.year AND a.bank IS NOT DISTINCT FROM b.bank AND a.rank = b.rank AND a.id < b.id"
+    )
+    op.drop_index('ix_customers_leaderboard_year_bank_rank', table_name='customers_leaderboard')
+    op.create_unique_constraint(
+        '_year_bank_rank_uc', 'customers_leaderboard', ['year', 'bank', 'rank'],
+        postgresql_nulls_not_distinct=True,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('_year_bank_rank_uc', 'customers_leaderboard', type_='unique')
+    op.create_index('ix_customers_leaderboard_year_bank_rank', 'customers_leaderboard', ['year', 'bank', 'rank'], unique=False)
@@ -0,0 +1,35 @@
+"""null empty canonical keys
+
+Revision ID: 3a0c6e2b8d5f
+Revises: 2f9b5d1a7c4e
+Create Date: 2026-10-19 20:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3a0c6e2b8d5f'
+down_revision: Union[str, Sequence[str], None] = '2f9b5d1a7c4e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Values without a canonical key (e.g. punctuation only) are stored with a null one and match nothing,
+    # the kinds are listed so the rows are found through ix_customer_identifiers_kind_canonical
+    op.execute(
+        "UPDATE customer_identifiers SET canonical = NULL "
+        "WHERE (kind IN ('name', 'address', 'email', 'tax_id', 'tin', 'rc') AND canonical = '') "
+        "OR (kind = 'mobile_no' AND canonical IN ('', '+'))"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # The null keys are valid for the previous revision, where they are backfilled again
+    pass
@@ -0,0 +1,43 @@
+"""add customers trxn summary
+
+Revision ID: 3c8e4a6f1b2d
+Revises: 2b5c9d3e7f1a
+Create Date: 2026-10-19 09:12:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c8e4a6f1b2d'
+down_revision: Union[str, Sequence[str], None] = '2b5c9d3e7f1a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Per-customer transaction rollups computed by the banks raw processor
+    op.create_table('customers_trxn_summary',
+    sa.Column('customer_id', sa.Integer(), nullable=False),
+    sa.Column('year', sa.Integer(), nullable=False),
+    sa.Column('bank', sa.String(), nullable=False),
+    sa.Column('total_trxns', sa.Integer(), nullable=False),
+    sa.Column('total_amount', sa.Double(), nullable=False),
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['customer_id'], ['customers.id'], onupdate='CASCADE', ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('customer_id', 'year', 'bank', name='_customer_year_bank_uc')
+    )
+    op.create_index('ix_customers_trxn_summary_year_bank', 'customers_trxn_summary', ['year', 'bank'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_customers_trxn_summary_year_bank', table_name='customers_trxn_summary')
+    op.drop_table('customers_trxn_summary')
@@ -0,0 +1,43 @@
+"""add customers leaderboard
+
+Revision ID: 4d1f7b3a9c5e
+Revises: 3c8e4a6f1b2d
+Create Date: 2026-10-19 10:05:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4d1f7b3a9c5e'
+down_revision: Union[str, Sequence[str], None] = '3c8e4a6f1b2d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Top customers by transaction amount per year and bank (bank is null across all banks)
+    op.create_table('customers_leaderboard',
+    sa.Column('year', sa.Integer(), nullable=False),
+    sa.Column('bank', sa.String(), nullable=True),
+    sa.Column('rank', sa.Integer(), nullable=False),
+    sa.Column('customer_id', sa.Integer(), nullable=False),
+    sa.Column('total_trxns', sa.Integer(), nullable=False),
+    sa.Column('total_amount', sa.Double(), nullable=False),
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['customer_id'], ['customers.id'], onupdate='CASCADE', ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_customers_leaderboard_year_bank_rank', 'customers_leaderboard', ['year', 'bank', 'rank'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_customers_leaderboard_year_bank_rank', table_name='customers_leaderboard')
+    op.drop_table('customers_leaderboard')
@@ -0,0 +1,46 @@
+"""add customers trxn monthly
+
+Revision ID: 5e2a8c4b0d6f
+Revises: 4d1f7b3a9c5e
+Create Date: 2026-10-19 10:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e2a8c4b0d6f'
+down_revision: Union[str, Sequence[str], None] = '4d1f7b3a9c5e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Monthly per-customer transaction rollups, partitioned by year.
+    # The yearly partitions are created by the banks raw processor on ingest.
+    op.create_table('customers_trxn_monthly',
+    sa.Column('customer_id', sa.Integer(), nullable=False),
+    sa.Column('year', sa.Integer(), nullable=False),
+    sa.Column('bank', sa.String(), nullable=False),
+    sa.Column('month', sa.Date(), nullable=False),
+    sa.Column('total_trxns', sa.Integer(), nullable=False),
+    sa.Column('total_amount', sa.Double(), nullable=False),
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['customer_id'], ['customers.id'], onupdate='CASCADE', ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id', 'year'),
+    sa.UniqueConstraint('customer_id', 'year', 'bank', 'month', name='_customer_year_bank_month_uc'),
+    postgresql_partition_by='LIST (year)'
+    )
+    op.create_index('ix_customers_trxn_monthly_year_bank', 'customers_trxn_monthly', ['year', 'bank'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_customers_trxn_monthly_year_bank', table_name='customers_trxn_monthly')
+    op.drop_table('customers_trxn_monthly')
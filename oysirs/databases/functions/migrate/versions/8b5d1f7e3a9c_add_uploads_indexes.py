@@ -0,0 +1,30 @@
+"""add uploads indexes
+
+Revision ID: 8b5d1f7e3a9c
+Revises: 7a4c0e6d2f8b
+Create Date: 2026-10-19 14:50:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b5d1f7e3a9c'
+down_revision: Union[str, Sequence[str], None] = '7a4c0e6d2f8b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_uploads_status_updated_at', 'uploads', ['status', 'updated_at'], unique=False)
+    op.create_index('ix_uploads_year', 'uploads', ['year'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_uploads_year', table_name='uploads')
+    op.drop_index('ix_uploads_status_updated_at', table_name='uploads')
@@ -0,0 +1,83 @@
+"""add customer identifiers
+
+Revision ID: 9c6e2a8f4b1d
+Revises: 8b5d1f7e3a9c
+Create Date: 2026-10-19 16:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c6e2a8f4b1d'
+down_revision: Union[str, Sequence[str], None] = '8b5d1f7e3a9c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Per kind table -> the kind of identifier it holds, also the name of its value column
+IDENTIFIER_TABLES = {
+    'customers_email': 'email',
+    'customers_mobile_no': 'mobile_no',
+    'customers_tax_id': 'tax_id',
+    'customers_tin': 'tin',
+    'customers_rc': 'rc',
+    'customers_name': 'name',
+    'customers_address': 'address',
+}
+BACKFILL_BATCH_SIZE = 10_000
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('customer_identifiers',
+    sa.Column('kind', sa.String(), nullable=False),
+    sa.Column('value', sa.String(), nullable=False),
+    sa.Column('customer_id', sa.Integer(), nullable=False),
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['customer_id'], ['customers.id'], onupdate='CASCADE', ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('kind', 'value', 'customer_id', name='_kind_value_customer_uc')
+    )
+    op.create_index(
+        'ux_customer_identifiers_kind_value', 'customer_identifiers', ['kind', 'value'], unique=True,
+        postgresql_where=sa.text("kind IN ('email', 'mobile_no', 'tax_id', 'tin', 'rc')"),
+    )
+    op.create_index('ix_customer_identifiers_customer_id', 'customer_identifiers', ['customer_id'], unique=False)
+
+    # Copy the existing identifiers in batches, each committed on its own, so the
+    # per kind tables are only ever read and ingestion keeps running meanwhile.
+    # Rows already copied are skipped, so the backfill can be run again safely.
+    with op.get_context().autocommit_block():
+        connection = op.get_bind()
+        for table, kind in IDENTIFIER_TABLES.items():
+            last_id = 0
+            while last_id is not None:
+                last_id = connection.scalar(
+                    sa.text(f"""
+                        WITH batch AS (
+                            SELECT id, {kind} AS value, customer_id, created_at, updated_at
+                            FROM {table}
+                            WHERE id > :last_id
+                            ORDER BY id
+                            LIMIT :batch_size
+                        ), copied AS (
+                            INSERT INTO customer_identifiers (kind, value, customer_id, created_at, updated_at)
+                            SELECT :kind, value, customer_id, created_at, updated_at FROM batch ORDER BY id
+                            ON CONFLICT DO NOTHING
+                        )
+                        SELECT max(id) FROM batch
+                    """),
+                    {'last_id': last_id, 'batch_size': BACKFILL_BATCH_SIZE, 'kind': kind},
+                )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_customer_identifiers_customer_id', table_name='customer_identifiers')
+    op.drop_index('ux_customer_identifiers_kind_value', table_name='customer_identifiers')
+    op.drop_table('customer_identifiers')
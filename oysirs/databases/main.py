@@ -2,6 +2,7 @@ from aws_cdk import (
     aws_rds as rds,
     aws_ec2 as ec2,
     aws_lambda as _lambda,
+    aws_iam as iam,
     aws_s3_assets as s3_assets,
     custom_resources as cr,
     SecretValue,
@@ -76,10 +77,27 @@ class Databases(Construct):
             deletion_protection=False,
             database_name="oysirsdb",
         )
+        # Serves the read-only API traffic, so searches are not slowed down by large uploads
+        db_reader_instance = rds.DatabaseInstanceReadReplica(
+            self,
+            "OysirsDBReadReplica",
+            source_database_instance=db_instance,
+            instance_type=ec2.InstanceType.of(
+                ec2.InstanceClass.T3,
+                ec2.InstanceSize.MICRO,
+            ),
+            vpc=config["shared"].vpc,
+            vpc_subnets=ec2.SubnetSelection(subnet_type=ec2.SubnetType.PUBLIC),
+            security_groups=[database_security_group],
+            removal_policy=config["shared"].removal_policy,
+            deletion_protection=False,
+        )
         self.env_vars = {
             # "DATABASE_HOST": db_cluster.cluster_endpoint.hostname,
             "DATABASE_HOST": db_instance.db_instance_endpoint_address,
             "DATABASE_PORT": db_instance.db_instance_endpoint_port,
+            "DATABASE_READER_HOST": db_reader_instance.db_instance_endpoint_address,
+            "DATABASE_READER_PORT": db_reader_instance.db_instance_endpoint_port,
             "DATABASE_NAME": "oysirsdb",
             "DATABASE_USERNAME": db_credentials.username,
             "DATABASE_PASSWORD": db_credentials.password.unsafe_unwrap(),
@@ -132,7 +150,7 @@ class Databases(Construct):
             "MigrationProvider",
             on_event_handler=migration_lambda,
         )
-        CustomResource(
+        migration_custom_resource = CustomResource(
             self,
             "MigrationCustomResource",
             service_token=migration_provider.service_token,
@@ -140,3 +158,45 @@ class Databases(Construct):
                 "asset_hash": migration_asset.asset_hash,
             },
         )
+
+        # Throttled backfills of the data the migrations cannot fill in SQL,
+        # the function re-invokes itself until there is nothing left to backfill
+        # An image rather than layers, the transaction rollups are rebuilt with the analytics requirements
+        self.backfill_lambda = backfill_lambda = _lambda.DockerImageFunction(
+            self,
+            "BackfillLambda",
+            code=config["shared"].analytics_image_code("oysirs/databases/functions/backfill"),
+            timeout=Duration.minutes(15),
+            # The transaction rollups are rebuilt from a whole year's file of a bank
+            memory_size=2048,
+            environment={
+                **config["shared"].default_env_vars,
+                **self.env_vars,
+                "BACKFILL_BATCH_SIZE": "1000",
+                "BACKFILL_PAUSE_SECONDS": "0.5",
+            },
+        )
+        db_instance.grant_connect(backfill_lambda.role, db_credentials.username)
+        backfill_lambda.grant_invoke(backfill_lambda)
+
+        # Start the backfills once the migrations of this deployment are applied
+        backfill_trigger = cr.AwsCustomResource(
+            self,
+            "BackfillTrigger",
+            on_update=cr.AwsSdkCall(
+                service="Lambda",
+                action="invoke",
+                parameters={
+                    "FunctionName": backfill_lambda.function_name,
+                    "InvocationType": "Event",
+                },
+                physical_resource_id=cr.PhysicalResourceId.of(migration_asset.asset_hash),
+            ),
+            policy=cr.AwsCustomResourcePolicy.from_statements([
+                iam.PolicyStatement(
+                    actions=["lambda:InvokeFunction"],
+                    resources=[backfill_lambda.function_arn],
+                ),
+            ]),
+        )
+        backfill_trigger.node.add_dependency(migration_custom_resource)
@@ -0,0 +1,111 @@
+"""
+Compare the latency of the customer detail queries on the sync and async paths.
+
+The sync path runs get_customer_version then get_customer_with_stats_json on
+psycopg2, like GET /customers/<customer_id>. The async path runs both at once
+with get_customer_detail_async on asyncpg. Run against a local Postgres with
+the DATABASE_* environment variables set, --delay-ms puts a proxy adding that
+much latency to each round trip in front of it, to stand in for the network
+between Lambda and RDS:
+
+    python benchmarks/customer_detail.py --iterations 500 --delay-ms 1
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import threading
+import time
+
+
+def start_delay_proxy(host: str, port: int, delay: float) -> int:
+    """
+    Start a TCP proxy to host:port delaying the data by delay seconds each way.
+
+    Returns:
+        int: The local port of the proxy.
+    """
+    started = threading.Event()
+    proxy_port = []
+
+    async def pipe(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while data := await reader.read(65536):
+                await asyncio.sleep(delay / 2)
+                writer.write(data)
+                await writer.drain()
+        finally:
+            writer.close()
+
+    async def handle(client_reader: asyncio.StreamReader, client_writer: asyncio.StreamWriter) -> None:
+        server_reader, server_writer = await asyncio.open_connection(host, port)
+        await asyncio.gather(pipe(client_reader, server_writer), pipe(server_reader, client_writer), return_exceptions=True)
+
+    async def serve() -> None:
+        server = await asyncio.start_server(handle, "127.0.0.1", 0)
+        proxy_port.append(server.sockets[0].getsockname()[1])
+        started.set()
+        await server.serve_forever()
+
+    threading.Thread(target=asyncio.run, args=(serve(),), daemon=True).start()
+    started.wait()
+    return proxy_port[0]
+
+
+def percentiles(latencies: list[float]) -> str:
+    quantiles = statistics.quantiles(latencies, n=100, method="inclusive")
+    return f"p50 {quantiles[49] * 1000:7.2f} ms  p99 {quantiles[98] * 1000:7.2f} ms"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--iterations", type=int, default=500)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--delay-ms", type=float, default=0, help="Latency added to each round trip")
+    parser.add_argument("--year", type=int, default=2025)
+    args = parser.parse_args()
+
+    if args.delay_ms:
+        proxy_port = start_delay_proxy(os.environ["DATABASE_HOST"], int(os.environ["DATABASE_PORT"]), args.delay_ms / 1000)
+        os.environ.update({"DATABASE_HOST": "127.0.0.1", "DATABASE_PORT": str(proxy_port)})
+        os.environ.pop("DATABASE_READER_HOST", None)
+        os.environ.pop("DATABASE_READER_PORT", None)
+
+    # The engines read the environment on import
+    from internal.database.aio import run
+    from internal.database.helpers.customer import (
+        get_customer_detail_async,
+        get_customer_version,
+        get_customer_with_stats_json,
+        list_customers,
+    )
+
+    customer_ids = [customer.id for customer in list_customers(limit=50).customers]
+    if not customer_ids:
+        raise SystemExit("No customers to query, load some first")
+
+    def sync_detail(customer_id: int) -> None:
+        get_customer_version(customer_id, args.year)
+        get_customer_with_stats_json(customer_id, args.year)
+
+    def async_detail(customer_id: int) -> None:
+        run(get_customer_detail_async(customer_id, args.year))
+
+    paths = {"sync": sync_detail, "async": async_detail}
+    latencies = {name: [] for name in paths}
+    for idx in range(args.warmup + args.iterations):
+        customer_id = customer_ids[idx % len(customer_ids)]
+        # Alternate the paths, so both see the same database and machine load
+        for name, detail in paths.items():
+            started_at = time.perf_counter()
+            detail(customer_id)
+            if idx >= args.warmup:
+                latencies[name].append(time.perf_counter() - started_at)
+
+    print(f"{args.iterations} customer details, {args.delay_ms} ms added per round trip")
+    for name, values in latencies.items():
+        print(f"{name:>6}: {percentiles(values)}")
+
+
+if __name__ == "__main__":
+    main()
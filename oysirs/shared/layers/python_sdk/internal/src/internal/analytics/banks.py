@@ -0,0 +1,21 @@
+import re
+
+
+# Bank names, as in the `{year}__{bank}.xlsx` uploads and the `{year}/{bank}.*` keys of the banks bucket
+BANK_PATTERN = re.compile(r"[\w\- ]+")
+
+
+def validate_bank(bank: str) -> str:
+    """
+    Check that a bank name is safe to use in the keys and globs of the banks bucket.
+
+    Args:
+        bank (str): The bank name.
+    Returns:
+        str: The bank name.
+    Raises:
+        ValueError: When the name has characters other than letters, digits, _, - and spaces.
+    """
+    if not BANK_PATTERN.fullmatch(bank):
+        raise ValueError(f"Invalid bank: {bank}")
+    return bank
@@ -0,0 +1,219 @@
+from internal.database.models.report import *
+from internal.analytics.banks import validate_bank
+from pydantic import BaseModel
+import boto3
+import duckdb
+import threading
+import os
+
+
+# Upper bound of the rows a report returns, whatever limit is requested
+MAX_REPORT_ROWS = int(os.getenv('ANALYTICS_MAX_ROWS', '1000'))
+
+_connection: duckdb.DuckDBPyConnection | None = None
+# Access key of the credentials the S3 secret was created with, None until httpfs is loaded
+_s3_access_key: str | None = None
+_lock = threading.Lock()
+
+
+def _quote(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
+
+
+def get_cursor(dataset: str) -> duckdb.DuckDBPyConnection:
+    """
+    Get a cursor on the embedded DuckDB database used to run the reports.
+    The database is created once per container. When the dataset is in S3,
+    the httpfs extension is loaded once from ANALYTICS_EXTENSION_DIR, where the
+    image installs it at build time, and the S3 secret is only re-created when
+    the AWS credentials change.
+
+    Args:
+        dataset (str): The dataset root, `s3://<banks_bucket>` or a local directory.
+    Returns:
+        duckdb.DuckDBPyConnection: A cursor, to be used by a single thread.
+    """
+    global _connection, _s3_access_key
+    with _lock:
+        if _connection is None:
+            config = {
+                "home_directory": os.getenv('ANALYTICS_HOME_DIR', '/tmp/duckdb'),
+                "memory_limit": os.getenv('ANALYTICS_MEMORY_LIMIT', '256MB'),
+            }
+            if os.getenv('ANALYTICS_EXTENSION_DIR'):
+                config["extension_directory"] = os.getenv('ANALYTICS_EXTENSION_DIR')
+            _connection = duckdb.connect(config=config)
+
+        if dataset.startswith("s3://"):
+            credentials = boto3.Session().get_credentials().get_frozen_credentials()
+            if _s3_access_key is None:
+                _connection.execute("LOAD httpfs")
+            if credentials.access_key != _s3_access_key:
+                _connection.execute(f"""
+                    CREATE OR REPLACE SECRET banks (
+                        TYPE s3,
+                        KEY_ID {_quote(credentials.access_key)},
+                        SECRET {_quote(credentials.secret_key)},
+                        SESSION_TOKEN {_quote(credentials.token or '')},
+                        REGION {_quote(os.getenv('AWS_REGION', ''))}
+                    )
+                """)
+                _s3_access_key = credentials.access_key
+        return _connection.cursor()
+
+
+def dataset_files(dataset: str, year: int, bank: str | None = None) -> str:
+    """
+    Get the glob of the transaction files of a year, or of one bank's file.
+
+    Args:
+        dataset (str): The dataset root, `s3://<banks_bucket>` or a local directory.
+        year (int): The year of the transactions.
+        bank (str | None): The bank of the transactions, all banks when None.
+    Returns:
+        str: The path or glob of the parquet files.
+    """
+    if bank is not None:
+        validate_bank(bank)
+    return f"{dataset.rstrip('/')}/{int(year)}/{bank or '*'}.parquet"
+
+
+def _run_report(dataset: str, query: str, params: list, limit: int, model: type[BaseModel]) -> tuple[list, int, bool]:
+    """
+    Run a report query with its result size capped to MAX_REPORT_ROWS.
+    The query must end with a `LIMIT ?` placeholder.
+
+    Returns:
+        tuple[list, int, bool]: The rows, the applied limit and whether more rows were available.
+    """
+    limit = max(1, min(limit, MAX_REPORT_ROWS))
+    cursor = get_cursor(dataset)
+    try:
+        cursor.execute(query, [*params, limit + 1])
+    except duckdb.IOException as e:
+        # The glob matched no file: there are no transactions for the year or bank
+        if "No files found" in str(e):
+            return [], limit, False
+        raise
+    columns = [column[0] for column in cursor.description]
+    rows = [model(**dict(zip(columns, row))) for row in cursor.fetchall()]
+    return rows[:limit], limit, len(rows) > limit
+
+
+def customer_inflows(
+        dataset: str,
+        year: int,
+        bank: str | None = None,
+        min_amount: float = 0,
+        limit: int = 100,
+) -> CustomerInflowListModel:
+    """
+    Total inflows (positive transaction amounts) per customer for a year,
+    across all banks unless a bank is given, largest first.
+
+    Args:
+        dataset (str): The dataset root, `s3://<banks_bucket>` or a local directory.
+        year (int): The year of the transactions.
+        bank (str | None): The bank of the transactions, all banks when None.
+        min_amount (float): The minimum total inflow of the customers to return.
+        limit (int): The maximum number of customers to return.
+    Returns:
+        CustomerInflowListModel: The customers' inflows.
+    """
+    rows, limit, truncated = _run_report(
+        dataset,
+        """
+        SELECT
+            CUSTOMER_ID AS customer_id,
+            count(DISTINCT filename) AS banks,
+            count(*) AS total_trxns,
+            sum(TRXN_AMOUNT) AS total_amount
+        FROM read_parquet(?, filename = true)
+        WHERE TRXN_AMOUNT > 0
+        GROUP BY CUSTOMER_ID
+        HAVING sum(TRXN_AMOUNT) >= ?
+        ORDER BY total_amount DESC, customer_id
+        LIMIT ?
+        """,
+        [dataset_files(dataset, year, bank), min_amount],
+        limit,
+        CustomerInflowModel,
+    )
+    return CustomerInflowListModel(rows=rows, limit=limit, truncated=truncated)
+
+
+def bank_totals(dataset: str, year: int, limit: int = 100) -> BankTotalListModel:
+    """
+    Number of customers, transactions and total amount per bank for a year.
+
+    Args:
+        dataset (str): The dataset root, `s3://<banks_bucket>` or a local directory.
+        year (int): The year of the transactions.
+        limit (int): The maximum number of banks to return.
+    Returns:
+        BankTotalListModel: The banks' totals, ordered by bank.
+    """
+    rows, limit, truncated = _run_report(
+        dataset,
+        """
+        SELECT
+            parse_filename(filename, true) AS bank,
+            count(DISTINCT CUSTOMER_ID) AS customers,
+            count(*) AS total_trxns,
+            coalesce(sum(TRXN_AMOUNT), 0) AS total_amount
+        FROM read_parquet(?, filename = true)
+        GROUP BY bank
+        ORDER BY bank
+        LIMIT ?
+        """,
+        [dataset_files(dataset, year)],
+        limit,
+        BankTotalModel,
+    )
+    return BankTotalListModel(rows=rows, limit=limit, truncated=truncated)
+
+
+def monthly_totals(
+        dataset: str,
+        year: int,
+        bank: str | None = None,
+        customer_id: int | None = None,
+        limit: int = 100,
+) -> MonthlyTotalListModel:
+    """
+    Number of customers, transactions and total amount per month for a year.
+
+    Args:
+        dataset (str): The dataset root, `s3://<banks_bucket>` or a local directory.
+        year (int): The year of the transactions.
+        bank (str | None): The bank of the transactions, all banks when None.
+        customer_id (int | None): The customer of the transactions, all customers when None.
+        limit (int): The maximum number of months to return.
+    Returns:
+        MonthlyTotalListModel: The monthly totals, ordered by month.
+    """
+    params = [dataset_files(dataset, year, bank)]
+    customer_filter = ""
+    if customer_id is not None:
+        customer_filter = "AND CUSTOMER_ID = ?"
+        params.append(customer_id)
+
+    rows, limit, truncated = _run_report(
+        dataset,
+        f"""
+        SELECT
+            CAST(date_trunc('month', TRXN_DATE) AS DATE) AS month,
+            count(DISTINCT CUSTOMER_ID) AS customers,
+            count(*) AS total_trxns,
+            coalesce(sum(TRXN_AMOUNT), 0) AS total_amount
+        FROM read_parquet(?)
+        WHERE TRXN_DATE IS NOT NULL {customer_filter}
+        GROUP BY month
+        ORDER BY month
+        LIMIT ?
+        """,
+        params,
+        limit,
+        MonthlyTotalModel,
+    )
+    return MonthlyTotalListModel(rows=rows, limit=limit, truncated=truncated)
@@ -0,0 +1,289 @@
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Callable, Iterable
+from aws_lambda_powertools import Logger
+import threading
+import time
+import uuid
+import os
+
+
+logger = Logger()
+
+# Redis-protocol endpoint shared by the containers, e.g. redis://host:6379/0
+CACHE_URL = os.getenv('CACHE_URL')
+CACHE_KEY_PREFIX = os.getenv('CACHE_KEY_PREFIX', 'oysirs:')
+# Bounds of the in-process backend
+CACHE_MAX_ENTRIES = int(os.getenv('CACHE_MAX_ENTRIES', '1024'))
+# How long a computation holds its single-flight lock at most, and how long the
+# other callers wait for its result before computing it themselves
+CACHE_LOCK_TTL_SECONDS = float(os.getenv('CACHE_LOCK_TTL_SECONDS', '30'))
+CACHE_LOCK_WAIT_SECONDS = float(os.getenv('CACHE_LOCK_WAIT_SECONDS', '10'))
+CACHE_LOCK_POLL_SECONDS = 0.05
+
+
+class Cache(ABC):
+    """
+    Cache of string values with TTLs, tag invalidation and single-flight computation.
+
+    The backends only store keys. Tags are generation counters: the key of an
+    entry includes the current generations of its tags, so incrementing a tag's
+    generation makes every entry tagged with it unreachable, and they expire
+    with their TTL.
+    """
+
+    @abstractmethod
+    def get_many(self, keys: list[str]) -> list[str | None]:
+        """Get the values of keys, None for the missing ones."""
+
+    @abstractmethod
+    def set(self, key: str, value: str, ttl: float) -> None:
+        """Set the value of a key for ttl seconds."""
+
+    @abstractmethod
+    def add(self, key: str, value: str, ttl: float) -> bool:
+        """Set the value of a key for ttl seconds unless it is set, returns whether it was set."""
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """Delete a key."""
+
+    @abstractmethod
+    def incr(self, key: str) -> int:
+        """Increment the integer value of a key without expiry, returns the new value."""
+
+    def get(self, key: str) -> str | None:
+        """Get the value of a key, None if missing."""
+        return self.get_many([key])[0]
+
+    def tagged_key(self, key: str, tags: Iterable[str] = ()) -> str:
+        """
+        Get the key of an entry under the current generations of its tags.
+        """
+        tags = sorted(tags)
+        if not tags:
+            return key
+        generations = self.get_many([f"tag:{tag}" for tag in tags])
+        return f"{key}@{'.'.join(generation or '0' for generation in generations)}"
+
+    def invalidate(self, *tags: str) -> None:
+        """
+        Invalidate every entry tagged with one of the tags.
+
+        Args:
+            *tags (str): The tags to invalidate.
+        """
+        for tag in tags:
+            self.incr(f"tag:{tag}")
+
+    def get_or_set(
+            self,
+            key: str,
+            compute: Callable[[], str | None],
+            ttl: float,
+            tags: Iterable[str] = (),
+    ) -> str | None:
+        """
+        Get the value of a key, computing and caching it when missing. Concurrent
+        callers missing the same key wait for a single computation, through a
+        lock in the cache, instead of all computing it at once. When the cache
+        fails, the value is computed without it.
+
+        Args:
+            key (str): The key of the value.
+            compute (Callable[[], str | None]): Computes the value, None is not cached.
+            ttl (float): The time to live of the value in seconds.
+            tags (Iterable[str]): The tags to invalidate the value by.
+
+        Returns:
+            str | None: The cached or computed value.
+        """
+        try:
+            key = self.tagged_key(key, tags)
+            value = self.get(key)
+            if value is not None:
+                return value
+
+            lock_key, token = f"lock:{key}", uuid.uuid4().hex
+            deadline = time.monotonic() + CACHE_LOCK_WAIT_SECONDS
+            while not (locked := self.add(lock_key, token, CACHE_LOCK_TTL_SECONDS)):
+                # Another caller is computing it
+                if time.monotonic() > deadline:
+                    logger.warning(f"Timed out waiting for the computation of {key}")
+                    break
+                time.sleep(CACHE_LOCK_POLL_SECONDS)
+                value = self.get(key)
+                if value is not None:
+                    return value
+        except Exception as e:
+            logger.warning(f"Cache unavailable, computing {key} without it: {e}")
+            locked = False
+        if not locked:
+            return compute()
+
+        try:
+            value = compute()
+        except Exception:
+            self._release(lock_key, token)
+            raise
+        try:
+            if value is not None:
+                self.set(key, value, ttl)
+        except Exception as e:
+            logger.warning(f"Failed to cache {key}: {e}")
+        self._release(lock_key, token)
+        return value
+
+    def _release(self, lock_key: str, token: str) -> None:
+        try:
+            # The lock may have expired and been taken by another caller meanwhile
+            if self.get(lock_key) == token:
+                self.delete(lock_key)
+        except Exception as e:
+            logger.warning(f"Failed to release the cache lock {lock_key}: {e}")
+
+
+class LRUCache(Cache):
+    """
+    In-process cache of the container, bounded by its number of entries. Its
+    invalidations are not seen by the other containers. Counters are kept
+    apart from the entries, so a tag generation is never evicted.
+    """
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._counters: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, key: str, now: float) -> str | None:
+        if key in self._counters:
+            return str(self._counters[key])
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= now:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def _set(self, key: str, value: str, ttl: float) -> None:
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get_many(self, keys: list[str]) -> list[str | None]:
+        now = time.monotonic()
+        with self._lock:
+            return [self._get(key, now) for key in keys]
+
+    def set(self, key: str, value: str, ttl: float) -> None:
+        with self._lock:
+            self._set(key, value, ttl)
+
+    def add(self, key: str, value: str, ttl: float) -> bool:
+        with self._lock:
+            if self._get(key, time.monotonic()) is not None:
+                return False
+            self._set(key, value, ttl)
+            return True
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def incr(self, key: str) -> int:
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+
+class RedisCache(Cache):
+    """
+    Cache shared by the containers on a Redis-protocol server. The tag
+    generations have no expiry, the server should only evict keys with one
+    (e.g. maxmemory-policy volatile-lru).
+
+    Args:
+        client: A redis.Redis client decoding the responses, or a stand-in with the same methods.
+        prefix (str): The prefix of the keys of the cache.
+    """
+
+    def __init__(self, client, prefix: str = CACHE_KEY_PREFIX) -> None:
+        self.client = client
+        self.prefix = prefix
+
+    def get_many(self, keys: list[str]) -> list[str | None]:
+        return self.client.mget([self.prefix + key for key in keys])
+
+    def set(self, key: str, value: str, ttl: float) -> None:
+        self.client.set(self.prefix + key, value, px=max(1, int(ttl * 1000)))
+
+    def add(self, key: str, value: str, ttl: float) -> bool:
+        return bool(self.client.set(self.prefix + key, value, px=max(1, int(ttl * 1000)), nx=True))
+
+    def delete(self, key: str) -> None:
+        self.client.delete(self.prefix + key)
+
+    def incr(self, key: str) -> int:
+        return self.client.incr(self.prefix + key)
+
+
+class NullCache(Cache):
+    """
+    Cache storing nothing, every value is computed. Used when there is no
+    CACHE_URL, as the entries of an in-process cache would not see the
+    invalidations published by the other containers.
+    """
+
+    def get_many(self, keys: list[str]) -> list[str | None]:
+        return [None] * len(keys)
+
+    def set(self, key: str, value: str, ttl: float) -> None:
+        pass
+
+    def add(self, key: str, value: str, ttl: float) -> bool:
+        return True
+
+    def delete(self, key: str) -> None:
+        pass
+
+    def incr(self, key: str) -> int:
+        return 0
+
+    def get_or_set(
+            self,
+            key: str,
+            compute: Callable[[], str | None],
+            ttl: float,
+            tags: Iterable[str] = (),
+    ) -> str | None:
+        return compute()
+
+
+_cache: Cache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> Cache:
+    """
+    Get the cache of the container, created on first use: a RedisCache when
+    CACHE_URL is set, otherwise a NullCache.
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            if CACHE_URL:
+                import redis
+
+                _cache = RedisCache(redis.Redis.from_url(
+                    CACHE_URL,
+                    decode_responses=True,
+                    socket_timeout=1,
+                    socket_connect_timeout=1,
+                ))
+            else:
+                _cache = NullCache()
+    return _cache
@@ -0,0 +1,18 @@
+# Tags of the cached API responses, invalidated by the processor when an upload completes
+
+# Responses built from the customers and their identifiers
+CUSTOMERS_TAG = 'customers'
+
+
+def transactions_tag(year: int) -> str:
+    """
+    Get the tag of the responses built from the transactions of a year.
+    """
+    return f"transactions:{year}"
+
+def upload_tags(year: int) -> list[str]:
+    """
+    Get the tags invalidated by the upload of a `{year}/{bank}` file, which
+    adds customers and identifiers, and replaces the transactions of the year.
+    """
+    return [CUSTOMERS_TAG, transactions_tag(year)]
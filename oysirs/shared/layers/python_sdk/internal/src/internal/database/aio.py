@@ -0,0 +1,88 @@
+from sqlalchemy import URL
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine, AsyncSession
+from contextlib import asynccontextmanager
+from typing import Any, Coroutine, TypeVar
+import asyncio
+import threading
+import os
+
+from .session import DATABASE_URL, DATABASE_READER_URL, _read_your_writes, instrument
+
+
+T = TypeVar("T")
+
+# The driver of the async engines, DATABASE_DRIVER is the one of the sync engines
+DATABASE_ASYNC_DRIVER = os.getenv("DATABASE_ASYNC_DRIVER", "postgresql+asyncpg")
+
+# Like the sync engines, the async engines are created on first use
+_engines: dict[bool, AsyncEngine] = {}
+_engine_lock = threading.Lock()
+# The connections of the async engines belong to the loop they were opened on,
+# so every coroutine of the container runs on the same loop
+_loop: asyncio.AbstractEventLoop | None = None
+
+
+def _async_url(url: URL) -> URL:
+    return url.set(drivername=DATABASE_ASYNC_DRIVER)
+
+def get_async_engine(readonly: bool = False) -> AsyncEngine:
+    """
+    Get the async engine shared by the async sessions, creating it on first use.
+
+    Args:
+        readonly (bool): Get the engine of the replica, whose transactions are read-only.
+
+    Returns:
+        AsyncEngine: The writer engine, or the reader engine when readonly is set.
+    """
+    with _engine_lock:
+        if not _engines:
+            writer = create_async_engine(_async_url(DATABASE_URL), pool_pre_ping=True)
+            instrument(writer.sync_engine)
+            if DATABASE_READER_URL == DATABASE_URL:
+                # Share the writer's pool when there is no replica
+                reader = writer.execution_options(postgresql_readonly=True)
+            else:
+                reader = create_async_engine(
+                    _async_url(DATABASE_READER_URL),
+                    pool_pre_ping=True,
+                    execution_options={"postgresql_readonly": True},
+                )
+                instrument(reader.sync_engine)
+            _engines.update({False: writer, True: reader})
+    return _engines[readonly]
+
+@asynccontextmanager
+async def get_async_session(readonly: bool = False):
+    """
+    Provide a transactional scope around a series of async operations, the async
+    counterpart of get_session.
+
+    Args:
+        readonly (bool): Run the operations in a read-only transaction on the
+            replica, or on the writer within read_your_writes.
+    """
+    readonly = readonly and not _read_your_writes.get()
+    async with AsyncSession(get_async_engine(readonly), expire_on_commit=False) as session:
+        try:
+            yield session
+            await session.commit()
+        except Exception:
+            await session.rollback()
+            raise
+
+def run(coroutine: Coroutine[Any, Any, T]) -> T:
+    """
+    Run a coroutine from sync code, such as a route of the REST handler, on the
+    event loop of the container. Not thread safe, like a Lambda invocation.
+
+    Args:
+        coroutine (Coroutine): The coroutine to run.
+
+    Returns:
+        T: The result of the coroutine.
+    """
+    global _loop
+    if _loop is None or _loop.is_closed():
+        _loop = asyncio.new_event_loop()
+    return _loop.run_until_complete(coroutine)
@@ -0,0 +1,87 @@
+import os
+import re
+
+
+# Country calling code assumed for mobile numbers written in the national format
+DEFAULT_COUNTRY_CODE = os.getenv('DEFAULT_COUNTRY_CODE', '234')
+# Length of a national significant number, without the trunk prefix 0
+NATIONAL_NUMBER_LENGTH = int(os.getenv('NATIONAL_NUMBER_LENGTH', '10'))
+
+_NON_DIGITS = re.compile(r'\D')
+_NON_ALPHANUMERICS = re.compile(r'[^0-9A-Z]')
+_WHITESPACE = re.compile(r'\s+')
+
+
+def canonical_email(email: str) -> str:
+    """
+    Get the canonical key of an email: trimmed and lowercased.
+    """
+    return email.strip().lower()
+
+def canonical_mobile_no(mobile_no: str) -> str:
+    """
+    Get the canonical key of a mobile number in E.164 format, so that
+    `+2348031234567`, `2348031234567`, `08031234567` and `0803 123 4567`
+    share one key. Numbers without a country code get DEFAULT_COUNTRY_CODE.
+    """
+    value = mobile_no.strip()
+    digits = _NON_DIGITS.sub('', value)
+    if not digits:
+        return ''
+    if value.startswith('+'):
+        return f"+{digits}"
+    if digits.startswith('00'):
+        return f"+{digits[2:]}"
+    if len(digits) == NATIONAL_NUMBER_LENGTH + 1 and digits.startswith('0'):
+        return f"+{DEFAULT_COUNTRY_CODE}{digits[1:]}"
+    if len(digits) == NATIONAL_NUMBER_LENGTH:
+        return f"+{DEFAULT_COUNTRY_CODE}{digits}"
+    return f"+{digits}"
+
+def canonical_registration_no(registration_no: str) -> str:
+    """
+    Get the canonical key of a tax ID or TIN: uppercased with the spaces and
+    punctuation stripped, e.g. `1234-5678 001` is `12345678001`.
+    """
+    return _NON_ALPHANUMERICS.sub('', registration_no.upper())
+
+def canonical_rc(rc: str) -> str:
+    """
+    Get the canonical key of an RC number: stripped like the tax IDs and
+    without the `RC` prefix, e.g. `RC-123456` and `123456` are `123456`.
+    """
+    rc = canonical_registration_no(rc)
+    return rc.removeprefix('RC') or rc
+
+def canonical_text(text: str) -> str:
+    """
+    Get the canonical key of a name or an address: lowercased with the
+    whitespace collapsed.
+    """
+    return _WHITESPACE.sub(' ', text).strip().lower()
+
+
+_CANONICALIZERS = {
+    'name': canonical_text,
+    'address': canonical_text,
+    'mobile_no': canonical_mobile_no,
+    'email': canonical_email,
+    'tax_id': canonical_registration_no,
+    'tin': canonical_registration_no,
+    'rc': canonical_rc,
+}
+
+
+def canonicalize(kind: str, value: str) -> str | None:
+    """
+    Get the canonical key of an identifier, matched exactly by ingestion and search.
+
+    Args:
+        kind (str): The kind of identifier, one of the customer_identifiers kinds.
+        value (str): The identifier as written in the source.
+
+    Returns:
+        str | None: The canonical key of the identifier, None when nothing is
+            left of it, e.g. a TIN of punctuation only, which matches nothing.
+    """
+    return _CANONICALIZERS[kind](value) or None
@@ -1,12 +1,157 @@
 import os
+import json
+import time
+import asyncio
+import hashlib
 from internal.database.session import get_session
+from internal.database.helpers.canonical import canonicalize
 from internal.database.schemas.customer import *
 from internal.database.models.customer import *
+from internal.database.schemas.transaction import CustomerTrxnSummary
+from internal.database.schemas.upload import Upload
+from internal.database.models.upload import UploadStatus
 import sqlalchemy as sa
-from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.dialects.postgresql import insert, aggregate_order_by
 from sqlalchemy.orm import joinedload
 
 
+# Number of values bound in each IN clause of the bulk lookups
+LOOKUP_CHUNK_SIZE = 500
+
+# Kind of identifier -> the CustomerModel field holding its entries
+IDENTIFIER_FIELDS = {
+    'name': 'names',
+    'address': 'addresses',
+    'mobile_no': 'mobiles',
+    'email': 'emails',
+    'tax_id': 'tax_ids',
+    'tin': 'tins',
+    'rc': 'rcs',
+}
+# Kind of identifier -> the CustomerLookupRequestModel field holding its values,
+# in the order they are trusted to resolve a customer
+LOOKUP_FIELDS = {
+    'email': 'emails',
+    'mobile_no': 'mobile_nos',
+    'tax_id': 'tax_ids',
+    'tin': 'tins',
+    'rc': 'rcs',
+}
+
+
+def _json_timestamp(column) -> sa.Function:
+    """
+    Format a timestamp column as Pydantic serializes the naive datetime it
+    holds: with all six digits of the microseconds, and without them when they
+    are zero. PostgreSQL's own JSON rendering trims their trailing zeros.
+
+    Args:
+        column: The timestamp column (e.g. Customer.created_at).
+
+    Returns:
+        sa.Function: The ISO 8601 text of the timestamp.
+    """
+    return sa.func.regexp_replace(
+        sa.func.to_char(column, 'YYYY-MM-DD"T"HH24:MI:SS.US'),
+        r'\.000000$',
+        '',
+    )
+
+def _json_collection(schema, column) -> sa.ScalarSelect:
+    """
+    Build a correlated subquery aggregating a customer collection into a JSON array.
+    The object keys follow the field order of the matching Pydantic model.
+
+    Args:
+        schema: The identifier table to aggregate (e.g. CustomerName).
+        column: The value column of that table (e.g. CustomerName.name).
+
+    Returns:
+        sa.ScalarSelect: A JSON array of the customer's entries, '[]' when there are none.
+    """
+    entry = sa.func.json_build_object(
+        'id', schema.id,
+        'created_at', _json_timestamp(schema.created_at),
+        'updated_at', _json_timestamp(schema.updated_at),
+        column.key, column,
+    )
+    return (
+        sa.select(sa.func.coalesce(
+            sa.func.json_agg(aggregate_order_by(entry, schema.id)),
+            sa.literal_column("'[]'::json"),
+        ))
+        .where(schema.customer_id == Customer.id)
+        .scalar_subquery()
+    )
+
+def _customer_json():
+    """
+    Build a JSON object of a customer with the same shape as CustomerModel.
+    """
+    return sa.func.json_build_object(
+        'id', Customer.id,
+        'created_at', _json_timestamp(Customer.created_at),
+        'updated_at', _json_timestamp(Customer.updated_at),
+        'names', _json_collection(CustomerName, CustomerName.name),
+        'addresses', _json_collection(CustomerAddress, CustomerAddress.address),
+        'mobiles', _json_collection(CustomerMobileNo, CustomerMobileNo.mobile_no),
+        'emails', _json_collection(CustomerEmail, CustomerEmail.email),
+        'tax_ids', _json_collection(CustomerTaxId, CustomerTaxId.tax_id),
+        'tins', _json_collection(CustomerTin, CustomerTin.tin),
+        'rcs', _json_collection(CustomerRc, CustomerRc.rc),
+    )
+
+def filter_customers(
+        query: sa.Select,
+        name: str | None = None,
+        email: str | None = None,
+        mobile_no: str | None = None,
+        tax_id: str | None = None,
+        tin: str | None = None,
+        rc: str | None = None,
+) -> sa.Select:
+    """
+    Apply the customer search filters to a query selecting from the customers table.
+    The filters are matched against customer_identifiers in one semi-join, a
+    customer matches when each filter matches one of their identifiers. Names
+    and addresses match by substring, the other identifiers match their
+    canonical key exactly.
+
+    Args:
+        query (sa.Select): The query to filter, e.g. sa.select(Customer.id).
+        name (str | None): A substring of one of the customer's names.
+        email (str | None): One of the customer's emails.
+        mobile_no (str | None): One of the customer's mobile numbers.
+        tax_id (str | None): One of the customer's tax IDs.
+        tin (str | None): One of the customer's TINs.
+        rc (str | None): One of the customer's RC numbers.
+    Returns:
+        sa.Select: The query restricted to the matching customers.
+    """
+    filters = {
+        'name': name,
+        'email': email,
+        'mobile_no': mobile_no,
+        'tax_id': tax_id,
+        'tin': tin,
+        'rc': rc,
+    }
+    conditions = [
+        _identifiers_in([(kind, value)]) if kind in IDENTIFYING_KINDS
+        else sa.and_(CustomerIdentifier.kind == kind, CustomerIdentifier.value.ilike(f"%{value}%"))
+        for kind, value in filters.items() if value
+    ]
+    if not conditions:
+        return query
+    matches = (
+        sa.select(CustomerIdentifier.customer_id)
+        .where(sa.or_(*conditions))
+        .group_by(CustomerIdentifier.customer_id)
+        .having(sa.func.count(sa.distinct(CustomerIdentifier.kind)) == len(conditions))
+    )
+    return query.where(Customer.id.in_(matches))
+
+
 def get_customer_by_id(customer_id: str) -> CustomerModel | None:
     """
     Retrieve a customer from the customers table by their ID.
@@ -17,12 +162,175 @@ def get_customer_by_id(customer_id: str) -> CustomerModel | None:
     Returns:
         CustomerModel | None: The customer data if found, otherwise None.
     """
-    with get_session() as session:
+    with get_session(readonly=True) as session:
         customer = session.get(Customer, customer_id)
         if customer:
             return CustomerModel.model_validate(customer)
     return None
 
+def get_customer_json_by_id(customer_id: int) -> str | None:
+    """
+    Retrieve a customer by their ID as a JSON document built by PostgreSQL.
+    The document has the same shape as CustomerModel, so it can be returned
+    to the client without going through the ORM and Pydantic.
+
+    Args:
+        customer_id (int): The ID of the customer to retrieve.
+
+    Returns:
+        str | None: The customer JSON if found, otherwise None.
+    """
+    with get_session(readonly=True) as session:
+        return session.scalar(
+            sa.select(sa.cast(_customer_json(), sa.Text)).where(Customer.id == customer_id)
+        )
+
+def _summary_banks(year: int, bank: str | None = None) -> sa.Subquery:
+    """
+    Select the banks a customer's transaction summaries are listed for: those
+    with a completed upload of the year, and those the customer has rollups of.
+    """
+    upload_banks = sa.select(Upload.bank).where(Upload.year == year, Upload.status == UploadStatus.COMPLETED)
+    rollup_banks = (
+        sa.select(CustomerTrxnSummary.bank)
+        .where(CustomerTrxnSummary.customer_id == Customer.id, CustomerTrxnSummary.year == year)
+        .correlate(Customer)
+    )
+    if bank:
+        upload_banks = upload_banks.where(Upload.bank == bank)
+        rollup_banks = rollup_banks.where(CustomerTrxnSummary.bank == bank)
+    return sa.union(upload_banks, rollup_banks).subquery('banks')
+
+def _customer_with_stats_select(customer_id: int, year: int, bank: str | None = None) -> sa.Select:
+    """
+    Select the CustomerWithStatsModel JSON of a customer, see get_customer_with_stats_json.
+    """
+    banks = _summary_banks(year, bank)
+    summary = sa.func.json_build_object(
+        'bank', banks.c.bank,
+        'total_trxns', sa.func.coalesce(CustomerTrxnSummary.total_trxns, 0),
+        'total_amount', sa.func.coalesce(CustomerTrxnSummary.total_amount, 0),
+    )
+    summaries = (
+        sa.select(sa.func.coalesce(
+            sa.func.json_agg(aggregate_order_by(summary, banks.c.bank)),
+            sa.literal_column("'[]'::json"),
+        ))
+        .select_from(banks.outerjoin(CustomerTrxnSummary, sa.and_(
+            CustomerTrxnSummary.customer_id == Customer.id,
+            CustomerTrxnSummary.year == year,
+            CustomerTrxnSummary.bank == banks.c.bank,
+        )))
+        .correlate(Customer)
+    )
+    return sa.select(sa.cast(sa.func.json_build_object(
+        'customer', _customer_json(),
+        'trxn_summary', summaries.scalar_subquery(),
+    ), sa.Text)).where(Customer.id == customer_id)
+
+def get_customer_with_stats_json(customer_id: int, year: int, bank: str | None = None) -> str | None:
+    """
+    Retrieve a customer by their ID with their transaction summaries as a JSON
+    document built by PostgreSQL. The summaries are read from the precomputed
+    customers_trxn_summary rollups and the document has the same shape as
+    CustomerWithStatsModel. Like the transaction files they replace, there is
+    a summary for every bank with a completed upload of the year, with zero
+    totals for the banks the customer has no transactions in.
+
+    Args:
+        customer_id (int): The ID of the customer to retrieve.
+        year (int): The year of the transactions to summarize.
+        bank (str | None): The bank of the transactions to summarize, all banks when None.
+
+    Returns:
+        str | None: The customer JSON if found, otherwise None.
+    """
+    with get_session(readonly=True) as session:
+        return session.scalar(_customer_with_stats_select(customer_id, year, bank))
+
+def _customer_version_select(customer_id: int, year: int, bank: str | None = None) -> sa.Select:
+    """
+    Select what the version of a customer is derived from, see get_customer_version.
+    """
+    def ids(schema, *criteria) -> sa.ScalarSelect:
+        return (
+            sa.select(sa.func.array_agg(aggregate_order_by(schema.id, schema.id)))
+            .where(schema.customer_id == Customer.id, *criteria)
+            .scalar_subquery()
+        )
+
+    summaries = [CustomerTrxnSummary.year == year]
+    if bank:
+        summaries.append(CustomerTrxnSummary.bank == bank)
+    banks = _summary_banks(year, bank)
+    return sa.select(
+        Customer.updated_at,
+        ids(CustomerName),
+        ids(CustomerAddress),
+        ids(CustomerMobileNo),
+        ids(CustomerEmail),
+        ids(CustomerTaxId),
+        ids(CustomerTin),
+        ids(CustomerRc),
+        ids(CustomerTrxnSummary, *summaries),
+        sa.select(sa.func.array_agg(aggregate_order_by(banks.c.bank, banks.c.bank))).scalar_subquery(),
+    ).where(Customer.id == customer_id)
+
+def _customer_version(customer_id: int, year: int, bank: str | None, version: sa.Row | None) -> str | None:
+    if version is None:
+        return None
+    return hashlib.sha256(repr((customer_id, year, bank, *version)).encode()).hexdigest()
+
+def get_customer_version(customer_id: int, year: int, bank: str | None = None) -> str | None:
+    """
+    Get a version of a customer with their transaction summaries, which changes
+    whenever the customer, one of their identifiers, one of the rollups of the
+    year and bank or the banks with a completed upload of the year change. Identifier rows are never updated in place and rollups
+    are replaced on reload, so their IDs identify their content.
+    Used as the ETag of GET /customers/<customer_id>.
+
+    Args:
+        customer_id (int): The ID of the customer.
+        year (int): The year of the transaction summaries.
+        bank (str | None): The bank of the transaction summaries, all banks when None.
+
+    Returns:
+        str | None: The version of the customer if found, otherwise None.
+    """
+    with get_session(readonly=True) as session:
+        version = session.execute(_customer_version_select(customer_id, year, bank)).one_or_none()
+    return _customer_version(customer_id, year, bank, version)
+
+async def get_customer_detail_async(customer_id: int, year: int, bank: str | None = None) -> tuple[str | None, str | None]:
+    """
+    Get the version of a customer and their CustomerWithStatsModel JSON with
+    the async driver, like get_customer_version and get_customer_with_stats_json.
+    Both queries run concurrently on their own connections, so the detail takes
+    one round trip instead of two, at the cost of building the JSON of the
+    customers that turn out not to be modified.
+
+    Args:
+        customer_id (int): The ID of the customer.
+        year (int): The year of the transaction summaries.
+        bank (str | None): The bank of the transaction summaries, all banks when None.
+
+    Returns:
+        tuple[str | None, str | None]: The version and the JSON of the customer, None if not found.
+    """
+    # Imported here so the sync callers never load the async driver
+    from internal.database.aio import get_async_session
+
+    async def version() -> str | None:
+        async with get_async_session(readonly=True) as session:
+            result = await session.execute(_customer_version_select(customer_id, year, bank))
+            return _customer_version(customer_id, year, bank, result.one_or_none())
+
+    async def customer() -> str | None:
+        async with get_async_session(readonly=True) as session:
+            return await session.scalar(_customer_with_stats_select(customer_id, year, bank))
+
+    return tuple(await asyncio.gather(version(), customer()))
+
 def insert_or_update_customer(customer: CustomerModel) -> int:
     """
     Insert or update a customer in the customers table.
@@ -58,6 +366,18 @@ def insert_or_update_customer(customer: CustomerModel) -> int:
         if customer.rcs:
             rcs = [{"rc": entry.rc, "customer_id": customer_id} for entry in customer.rcs]
             session.execute(insert(CustomerRc).values(rcs).on_conflict_do_nothing())
+        identifiers = [
+            {
+                "kind": kind,
+                "value": getattr(entry, kind),
+                "canonical": canonicalize(kind, getattr(entry, kind)),
+                "customer_id": customer_id,
+            }
+            for kind, field in IDENTIFIER_FIELDS.items()
+            for entry in getattr(customer, field)
+        ]
+        if identifiers:
+            session.execute(insert(CustomerIdentifier).values(identifiers).on_conflict_do_nothing())
     return customer_id
 
 def list_customers(
@@ -89,21 +409,16 @@ def list_customers(
     # Implement the logic to query the customers table with the provided filters
     # and return the list of customers.
 
-    with get_session() as session:
-        query = sa.select(Customer)
-
-        if name:
-            query = query.join(Customer.names).filter(CustomerName.name.ilike(f"%{name}%"))
-        if email:
-            query = query.join(Customer.emails).filter(CustomerEmail.email.ilike(f"%{email}%"))
-        if mobile_no:
-            query = query.join(Customer.mobiles).filter(CustomerMobileNo.mobile_no.ilike(f"%{mobile_no}%"))
-        if tax_id:
-            query = query.join(Customer.tax_ids).filter(CustomerTaxId.tax_id.ilike(f"%{tax_id}%"))
-        if tin:
-            query = query.join(Customer.tins).filter(CustomerTin.tin.ilike(f"%{tin}%"))
-        if rc:
-            query = query.join(Customer.rcs).filter(CustomerRc.rc.ilike(f"%{rc}%"))
+    with get_session(readonly=True) as session:
+        query = filter_customers(
+            sa.select(Customer),
+            name=name,
+            email=email,
+            mobile_no=mobile_no,
+            tax_id=tax_id,
+            tin=tin,
+            rc=rc,
+        )
 
         # Count total before applying pagination
         count_query = sa.select(sa.func.count()).select_from(
@@ -125,8 +440,7 @@ def list_customers(
         ).distinct()
 
         # Pagination
-        query = query.offset(offset).limit(limit)
-        print(query.compile(compile_kwargs={"literal_binds": True}))
+        query = query.order_by(Customer.id).offset(offset).limit(limit)
         customers = session.scalars(query).unique().all()
         return CustomerListModel(
             customers=[CustomerModel.model_validate(c) for c in customers],
@@ -135,62 +449,273 @@ def list_customers(
             limit=limit
         )
 
-def get_customer_id_from_emails(emails: list[str]) -> int | None:
+def list_customers_json(
+        name: str | None = None,
+        email: str | None = None,
+        mobile_no: str | None = None,
+        tax_id: str | None = None,
+        tin: str | None = None,
+        rc: str | None = None,
+        offset: int = 0,
+        limit: int = 10,
+) -> str:
     """
-    Retrieve a customer ID from the customers_email table by their email.
+    List customers with optional filters as a JSON document built by PostgreSQL.
+    The document has the same shape as CustomerListModel and is assembled in a
+    single statement, with customers ordered by their ID.
 
     Args:
-        emails (list[str]): The list of emails to search for.
+        name (str | None): The name of the customer to filter by.
+        email (str | None): The email of the customer to filter by.
+        mobile_no (str | None): The mobile number of the customer to filter by.
+        tax_id (str | None): The tax ID of the customer to filter by.
+        tin (str | None): The TIN of the customer to filter by.
+        rc (str | None): The RC of the customer to filter by.
+        offset (int): The offset for pagination.
+        limit (int): The maximum number of records to return.
+
+    Returns:
+        str: The CustomerListModel shaped JSON of the customers matching the filters.
     """
-    with get_session() as session:
+    with get_session(readonly=True) as session:
+        matches = filter_customers(
+            sa.select(Customer.id),
+            name=name,
+            email=email,
+            mobile_no=mobile_no,
+            tax_id=tax_id,
+            tin=tin,
+            rc=rc,
+        ).distinct().subquery()
+
+        page = sa.select(matches.c.id).order_by(matches.c.id).offset(offset).limit(limit)
+        customers = (
+            sa.select(sa.func.coalesce(
+                sa.func.json_agg(aggregate_order_by(_customer_json(), Customer.id)),
+                sa.literal_column("'[]'::json"),
+            ))
+            .where(Customer.id.in_(page))
+            .scalar_subquery()
+        )
+        total = sa.select(sa.func.count()).select_from(matches).scalar_subquery()
+
         return session.scalar(
-            sa.select(CustomerEmail.customer_id).where(CustomerEmail.email.in_(emails))
+            sa.select(sa.cast(sa.func.json_build_object(
+                'customers', customers,
+                'total', total,
+                'offset', sa.literal(offset, sa.Integer),
+                'limit', sa.literal(limit, sa.Integer),
+            ), sa.Text))
         )
 
-def get_customer_id_from_mobile_nos(mobile_nos: list[str]) -> int | None:
+def lookup_customers_json(lookup: CustomerLookupRequestModel) -> str:
     """
-    Retrieve a customer ID from the customers_mobile_no table by their mobile number.
+    Resolve customer IDs and raw identifiers to customers in bulk, as a JSON
+    document with the same shape as CustomerLookupModel. The identifiers of all
+    kinds are resolved by their canonical keys against customer_identifiers with
+    one set-based query per chunk of LOOKUP_CHUNK_SIZE values, and the customers
+    are built by PostgreSQL, so the number of statements does not grow with the
+    number of values. Values that match nothing are left out.
 
     Args:
-        mobile_nos (list[str]): The list of mobile numbers to search for.
+        lookup (CustomerLookupRequestModel): The customer IDs and identifiers to resolve.
+
+    Returns:
+        str: The CustomerLookupModel shaped JSON of the matching customers and identifiers.
+    """
+    identifiers = [
+        (kind, value)
+        for kind, field in LOOKUP_FIELDS.items()
+        for value in dict.fromkeys(getattr(lookup, field))
+    ]
+    result = {'customers': {}, **{field: {} for field in LOOKUP_FIELDS.values()}}
+    with get_session(readonly=True) as session:
+        for idx in range(0, len(identifiers), LOOKUP_CHUNK_SIZE):
+            chunk = identifiers[idx:idx + LOOKUP_CHUNK_SIZE]
+            matches = session.execute(
+                sa.select(CustomerIdentifier.kind, CustomerIdentifier.value, CustomerIdentifier.canonical, CustomerIdentifier.customer_id)
+                .where(_identifiers_in(chunk))
+            )
+            # An identifier shared by several customers resolves to the oldest one
+            customers = {}
+            for kind, value, canonical, customer_id in matches:
+                for key in {(kind, value), (kind, canonical)}:
+                    customers[key] = min(customer_id, customers.get(key, customer_id))
+            for kind, value in chunk:
+                key = canonicalize(kind, value)
+                customer_id = customers.get((kind, key), customers.get((kind, value))) if key else None
+                if customer_id is not None:
+                    result[LOOKUP_FIELDS[kind]][value] = customer_id
+
+        customer_ids = sorted(set(lookup.ids).union(*(result[field].values() for field in LOOKUP_FIELDS.values())))
+        for idx in range(0, len(customer_ids), LOOKUP_CHUNK_SIZE):
+            customers = session.scalar(
+                sa.select(sa.cast(sa.func.json_object_agg(Customer.id, _customer_json()), sa.Text))
+                .where(Customer.id.in_(customer_ids[idx:idx + LOOKUP_CHUNK_SIZE]))
+            )
+            if customers:
+                result['customers'].update(json.loads(customers))
+    return json.dumps(result)
+
+def _identifiers_in(identifiers: list[tuple[str, str]]) -> sa.ColumnElement[bool]:
+    """
+    Match customer_identifiers rows against (kind, value) pairs by canonical key,
+    with one `kind = ... AND canonical IN (...)` index condition per kind. The raw
+    values are matched too, for the rows the canonical keys are not backfilled for.
+    Values without a canonical key are left out.
     """
+    values = {}
+    for kind, value in identifiers:
+        key = canonicalize(kind, value)
+        # Values without a canonical key match nothing, not even the same raw value
+        if key is None:
+            continue
+        raw, canonical = values.setdefault(kind, (set(), set()))
+        raw.add(value)
+        canonical.add(key)
+    if not values:
+        return sa.false()
+    return sa.or_(*(
+        sa.and_(
+            CustomerIdentifier.kind == kind,
+            sa.or_(CustomerIdentifier.canonical.in_(sorted(canonical)), CustomerIdentifier.value.in_(sorted(raw))),
+        )
+        for kind, (raw, canonical) in values.items()
+    ))
+
+def resolve_customer_id(
+        emails: list[str] | None = None,
+        mobile_nos: list[str] | None = None,
+        tax_ids: list[str] | None = None,
+        tins: list[str] | None = None,
+        rcs: list[str] | None = None,
+) -> int | None:
+    """
+    Resolve the customer of a set of identifiers with one query on the canonical
+    keys of customer_identifiers. Emails are trusted first, then mobile numbers,
+    tax IDs, TINs and RCs.
+
+    Args:
+        emails (list[str] | None): The emails to search for.
+        mobile_nos (list[str] | None): The mobile numbers to search for.
+        tax_ids (list[str] | None): The tax IDs to search for.
+        tins (list[str] | None): The TINs to search for.
+        rcs (list[str] | None): The RCs to search for.
+
+    Returns:
+        int | None: The ID of the matching customer if found, otherwise None.
+    """
+    values = {'email': emails, 'mobile_no': mobile_nos, 'tax_id': tax_ids, 'tin': tins, 'rc': rcs}
+    identifiers = [
+        (kind, value)
+        for kind in LOOKUP_FIELDS
+        for value in values[kind] or []
+        if canonicalize(kind, value) is not None
+    ]
+    if not identifiers:
+        return None
+    priority = sa.case({kind: idx for idx, kind in enumerate(LOOKUP_FIELDS)}, value=CustomerIdentifier.kind)
     with get_session() as session:
         return session.scalar(
-            sa.select(CustomerMobileNo.customer_id).where(CustomerMobileNo.mobile_no.in_(mobile_nos))
+            sa.select(CustomerIdentifier.customer_id)
+            .where(_identifiers_in(identifiers))
+            .order_by(priority, CustomerIdentifier.id)
+            .limit(1)
         )
 
+def get_customer_id_from_emails(emails: list[str]) -> int | None:
+    """
+    Retrieve a customer ID from customer_identifiers by their email.
+
+    Args:
+        emails (list[str]): The list of emails to search for.
+    """
+    return resolve_customer_id(emails=emails)
+
+def get_customer_id_from_mobile_nos(mobile_nos: list[str]) -> int | None:
+    """
+    Retrieve a customer ID from customer_identifiers by their mobile number.
+
+    Args:
+        mobile_nos (list[str]): The list of mobile numbers to search for.
+    """
+    return resolve_customer_id(mobile_nos=mobile_nos)
+
 def get_customer_id_from_tax_ids(tax_ids: list[str]) -> int | None:
     """
-    Retrieve a customer ID from the customers_tax_id table by their tax ID.
+    Retrieve a customer ID from customer_identifiers by their tax ID.
 
     Args:
         tax_ids (list[str]): The list of tax IDs to search for.
     """
-    with get_session() as session:
-        return session.scalar(
-            sa.select(CustomerTaxId.customer_id).where(CustomerTaxId.tax_id.in_(tax_ids))
-        )
+    return resolve_customer_id(tax_ids=tax_ids)
 
 def get_customer_id_from_tins(tins: list[str]) -> int | None:
     """
-    Retrieve a customer ID from the customers_tin table by their TIN.
+    Retrieve a customer ID from customer_identifiers by their TIN.
 
     Args:
         tins (list[str]): The list of TINs to search for.
     """
-    with get_session() as session:
-        return session.scalar(
-            sa.select(CustomerTin.customer_id).where(CustomerTin.tin.in_(tins))
-        )
+    return resolve_customer_id(tins=tins)
 
 def get_customer_id_from_rcs(rcs: list[str]) -> int | None:
     """
-    Retrieve a customer ID from the customers_rc table by their RC.
+    Retrieve a customer ID from customer_identifiers by their RC.
 
     Args:
         rcs (list[str]): The list of RCs to search for.
     """
-    with get_session() as session:
-        return session.scalar(
-            sa.select(CustomerRc.customer_id).where(CustomerRc.rc.in_(rcs))
-        )
\ No newline at end of file
+    return resolve_customer_id(rcs=rcs)
+
+def backfill_canonical_identifiers(
+        batch_size: int = 1000,
+        pause_seconds: float = 0.0,
+        max_seconds: float | None = None,
+) -> int:
+    """
+    Set the canonical keys of the customer_identifiers rows written before they
+    existed. Rows are updated in batches of increasing IDs, each committed on
+    its own and followed by a pause, so the backfill does not starve ingestion.
+    The values without a canonical key are left None and not counted.
+
+    Args:
+        batch_size (int): The number of rows updated per batch.
+        pause_seconds (float): The pause between two batches.
+        max_seconds (float | None): Stop after the batch running past this many seconds, no limit when None.
+
+    Returns:
+        int: The number of rows given a key, 0 once all the rows are backfilled.
+    """
+    started_at = time.monotonic()
+    total = 0
+    last_id = 0
+    while max_seconds is None or time.monotonic() - started_at < max_seconds:
+        with get_session() as session:
+            rows = session.execute(
+                sa.select(CustomerIdentifier.id, CustomerIdentifier.kind, CustomerIdentifier.value)
+                .where(CustomerIdentifier.canonical.is_(None), CustomerIdentifier.id > last_id)
+                .order_by(CustomerIdentifier.id)
+                .limit(batch_size)
+            ).all()
+            if not rows:
+                break
+            data = [
+                (row.id, key)
+                for row in rows
+                if (key := canonicalize(row.kind, row.value)) is not None
+            ]
+            if data:
+                keys = sa.values(
+                    sa.column('id', sa.Integer), sa.column('canonical', sa.String), name='keys'
+                ).data(data)
+                session.execute(
+                    sa.update(CustomerIdentifier)
+                    .where(CustomerIdentifier.id == keys.c.id)
+                    .values(canonical=keys.c.canonical)
+                    .execution_options(synchronize_session=False)
+                )
+        total += len(data)
+        last_id = rows[-1].id
+        time.sleep(pause_seconds)
+    return total
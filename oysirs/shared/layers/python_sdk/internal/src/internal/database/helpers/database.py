@@ -2,12 +2,25 @@ import os
 from sqlalchemy import URL
 
 
-def get_database_url() -> URL | None:
+def get_database_url(reader: bool = False) -> URL | None:
+    """
+    Get the URL of the database from the DATABASE_* environment variables.
+
+    Args:
+        reader (bool): Get the URL of the read replica, from DATABASE_READER_HOST and
+            DATABASE_READER_PORT, falling back to the writer's when they are not set.
+
+    Returns:
+        URL | None: The URL of the database, or None when it is not configured.
+    """
     db_driver = os.getenv("DATABASE_DRIVER", "postgresql+psycopg2")
     db_username = os.getenv('DATABASE_USERNAME')
     db_password = os.getenv('DATABASE_PASSWORD')
     db_host = os.getenv('DATABASE_HOST')
     db_port = os.getenv('DATABASE_PORT')
+    if reader:
+        db_host = os.getenv('DATABASE_READER_HOST') or db_host
+        db_port = os.getenv('DATABASE_READER_PORT') or db_port
     db_name = os.getenv('DATABASE_NAME')
 
     if all((db_username, db_password, db_host, db_port, db_name)):
@@ -0,0 +1,132 @@
+from internal.database.models.export import *
+from internal.database.schemas.export import *
+from internal.database.schemas.customer import *
+from internal.database.helpers.customer import filter_customers
+from internal.database.session import get_session
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from typing import Iterator
+
+
+# Number of customers read by each of the short export transactions
+EXPORT_BATCH_SIZE = 1000
+EXPORT_COLUMNS = ["id", "names", "addresses", "mobile_nos", "emails", "tax_ids", "tins", "rcs", "created_at", "updated_at"]
+
+
+def create_customer_export(filters: CustomerExportFiltersModel) -> CustomerExportModel:
+    """
+    Create a pending customer export job.
+
+    Args:
+        filters (CustomerExportFiltersModel): The customer search filters to export the matches of.
+    Returns:
+        CustomerExportModel: The created export.
+    """
+    with get_session() as session:
+        export = CustomerExport(
+            filters=filters.model_dump(exclude_none=True),
+            status=ExportStatus.PENDING,
+        )
+        session.add(export)
+        session.flush()
+        return CustomerExportModel.model_validate(export)
+
+def get_customer_export(export_id: int) -> CustomerExportModel | None:
+    """
+    Retrieve a customer export job by its ID.
+
+    Args:
+        export_id (int): The ID of the export.
+    Returns:
+        CustomerExportModel | None: The export if found, otherwise None.
+    """
+    with get_session(readonly=True) as session:
+        export = session.get(CustomerExport, export_id)
+        if export:
+            return CustomerExportModel.model_validate(export)
+    return None
+
+def update_customer_export(
+        export_id: int,
+        status: ExportStatus,
+        total_rows: int | None = None,
+        key: str | None = None,
+        message: str | None = None,
+) -> None:
+    """
+    Update the status of a customer export job, and its result once completed.
+
+    Args:
+        export_id (int): The ID of the export.
+        status (ExportStatus): The new status of the export.
+        total_rows (int | None): The number of exported customers, unchanged when None.
+        key (str | None): The S3 key of the export file, unchanged when None.
+        message (str | None): The status message, unchanged when None.
+    """
+    values = {"status": status, "total_rows": total_rows, "key": key, "message": message}
+    with get_session() as session:
+        session.execute(
+            sa.update(CustomerExport)
+            .where(CustomerExport.id == export_id)
+            .values({k: v for k, v in values.items() if v is not None})
+        )
+
+def _joined_collection(schema, column) -> sa.ScalarSelect:
+    """
+    Build a correlated subquery joining a customer collection into a '; ' separated string.
+    """
+    return (
+        sa.select(sa.func.string_agg(column, aggregate_order_by(sa.literal_column("'; '"), schema.id)))
+        .where(schema.customer_id == Customer.id)
+        .scalar_subquery()
+    )
+
+def iter_customer_export_batches(
+        filters: CustomerExportFiltersModel,
+        batch_size: int = EXPORT_BATCH_SIZE,
+) -> Iterator[list[tuple]]:
+    """
+    Iterate over the customers matching the search filters in batches of flat
+    rows with the EXPORT_COLUMNS, ordered by ID. Each batch is read in its own
+    short read-only transaction, resuming after the last ID of the previous
+    batch, so a large export never holds a transaction open or more than one
+    batch in memory.
+
+    Args:
+        filters (CustomerExportFiltersModel): The customer search filters.
+        batch_size (int): The maximum number of customers of each batch.
+    Yields:
+        list[tuple]: The next batch of customer rows.
+    """
+    last_id = 0
+    while True:
+        page = (
+            filter_customers(sa.select(Customer.id), **filters.model_dump())
+            .where(Customer.id > last_id)
+            .distinct()
+            .order_by(Customer.id)
+            .limit(batch_size)
+        )
+        query = (
+            sa.select(
+                Customer.id,
+                _joined_collection(CustomerName, CustomerName.name),
+                _joined_collection(CustomerAddress, CustomerAddress.address),
+                _joined_collection(CustomerMobileNo, CustomerMobileNo.mobile_no),
+                _joined_collection(CustomerEmail, CustomerEmail.email),
+                _joined_collection(CustomerTaxId, CustomerTaxId.tax_id),
+                _joined_collection(CustomerTin, CustomerTin.tin),
+                _joined_collection(CustomerRc, CustomerRc.rc),
+                Customer.created_at,
+                Customer.updated_at,
+            )
+            .where(Customer.id.in_(page))
+            .order_by(Customer.id)
+        )
+        with get_session(readonly=True) as session:
+            session.execute(sa.text("SET TRANSACTION READ ONLY"))
+            rows = [tuple(row) for row in session.execute(query)]
+        if not rows:
+            return
+        yield rows
+        last_id = rows[-1][0]
@@ -0,0 +1,46 @@
+from internal.database.models.slow_query import *
+from internal.database.schemas.slow_query import *
+from internal.database.schemas.base import tz_now
+from internal.database.session import get_session
+from datetime import timedelta
+import sqlalchemy as sa
+import os
+
+
+# Recorded slow queries are deleted after this many days
+DATABASE_SLOW_QUERY_RETENTION_DAYS = int(os.getenv('DATABASE_SLOW_QUERY_RETENTION_DAYS', '7'))
+
+
+def insert_slow_query(query: SlowQueryModel) -> None:
+    """
+    Record a slow query, and delete the ones older than DATABASE_SLOW_QUERY_RETENTION_DAYS.
+
+    Args:
+        query (SlowQueryModel): The slow query, its statement without parameters.
+    """
+    with get_session() as session:
+        session.add(SlowQuery(**query.model_dump(exclude={"id", "created_at", "updated_at"})))
+        session.execute(
+            sa.delete(SlowQuery)
+            .where(SlowQuery.created_at < tz_now() - timedelta(days=DATABASE_SLOW_QUERY_RETENTION_DAYS))
+        )
+
+def list_slow_queries(helper: str | None = None, limit: int = 50) -> SlowQueryListModel:
+    """
+    List the recorded slow queries, the latest first.
+
+    Args:
+        helper (str | None): Only list the queries of this helper, e.g. internal.database.helpers.customer.list_customers.
+        limit (int): The maximum number of queries to return.
+    Returns:
+        SlowQueryListModel: The slow queries.
+    """
+    with get_session(readonly=True) as session:
+        query = sa.select(SlowQuery)
+        if helper:
+            query = query.where(SlowQuery.helper == helper)
+        queries = session.scalars(query.order_by(SlowQuery.created_at.desc(), SlowQuery.id.desc()).limit(limit)).all()
+        return SlowQueryListModel(
+            queries=[SlowQueryModel.model_validate(q) for q in queries],
+            limit=limit,
+        )
@@ -0,0 +1,259 @@
+from internal.database.models.transaction import *
+from internal.database.models.report import TopCustomerModel, TopCustomerListModel
+from internal.database.schemas.transaction import *
+from internal.database.schemas.customer import CustomerName
+from internal.database.schemas.base import tz_now
+from internal.database.session import get_session
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import insert, aggregate_order_by
+
+
+# Number of customers kept in each leaderboard
+LEADERBOARD_SIZE = 100
+
+
+def replace_trxn_summaries(year: int, bank: str, rollups: list[TransactionRollupModel]) -> int:
+    """
+    Replace the per-customer transaction rollups of a year and bank.
+    The previous rollups are deleted and the new ones bulk inserted in a
+    single transaction, so readers never see a partially loaded upload.
+
+    Args:
+        year (int): The year of the upload the rollups were computed from.
+        bank (str): The bank of the upload the rollups were computed from.
+        rollups (list[TransactionRollupModel]): The rollups, one per customer.
+    Returns:
+        int: The number of rollups inserted.
+    """
+    with get_session() as session:
+        session.execute(
+            sa.delete(CustomerTrxnSummary).where(
+                (CustomerTrxnSummary.year == year) & (CustomerTrxnSummary.bank == bank)
+            )
+        )
+        if rollups:
+            session.execute(
+                insert(CustomerTrxnSummary),
+                [{**rollup.model_dump(), "year": year, "bank": bank} for rollup in rollups],
+            )
+    return len(rollups)
+
+
+def get_customer_banks(customer_id: int, year: int) -> list[str]:
+    """
+    List the banks whose transaction file of a year contains a customer.
+    The transaction rollups have a row per customer, year and bank, so their
+    unique (customer_id, year, bank) index serves as the customer presence index.
+
+    Args:
+        customer_id (int): The ID of the customer.
+        year (int): The year of the transactions.
+    Returns:
+        list[str]: The bank names, sorted.
+    """
+    with get_session(readonly=True) as session:
+        return list(session.scalars(
+            sa.select(CustomerTrxnSummary.bank)
+            .where((CustomerTrxnSummary.customer_id == customer_id) & (CustomerTrxnSummary.year == year))
+            .order_by(CustomerTrxnSummary.bank)
+        ))
+
+def has_trxn_rollups(year: int, bank: str) -> bool:
+    """
+    Check whether both the rollups and the monthly rollups of a year and bank
+    are stored, i.e. its upload was processed since they exist.
+
+    Args:
+        year (int): The year of the upload.
+        bank (str): The bank of the upload.
+    Returns:
+        bool: Whether the rollups of the upload are stored.
+    """
+    with get_session() as session:
+        return bool(session.scalar(sa.select(
+            sa.exists().where((CustomerTrxnSummary.year == year) & (CustomerTrxnSummary.bank == bank))
+            & sa.exists().where((CustomerTrxnMonthly.year == year) & (CustomerTrxnMonthly.bank == bank))
+        )))
+
+def replace_trxn_monthly(year: int, bank: str, rollups: list[TransactionMonthlyRollupModel]) -> int:
+    """
+    Replace the per-customer monthly transaction rollups of a year and bank.
+    The year's partition is created if needed, then the previous rollups are
+    deleted and the new ones bulk inserted in a single transaction.
+
+    Args:
+        year (int): The year of the upload the rollups were computed from.
+        bank (str): The bank of the upload the rollups were computed from.
+        rollups (list[TransactionMonthlyRollupModel]): The rollups, one per customer and month.
+    Returns:
+        int: The number of rollups inserted.
+    """
+    year = int(year)
+    with get_session() as session:
+        # Serialize the partition creation of concurrent uploads of the same year
+        session.execute(sa.select(sa.func.pg_advisory_xact_lock(sa.func.hashtext(CustomerTrxnMonthly.__tablename__), year)))
+        session.execute(sa.text(
+            f"CREATE TABLE IF NOT EXISTS {CustomerTrxnMonthly.__tablename__}_{year} "
+            f"PARTITION OF {CustomerTrxnMonthly.__tablename__} FOR VALUES IN ({year})"
+        ))
+        session.execute(
+            sa.delete(CustomerTrxnMonthly).where(
+                (CustomerTrxnMonthly.year == year) & (CustomerTrxnMonthly.bank == bank)
+            )
+        )
+        if rollups:
+            session.execute(
+                insert(CustomerTrxnMonthly),
+                [{**rollup.model_dump(), "year": year, "bank": bank} for rollup in rollups],
+            )
+    return len(rollups)
+
+def get_customer_timeseries(customer_id: int, year: int, bank: str | None = None) -> TransactionTimeseriesListModel:
+    """
+    Retrieve the monthly transaction rollups of a customer for a year.
+    Only the year's partition is read.
+
+    Args:
+        customer_id (int): The ID of the customer.
+        year (int): The year of the transactions.
+        bank (str | None): The bank of the transactions, all banks when None.
+
+    Returns:
+        TransactionTimeseriesListModel: The customer's rollups, ordered by month and bank.
+    """
+    query = (
+        sa.select(
+            CustomerTrxnMonthly.bank,
+            CustomerTrxnMonthly.month,
+            CustomerTrxnMonthly.total_trxns,
+            CustomerTrxnMonthly.total_amount,
+        )
+        .where(CustomerTrxnMonthly.year == year)
+        .where(CustomerTrxnMonthly.customer_id == customer_id)
+        .order_by(CustomerTrxnMonthly.month, CustomerTrxnMonthly.bank)
+    )
+    if bank:
+        query = query.where(CustomerTrxnMonthly.bank == bank)
+    with get_session(readonly=True) as session:
+        return TransactionTimeseriesListModel(
+            rows=[TransactionTimeseriesModel.model_validate(row) for row in session.execute(query).all()],
+            customer_id=customer_id,
+            year=year,
+        )
+
+def _leaderboard_select(year: int, bank: str | None, size: int) -> sa.Select:
+    """
+    Build the top customers by transaction amount of a year, for one bank or all banks,
+    from the customers_trxn_summary rollups.
+    """
+    totals = (
+        sa.select(
+            CustomerTrxnSummary.customer_id,
+            sa.func.sum(CustomerTrxnSummary.total_trxns).label("total_trxns"),
+            sa.func.sum(CustomerTrxnSummary.total_amount).label("total_amount"),
+        )
+        .where(CustomerTrxnSummary.year == year)
+        .group_by(CustomerTrxnSummary.customer_id)
+        .order_by(sa.desc("total_amount"), CustomerTrxnSummary.customer_id)
+        .limit(size)
+    )
+    if bank:
+        totals = totals.where(CustomerTrxnSummary.bank == bank)
+    totals = totals.subquery()
+
+    now = tz_now()
+    return sa.select(
+        sa.literal(year, sa.Integer),
+        sa.literal(bank, sa.String),
+        sa.func.row_number().over(order_by=(totals.c.total_amount.desc(), totals.c.customer_id)),
+        totals.c.customer_id,
+        totals.c.total_trxns,
+        totals.c.total_amount,
+        sa.literal(now, sa.DateTime),
+        sa.literal(now, sa.DateTime),
+    )
+
+def refresh_leaderboards(year: int, bank: str, size: int = LEADERBOARD_SIZE) -> None:
+    """
+    Recompute the leaderboards affected by an upload: the top customers of the
+    upload's year and bank, and of the year across all banks. Both are computed
+    by the database from the rollups and replaced in a single transaction,
+    serialized with the refreshes of the same year by concurrent uploads.
+
+    Args:
+        year (int): The year of the upload.
+        bank (str): The bank of the upload.
+        size (int): The number of customers to keep in each leaderboard.
+    """
+    columns = [
+        CustomerLeaderboard.year,
+        CustomerLeaderboard.bank,
+        CustomerLeaderboard.rank,
+        CustomerLeaderboard.customer_id,
+        CustomerLeaderboard.total_trxns,
+        CustomerLeaderboard.total_amount,
+        CustomerLeaderboard.created_at,
+        CustomerLeaderboard.updated_at,
+    ]
+    with get_session() as session:
+        # Both refreshes replace the year's leaderboard across all banks
+        session.execute(sa.select(sa.func.pg_advisory_xact_lock(sa.func.hashtext(CustomerLeaderboard.__tablename__), year)))
+        session.execute(
+            sa.delete(CustomerLeaderboard).where(
+                (CustomerLeaderboard.year == year)
+                & ((CustomerLeaderboard.bank == bank) | CustomerLeaderboard.bank.is_(None))
+            )
+        )
+        for leaderboard_bank in (bank, None):
+            session.execute(
+                sa.insert(CustomerLeaderboard).from_select(columns, _leaderboard_select(year, leaderboard_bank, size))
+            )
+
+def get_top_customers(year: int, bank: str | None = None, limit: int = LEADERBOARD_SIZE) -> TopCustomerListModel:
+    """
+    Retrieve the top customers by transaction amount from a precomputed leaderboard.
+
+    Args:
+        year (int): The year of the leaderboard.
+        bank (str | None): The bank of the leaderboard, all banks when None.
+        limit (int): The maximum number of customers to return.
+
+    Returns:
+        TopCustomerListModel: The customers ordered by rank, with their names.
+    """
+    limit = max(1, min(limit, LEADERBOARD_SIZE))
+    names = (
+        sa.select(sa.func.array_agg(aggregate_order_by(CustomerName.name, CustomerName.id)))
+        .where(CustomerName.customer_id == CustomerLeaderboard.customer_id)
+        .scalar_subquery()
+    )
+    query = (
+        sa.select(
+            CustomerLeaderboard.rank,
+            CustomerLeaderboard.customer_id,
+            names.label("names"),
+            CustomerLeaderboard.total_trxns,
+            CustomerLeaderboard.total_amount,
+        )
+        .where(CustomerLeaderboard.year == year)
+        .where(CustomerLeaderboard.bank == bank if bank else CustomerLeaderboard.bank.is_(None))
+        .order_by(CustomerLeaderboard.rank)
+        .limit(limit)
+    )
+    with get_session(readonly=True) as session:
+        rows = session.execute(query).all()
+        return TopCustomerListModel(
+            rows=[
+                TopCustomerModel(
+                    rank=row.rank,
+                    customer_id=row.customer_id,
+                    names=row.names or [],
+                    total_trxns=row.total_trxns,
+                    total_amount=row.total_amount,
+                )
+                for row in rows
+            ],
+            year=year,
+            bank=bank,
+            limit=limit,
+        )
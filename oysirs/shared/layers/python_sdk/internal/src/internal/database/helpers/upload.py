@@ -1,13 +1,21 @@
 from internal.database.models.upload import *
 from internal.database.schemas.upload import *
-from internal.database.session import get_session
+from internal.database.schemas.base import tz_now
+from internal.database.session import get_session, get_engine
 import sqlalchemy as sa
 from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import joinedload
 from aws_lambda_powertools import Logger
+import select
+import time
+import base64
+from datetime import datetime
 
 logger = Logger()
 
+# Channel notified with the sequence number of each new upload event
+UPLOAD_EVENTS_CHANNEL = 'upload_events'
+
 
 def get_upload_by_id(upload_id: str) -> UploadModel | None:
     """
@@ -19,7 +27,7 @@ def get_upload_by_id(upload_id: str) -> UploadModel | None:
     Returns:
         UploadModel | None: The upload object if found, otherwise None.
     """
-    with get_session() as session:
+    with get_session(readonly=True) as session:
         upload = session.get(Upload, upload_id)
         if upload:
             return UploadModel.model_validate(upload)
@@ -37,6 +45,9 @@ def insert_or_update_upload(upload: UploadModel) -> int:
         int: The ID of the inserted or updated upload.
     """
     with get_session() as session:
+        # Events are appended one transaction at a time, so their sequence numbers
+        # become visible in order and readers resuming after a number miss none
+        session.execute(sa.select(sa.func.pg_advisory_xact_lock(sa.func.hashtext(UPLOAD_EVENTS_CHANNEL))))
         stmt = insert(Upload).values(
             year=upload.year,
             bank=upload.bank,
@@ -49,26 +60,174 @@ def insert_or_update_upload(upload: UploadModel) -> int:
                 "status": upload.status,
                 "progress": upload.progress,
                 "message": upload.message,
+                # ORM onupdate defaults do not apply to ON CONFLICT updates
+                "updated_at": tz_now(),
             },
             where=(Upload.year == upload.year) & (Upload.bank == upload.bank)
         )
         session.execute(stmt)
+        seq = session.scalar(
+            insert(UploadEvent).values(
+                year=upload.year,
+                bank=upload.bank,
+                status=upload.status,
+                progress=upload.progress,
+                message=upload.message,
+            ).returning(UploadEvent.id)
+        )
+        # Delivered to the listeners when the transaction commits
+        session.execute(sa.select(sa.func.pg_notify(UPLOAD_EVENTS_CHANNEL, str(seq))))
     return upload.id
 
 
-def list_uploads() -> UploadListModel:
+def get_uploads_version(years: list[int] | None = None) -> str:
     """
-    List all uploads in the uploads table.
+    Get a version of the uploads table, which changes whenever an upload is
+    added, removed or updated. Used as the ETag of the uploads list, and in
+    the cache keys of the reports built from the uploads of some years.
+
+    Args:
+        years (list[int] | None): The years of the uploads, all of them when None.
 
     Returns:
-        UploadListModel: A list of all uploads.
+        str: The number of uploads and their latest update time.
     """
-    with get_session() as session:
-        uploads = session.execute(sa.select(Upload)).scalars().all()
-        # return [UploadModel.model_validate(upload) for upload in uploads]
+    query = sa.select(sa.func.count(), sa.func.max(Upload.updated_at))
+    if years is not None:
+        query = query.where(Upload.year.in_(years))
+    with get_session(readonly=True) as session:
+        total, updated_at = session.execute(query).one()
+    return f"{total}:{updated_at.isoformat() if updated_at else ''}"
+
+
+def _encode_cursor(upload: Upload) -> str:
+    return base64.urlsafe_b64encode(f"{upload.updated_at.isoformat()}|{upload.id}".encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        updated_at, upload_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(updated_at), int(upload_id)
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def list_uploads(
+        year: int | None = None,
+        bank: str | None = None,
+        status: UploadStatus | None = None,
+        cursor: str | None = None,
+        limit: int | None = None,
+) -> UploadListModel:
+    """
+    List uploads with optional filters, most recently updated first.
+    Pages are read with keyset pagination on (updated_at, id): pass the
+    next_cursor of a page to get the next one. Without a limit, all the
+    uploads matching the filters are listed in one page.
+
+    Args:
+        year (int | None): The year of the uploads to filter by.
+        bank (str | None): The bank of the uploads to filter by.
+        status (UploadStatus | None): The status of the uploads to filter by.
+        cursor (str | None): The next_cursor of the previous page, None for the first page.
+        limit (int | None): The maximum number of records to return, all of them when None.
+
+    Returns:
+        UploadListModel: A page of the uploads matching the filters, and their total.
+
+    Raises:
+        ValueError: If the cursor is invalid.
+    """
+    filters = []
+    if year is not None:
+        filters.append(Upload.year == year)
+    if bank:
+        filters.append(Upload.bank == bank)
+    if status:
+        filters.append(Upload.status == status)
+
+    query = sa.select(Upload).where(*filters)
+    if cursor:
+        updated_at, upload_id = _decode_cursor(cursor)
+        query = query.where(sa.tuple_(Upload.updated_at, Upload.id) < sa.tuple_(updated_at, upload_id))
+    query = query.order_by(Upload.updated_at.desc(), Upload.id.desc())
+    if limit is not None:
+        query = query.limit(limit + 1)
+
+    with get_session(readonly=True) as session:
+        uploads = session.execute(query).scalars().all()
+        total = session.scalar(sa.select(sa.func.count()).select_from(Upload).where(*filters))
+        has_more = limit is not None and len(uploads) > limit
+        if has_more:
+            uploads = uploads[:limit]
         return UploadListModel(
             uploads=[UploadModel.model_validate(upload) for upload in uploads],
-            total=len(uploads),
-            offset=0,
-            limit=len(uploads),
+            total=total,
+            limit=len(uploads) if limit is None else limit,
+            next_cursor=_encode_cursor(uploads[-1]) if has_more else None,
         )
+
+
+def list_upload_events(since: int = 0, limit: int = 100) -> UploadEventListModel:
+    """
+    List the upload events after a sequence number, oldest first. Read from
+    the writer, so the events of a notification are always there to list.
+
+    Args:
+        since (int): The sequence number of the last event already seen, 0 for all events.
+        limit (int): The maximum number of events to return.
+
+    Returns:
+        UploadEventListModel: The events, and the sequence number to resume from.
+    """
+    with get_session() as session:
+        events = session.execute(
+            sa.select(UploadEvent).where(UploadEvent.id > since).order_by(UploadEvent.id).limit(limit)
+        ).scalars().all()
+        return UploadEventListModel(
+            events=[UploadEventModel.model_validate(event) for event in events],
+            last_seq=events[-1].id if events else since,
+        )
+
+
+def wait_for_upload_events(since: int = 0, timeout: float = 20, limit: int = 100) -> UploadEventListModel:
+    """
+    Long-poll the upload events after a sequence number. Returns as soon as
+    there are events, or without events once the timeout expires. The wait
+    listens on the upload events channel with the psycopg2 driver, so no
+    query runs until a notification arrives.
+
+    Args:
+        since (int): The sequence number of the last event already seen, 0 for all events.
+        timeout (float): The maximum time in seconds to wait for events.
+        limit (int): The maximum number of events to return.
+
+    Returns:
+        UploadEventListModel: The events, and the sequence number to resume from.
+    """
+    deadline = time.monotonic() + timeout
+    connection = get_engine().raw_connection()
+    try:
+        # LISTEN before reading, so events committed in between still notify
+        connection.driver_connection.autocommit = True
+        cursor = connection.cursor()
+        cursor.execute(f"LISTEN {UPLOAD_EVENTS_CHANNEL}")
+        events = list_upload_events(since, limit)
+        while not events.events and (remaining := deadline - time.monotonic()) > 0:
+            if select.select([connection.driver_connection], [], [], remaining) == ([], [], []):
+                break
+            connection.driver_connection.poll()
+            notifies = connection.driver_connection.notifies
+            if any(int(notify.payload) > since for notify in notifies):
+                events = list_upload_events(since, limit)
+            notifies.clear()
+        cursor.execute(f"UNLISTEN {UPLOAD_EVENTS_CHANNEL}")
+        cursor.close()
+        connection.driver_connection.autocommit = False
+    except Exception:
+        # Do not return a connection that may still be listening to the pool
+        connection.invalidate()
+        raise
+    finally:
+        connection.close()
+    return events
@@ -1,18 +1,73 @@
 import boto3
+import hashlib
+import threading
+import time
+import jwt
 import os
+from aws_lambda_powertools import Logger
 
-from internal.tables.models.user import *
+from internal.database.models.user import *
 
 
 user_pool_id = os.getenv('COGNITO_USER_POOL_ID')
+user_pool_client_id = os.getenv('COGNITO_USER_POOL_CLIENT_ID')
+aws_region = os.getenv('AWS_REGION')
+issuer = f"https://cognito-idp.{aws_region}.amazonaws.com/{user_pool_id}"
+
+# Lifetime of the users resolved from an access token, 0 disables the cache
+USER_CACHE_TTL = int(os.getenv('USER_CACHE_TTL_SECONDS', '300'))
+USER_CACHE_MAX_ENTRIES = int(os.getenv('USER_CACHE_MAX_ENTRIES', '1024'))
+
+logger = Logger()
 
 cognito_client = boto3.client('cognito-idp')
-dynamodb_resource = boto3.resource('dynamodb')
+# The signing keys are fetched once per container, and again only when a token
+# is signed with an unknown key ID, which is how Cognito rotates its keys
+jwks_client = jwt.PyJWKClient(
+    f"{issuer}/.well-known/jwks.json",
+    cache_keys=True,
+    lifespan=int(os.getenv('COGNITO_JWKS_TTL_SECONDS', '3600')),
+)
+
+_user_cache: dict[str, tuple[float, UserModel]] = {}
+_user_cache_lock = threading.Lock()
+
+
+def verify_access_token(access_token: str) -> dict:
+    """
+    Verify a Cognito access token locally against the user pool's signing keys.
+
+    Args:
+        access_token (str): The access token of the user.
+
+    Returns:
+        dict: The claims of the token.
+
+    Raises:
+        jwt.PyJWTError: If the token is invalid, expired or not an access token of the user pool.
+    """
+    signing_key = jwks_client.get_signing_key_from_jwt(access_token)
+    claims = jwt.decode(
+        access_token,
+        signing_key.key,
+        algorithms=["RS256"],
+        issuer=issuer,
+        options={"require": ["exp", "iss", "sub", "token_use"]},
+    )
+    if claims["token_use"] != "access":
+        raise jwt.InvalidTokenError("Not an access token")
+    if user_pool_client_id and claims.get("client_id") != user_pool_client_id:
+        raise jwt.InvalidTokenError("Token issued for another client")
+    return claims
 
 
 def get_user(access_token: str) -> UserModel | None:
     """
-    Retrieve user information from AWS Cognito using the provided access token.
+    Retrieve user information using the provided access token.
+    The token is verified locally and the groups are read from its
+    `cognito:groups` claim. The user attributes are fetched from Cognito on
+    cache miss only, and cached by token hash until USER_CACHE_TTL or the
+    token expiry, whichever comes first.
 
     Args:
         access_token (str): The access token of the user.
@@ -20,17 +75,36 @@ def get_user(access_token: str) -> UserModel | None:
     Returns:
         UserModel | None: A UserModel instance containing user information or None if not found.
     """
+    try:
+        claims = verify_access_token(access_token)
+    except jwt.PyJWTError as e:
+        logger.warning(f"Invalid access token: {e}")
+        return None
+
+    cache_key = hashlib.sha256(access_token.encode()).hexdigest()
+    now = time.time()
+    with _user_cache_lock:
+        cached = _user_cache.get(cache_key)
+    if cached and cached[0] > now:
+        return cached[1]
+
     try:
         response = cognito_client.get_user(AccessToken=access_token)
-        groups_response = cognito_client.admin_list_groups_for_user(
-            UserPoolId=user_pool_id,
-            Username=response['Username']
-        )
-        return UserModel(
+        user = UserModel(
             **{attr['Name']: attr['Value'] for attr in response['UserAttributes']},
             username=response['Username'],
-            groups=[UserGroup(group['GroupName']) for group in groups_response['Groups']]
+            groups=[UserGroup(group) for group in claims.get('cognito:groups', [])]
         )
     except Exception as e:
-        print(f"Error retrieving user information: {e}")
-        return None
\ No newline at end of file
+        logger.warning(f"Error retrieving user information: {e}")
+        return None
+
+    if USER_CACHE_TTL > 0:
+        with _user_cache_lock:
+            if len(_user_cache) >= USER_CACHE_MAX_ENTRIES:
+                for key in [key for key, (expires_at, _) in _user_cache.items() if expires_at <= now]:
+                    del _user_cache[key]
+                if len(_user_cache) >= USER_CACHE_MAX_ENTRIES:
+                    _user_cache.pop(next(iter(_user_cache)))
+            _user_cache[cache_key] = (min(now + USER_CACHE_TTL, claims['exp']), user)
+    return user
@@ -0,0 +1,209 @@
+from aws_lambda_powertools import Logger
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+import heapq
+import random
+import re
+import threading
+import time
+import os
+
+
+logger = Logger()
+
+# Share of the requests and chunks whose statements are tracked, see track_statements
+DATABASE_STATEMENT_SAMPLE_RATE = float(os.getenv('DATABASE_STATEMENT_SAMPLE_RATE', '0.1'))
+# Executions of the same statement shape in one scope reported as a possible N+1
+DATABASE_N_PLUS_ONE_THRESHOLD = int(os.getenv('DATABASE_N_PLUS_ONE_THRESHOLD', '10'))
+# Number of the slowest statements logged per scope
+DATABASE_SLOWEST_STATEMENTS = int(os.getenv('DATABASE_SLOWEST_STATEMENTS', '3'))
+# Statements are truncated to this length in the logs
+STATEMENT_LOG_LENGTH = 500
+# Statements slower than this are explained and recorded, see internal.database.slow_queries, 0 disables it
+DATABASE_SLOW_QUERY_MS = float(os.getenv('DATABASE_SLOW_QUERY_MS', '0'))
+
+# Bound parameters of psycopg2 (%(name)s) and asyncpg ($1)
+_PLACEHOLDER = r"(?:%\(\w+\)s|\$\d+)"
+_PLACEHOLDER_LIST = re.compile(rf"{_PLACEHOLDER}(?:\s*,\s*{_PLACEHOLDER})+")
+_PLACEHOLDER_ROWS = re.compile(r"\(\?\)(?:\s*,\s*\(\?\))+")
+_SPACES = re.compile(r"\s+")
+
+# The name of the current request or chunk, and its statements when it is tracked
+_scope: ContextVar[str | None] = ContextVar('statement_scope', default=None)
+_statement_stats: ContextVar['StatementStats | None'] = ContextVar('statement_stats', default=None)
+
+
+def statement_shape(statement: str) -> str:
+    """
+    Get the shape of a statement: its text with the bound parameters, and the
+    lists and rows of them expanded from IN and VALUES, collapsed to a single ?.
+
+    Args:
+        statement (str): The statement as sent to the driver.
+    Returns:
+        str: The shape of the statement.
+    """
+    shape = _PLACEHOLDER_LIST.sub("?", statement)
+    shape = re.sub(_PLACEHOLDER, "?", shape)
+    shape = _PLACEHOLDER_ROWS.sub("(?)", shape)
+    return _SPACES.sub(" ", shape).strip()
+
+
+class StatementStats:
+    """
+    Counts, durations and shapes of the statements executed in a
+    track_statements scope.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.statements = 0
+        self.duration = 0.0
+        self.shapes: Counter[str] = Counter()
+        # Min-heap of the slowest (duration, shape)
+        self._slowest: list[tuple[float, str]] = []
+        self._lock = threading.Lock()
+
+    def record(self, statement: str, duration: float) -> None:
+        """
+        Record the execution of a statement.
+
+        Args:
+            statement (str): The statement as sent to the driver.
+            duration (float): The time it took in seconds.
+        """
+        shape = statement_shape(statement)
+        with self._lock:
+            self.statements += 1
+            self.duration += duration
+            self.shapes[shape] += 1
+            if len(self._slowest) < DATABASE_SLOWEST_STATEMENTS:
+                heapq.heappush(self._slowest, (duration, shape))
+            else:
+                heapq.heappushpop(self._slowest, (duration, shape))
+
+    def repeated(self) -> dict[str, int]:
+        """
+        Get the shapes executed at least DATABASE_N_PLUS_ONE_THRESHOLD times,
+        the signature of a query issued per row instead of once for all of them.
+        """
+        with self._lock:
+            return {
+                shape: count
+                for shape, count in self.shapes.most_common()
+                if count >= DATABASE_N_PLUS_ONE_THRESHOLD
+            }
+
+    def summary(self) -> dict:
+        """
+        Get the statement count, the database time and the slowest statements.
+        """
+        with self._lock:
+            slowest = sorted(self._slowest, reverse=True)
+            return {
+                "scope": self.name,
+                "statements": self.statements,
+                "distinct_statements": len(self.shapes),
+                "db_time_ms": round(self.duration * 1000, 2),
+                "slowest": [
+                    {"statement": shape[:STATEMENT_LOG_LENGTH], "duration_ms": round(duration * 1000, 2)}
+                    for duration, shape in slowest
+                ],
+            }
+
+
+def current_scope() -> str | None:
+    """
+    Get the name of the track_statements scope the caller runs in, tracked or not.
+    """
+    return _scope.get()
+
+def current_statement_stats() -> StatementStats | None:
+    """
+    Get the stats of the tracked scope the caller runs in, None when untracked.
+    """
+    return _statement_stats.get()
+
+@contextmanager
+def track_statements(name: str, sample_rate: float | None = None):
+    """
+    Track the statements the engines execute in this context, and log their
+    summary on exit, with a warning listing the shapes repeated often enough
+    to be an N+1. Only a sample of the scopes is tracked, and a scope opened
+    within another one is part of it.
+
+    Args:
+        name (str): The name of the scope in the logs, e.g. the route or the chunk.
+        sample_rate (float | None): The probability the scope is tracked,
+            DATABASE_STATEMENT_SAMPLE_RATE when None.
+
+    Yields:
+        StatementStats | None: The stats of the scope, None when it is not tracked.
+    """
+    if _scope.get() is not None:
+        yield _statement_stats.get()
+        return
+
+    scope_token = _scope.set(name)
+    try:
+        sample_rate = DATABASE_STATEMENT_SAMPLE_RATE if sample_rate is None else sample_rate
+        if random.random() >= sample_rate:
+            yield None
+            return
+
+        stats = StatementStats(name)
+        token = _statement_stats.set(stats)
+        try:
+            yield stats
+        finally:
+            _statement_stats.reset(token)
+            log_statement_stats(stats)
+    finally:
+        _scope.reset(scope_token)
+
+def log_statement_stats(stats: StatementStats) -> None:
+    """
+    Log the summary of a tracked scope as structured fields, and a warning for
+    its repeated shapes.
+
+    Args:
+        stats (StatementStats): The stats of the scope.
+    """
+    if not stats.statements:
+        return
+    logger.info(f"Database statements of {stats.name}", extra={"db_statements": stats.summary()})
+    repeated = stats.repeated()
+    if repeated:
+        logger.warning(
+            f"Possible N+1 in {stats.name}: {len(repeated)} statements repeated",
+            extra={"db_repeated_statements": [
+                {"statement": shape[:STATEMENT_LOG_LENGTH], "count": count}
+                for shape, count in repeated.items()
+            ]},
+        )
+
+
+# Listeners of the engine events, registered by internal.database.session
+def before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    if DATABASE_SLOW_QUERY_MS > 0 or _statement_stats.get() is not None:
+        conn.info.setdefault("statement_started_at", []).append(time.perf_counter())
+
+def after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    started_at = conn.info.get("statement_started_at")
+    if not started_at:
+        return
+    duration = time.perf_counter() - started_at.pop()
+    stats = _statement_stats.get()
+    if stats is not None:
+        stats.record(statement, duration)
+    if 0 < DATABASE_SLOW_QUERY_MS <= duration * 1000:
+        from .slow_queries import record_slow_query
+
+        record_slow_query(conn, statement, parameters, duration, executemany)
+
+def handle_error(exception_context) -> None:
+    # after_cursor_execute is not called for failed statements
+    started_at = exception_context.connection.info.get("statement_started_at") if exception_context.connection else None
+    if started_at:
+        started_at.pop()
@@ -49,4 +49,20 @@ class TransactionSummaryModel(CleanBaseModel):
 
 class CustomerWithStatsModel(CleanBaseModel):
     customer: CustomerModel
-    trxn_summary: list[TransactionSummaryModel] = []
\ No newline at end of file
+    trxn_summary: list[TransactionSummaryModel] = []
+
+class CustomerLookupRequestModel(CleanBaseModel):
+    ids: list[int] = []
+    emails: list[str] = []
+    mobile_nos: list[str] = []
+    tax_ids: list[str] = []
+    tins: list[str] = []
+    rcs: list[str] = []
+
+class CustomerLookupModel(CleanBaseModel):
+    customers: dict[int, CustomerModel] = {}
+    emails: dict[str, int] = {}
+    mobile_nos: dict[str, int] = {}
+    tax_ids: dict[str, int] = {}
+    tins: dict[str, int] = {}
+    rcs: dict[str, int] = {}
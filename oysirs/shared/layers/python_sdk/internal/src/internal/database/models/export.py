@@ -0,0 +1,26 @@
+from enum import Enum
+
+from .base import BaseModel, CleanBaseModel
+
+
+class ExportStatus(str, Enum):
+    PENDING = "pending"
+    IN_PROGRESS = "in_progress"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+class CustomerExportFiltersModel(CleanBaseModel):
+    name: str | None = None
+    email: str | None = None
+    mobile_no: str | None = None
+    tax_id: str | None = None
+    tin: str | None = None
+    rc: str | None = None
+
+class CustomerExportModel(BaseModel):
+    filters: CustomerExportFiltersModel
+    status: ExportStatus
+    total_rows: int = 0
+    key: str | None = None
+    message: str = ""
+    download_url: str | None = None
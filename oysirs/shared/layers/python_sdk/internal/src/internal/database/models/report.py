@@ -0,0 +1,64 @@
+from datetime import date
+
+from .base import CleanBaseModel
+
+
+class CustomerInflowModel(CleanBaseModel):
+    customer_id: int
+    banks: int
+    total_trxns: int
+    total_amount: float
+
+class CustomerInflowListModel(CleanBaseModel):
+    rows: list[CustomerInflowModel] = []
+    limit: int = 100
+    truncated: bool = False
+
+class BankTotalModel(CleanBaseModel):
+    bank: str
+    customers: int
+    total_trxns: int
+    total_amount: float
+
+class BankTotalListModel(CleanBaseModel):
+    rows: list[BankTotalModel] = []
+    limit: int = 100
+    truncated: bool = False
+
+class MonthlyTotalModel(CleanBaseModel):
+    month: date
+    customers: int
+    total_trxns: int
+    total_amount: float
+
+class MonthlyTotalListModel(CleanBaseModel):
+    rows: list[MonthlyTotalModel] = []
+    limit: int = 100
+    truncated: bool = False
+
+class TopCustomerModel(CleanBaseModel):
+    rank: int
+    customer_id: int
+    names: list[str] = []
+    total_trxns: int
+    total_amount: float
+
+class TopCustomerListModel(CleanBaseModel):
+    rows: list[TopCustomerModel] = []
+    year: int
+    bank: str | None = None
+    limit: int = 100
+
+class AmountQuantileModel(CleanBaseModel):
+    rank: float
+    amount: float
+
+class SketchSummaryModel(CleanBaseModel):
+    years: list[int] = []
+    banks: list[str] = []
+    distinct_customers: float = 0
+    distinct_customers_lower: float = 0
+    distinct_customers_upper: float = 0
+    total_trxns: int = 0
+    amount_quantiles: list[AmountQuantileModel] = []
+    missing: list[str] = []
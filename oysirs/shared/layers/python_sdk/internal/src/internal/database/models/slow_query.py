@@ -0,0 +1,13 @@
+from .base import BaseModel, CleanBaseModel
+
+
+class SlowQueryModel(BaseModel):
+    statement: str
+    helper: str | None = None
+    scope: str | None = None
+    duration_ms: float
+    plan: dict
+
+class SlowQueryListModel(CleanBaseModel):
+    queries: list[SlowQueryModel] = []
+    limit: int = 50
@@ -0,0 +1,39 @@
+from datetime import datetime, date
+
+from .base import CleanBaseModel
+
+
+class TransactionRollupModel(CleanBaseModel):
+    customer_id: int
+    total_trxns: int
+    total_amount: float
+
+class TransactionMonthlyRollupModel(CleanBaseModel):
+    customer_id: int
+    month: date
+    total_trxns: int
+    total_amount: float
+
+class TransactionTimeseriesModel(CleanBaseModel):
+    bank: str
+    month: date
+    total_trxns: int
+    total_amount: float
+
+class TransactionTimeseriesListModel(CleanBaseModel):
+    rows: list[TransactionTimeseriesModel] = []
+    customer_id: int
+    year: int
+
+class TransactionModel(CleanBaseModel):
+    bank: str
+    customer_id: int
+    trxn_amount: float | None = None
+    trxn_date: datetime | None = None
+
+class TransactionListModel(CleanBaseModel):
+    transactions: list[TransactionModel] = []
+    total: int = 0
+    offset: int = 0
+    limit: int = 10
+    failed_banks: list[str] = []
@@ -26,5 +26,16 @@ class UploadIngestModel(CleanBaseModel):
 class UploadListModel(CleanBaseModel):
     uploads: list[UploadModel] = []
     total: int = 0
-    offset: int = 0
-    limit: int = 10
\ No newline at end of file
+    limit: int = 10
+    next_cursor: str | None = None
+
+class UploadEventModel(BaseModel):
+    year: int
+    bank: str
+    status: UploadStatus
+    progress: int
+    message: str = ""
+
+class UploadEventListModel(CleanBaseModel):
+    events: list[UploadEventModel] = []
+    last_seq: int = 0
@@ -21,4 +21,4 @@ class Base(DeclarativeBase):
     updated_at: Mapped[datetime] = mapped_column(default=tz_now, onupdate=tz_now)
 
 # Import all schemas to register them with the Base
-from . import customer, upload
\ No newline at end of file
+from . import customer, upload, transaction, export, slow_query
\ No newline at end of file
@@ -1,19 +1,46 @@
 import uuid
 from sqlalchemy.orm import relationship, Mapped, mapped_column
-from sqlalchemy import UniqueConstraint, ForeignKey, Uuid
+from sqlalchemy import UniqueConstraint, ForeignKey, Uuid, Index, text
 
 from .base import Base
 
 
 class Customer(Base):
     __tablename__ = 'customers'
-    names: Mapped[list["CustomerName"]] = relationship(back_populates="customer", cascade="all, delete-orphan")
-    addresses: Mapped[list["CustomerAddress"]] = relationship(back_populates="customer", cascade="all, delete-orphan")
-    mobiles: Mapped[list["CustomerMobileNo"]] = relationship(back_populates="customer", cascade="all, delete-orphan")
-    emails: Mapped[list["CustomerEmail"]] = relationship(back_populates="customer", cascade="all, delete-orphan")
-    tax_ids: Mapped[list["CustomerTaxId"]] = relationship(back_populates="customer", cascade="all, delete-orphan")
-    tins: Mapped[list["CustomerTin"]] = relationship(back_populates="customer", cascade="all, delete-orphan")
-    rcs: Mapped[list["CustomerRc"]] = relationship(back_populates="customer", cascade="all, delete-orphan")
+    names: Mapped[list["CustomerName"]] = relationship(back_populates="customer", cascade="all, delete-orphan", order_by="CustomerName.id")
+    addresses: Mapped[list["CustomerAddress"]] = relationship(back_populates="customer", cascade="all, delete-orphan", order_by="CustomerAddress.id")
+    mobiles: Mapped[list["CustomerMobileNo"]] = relationship(back_populates="customer", cascade="all, delete-orphan", order_by="CustomerMobileNo.id")
+    emails: Mapped[list["CustomerEmail"]] = relationship(back_populates="customer", cascade="all, delete-orphan", order_by="CustomerEmail.id")
+    tax_ids: Mapped[list["CustomerTaxId"]] = relationship(back_populates="customer", cascade="all, delete-orphan", order_by="CustomerTaxId.id")
+    tins: Mapped[list["CustomerTin"]] = relationship(back_populates="customer", cascade="all, delete-orphan", order_by="CustomerTin.id")
+    rcs: Mapped[list["CustomerRc"]] = relationship(back_populates="customer", cascade="all, delete-orphan", order_by="CustomerRc.id")
+
+# Identifiers that belong to a single customer, names and addresses can be shared
+IDENTIFYING_KINDS = ('email', 'mobile_no', 'tax_id', 'tin', 'rc')
+
+class CustomerIdentifier(Base):
+    """
+    Every identifier of every customer in one table, keyed by kind and value, so
+    resolution and search hit a single composite index instead of one table per
+    kind. Written alongside the per kind tables, which still back CustomerModel.
+    The canonical key of the value is what ingestion and search match exactly,
+    it is None until the backfill of rows written before it existed, and for
+    values without one (e.g. punctuation only), which never match.
+    """
+    __tablename__ = 'customer_identifiers'
+    kind: Mapped[str] = mapped_column(nullable=False)
+    value: Mapped[str] = mapped_column(nullable=False)
+    canonical: Mapped[str | None] = mapped_column(nullable=True)
+    customer_id: Mapped[int] = mapped_column(ForeignKey('customers.id', ondelete="CASCADE", onupdate="CASCADE"))
+    __table_args__ = (
+        UniqueConstraint('kind', 'value', 'customer_id', name='_kind_value_customer_uc'),
+        Index(
+            'ux_customer_identifiers_kind_value', 'kind', 'value', unique=True,
+            postgresql_where=text(f"kind IN ({', '.join(repr(kind) for kind in IDENTIFYING_KINDS)})"),
+        ),
+        Index('ix_customer_identifiers_customer_id', 'customer_id'),
+        Index('ix_customer_identifiers_kind_canonical', 'kind', 'canonical'),
+    )
 
 class CustomerName(Base):
     __tablename__ = 'customers_name'
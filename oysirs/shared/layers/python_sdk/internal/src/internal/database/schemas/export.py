@@ -0,0 +1,13 @@
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.dialects.postgresql import JSONB
+
+from .base import Base
+
+
+class CustomerExport(Base):
+    __tablename__ = 'customers_exports'
+    filters: Mapped[dict] = mapped_column(JSONB, nullable=False)
+    status: Mapped[str] = mapped_column(nullable=False)
+    total_rows: Mapped[int] = mapped_column(default=0)
+    key: Mapped[str | None] = mapped_column(nullable=True)
+    message: Mapped[str] = mapped_column(default="")
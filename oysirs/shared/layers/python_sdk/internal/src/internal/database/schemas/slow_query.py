@@ -0,0 +1,18 @@
+from sqlalchemy import Index
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.dialects.postgresql import JSONB
+
+from .base import Base
+
+
+class SlowQuery(Base):
+    __tablename__ = 'slow_queries'
+    statement: Mapped[str] = mapped_column(nullable=False)
+    helper: Mapped[str | None] = mapped_column(nullable=True)
+    scope: Mapped[str | None] = mapped_column(nullable=True)
+    duration_ms: Mapped[float] = mapped_column(nullable=False)
+    plan: Mapped[dict] = mapped_column(JSONB, nullable=False)
+
+    __table_args__ = (
+        Index('ix_slow_queries_created_at', 'created_at'),
+    )
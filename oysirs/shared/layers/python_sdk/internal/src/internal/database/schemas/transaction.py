@@ -0,0 +1,48 @@
+from sqlalchemy.orm import relationship, Mapped, mapped_column
+from sqlalchemy import UniqueConstraint, ForeignKey, Index
+from datetime import date
+
+from .base import Base
+
+
+class CustomerTrxnSummary(Base):
+    __tablename__ = 'customers_trxn_summary'
+    customer_id: Mapped[int] = mapped_column(ForeignKey('customers.id', ondelete="CASCADE", onupdate="CASCADE"))
+    year: Mapped[int] = mapped_column(nullable=False)
+    bank: Mapped[str] = mapped_column(nullable=False)
+    total_trxns: Mapped[int] = mapped_column(nullable=False)
+    total_amount: Mapped[float] = mapped_column(nullable=False)
+    __table_args__ = (
+        UniqueConstraint('customer_id', 'year', 'bank', name='_customer_year_bank_uc'),
+        Index('ix_customers_trxn_summary_year_bank', 'year', 'bank'),
+    )
+
+class CustomerLeaderboard(Base):
+    __tablename__ = 'customers_leaderboard'
+    year: Mapped[int] = mapped_column(nullable=False)
+    # None for the leaderboard across all banks of the year
+    bank: Mapped[str | None] = mapped_column(nullable=True)
+    rank: Mapped[int] = mapped_column(nullable=False)
+    customer_id: Mapped[int] = mapped_column(ForeignKey('customers.id', ondelete="CASCADE", onupdate="CASCADE"))
+    total_trxns: Mapped[int] = mapped_column(nullable=False)
+    total_amount: Mapped[float] = mapped_column(nullable=False)
+    __table_args__ = (
+        # One customer per rank, the null bank of the leaderboards across all banks included
+        UniqueConstraint('year', 'bank', 'rank', name='_year_bank_rank_uc', postgresql_nulls_not_distinct=True),
+    )
+
+
+class CustomerTrxnMonthly(Base):
+    __tablename__ = 'customers_trxn_monthly'
+    customer_id: Mapped[int] = mapped_column(ForeignKey('customers.id', ondelete="CASCADE", onupdate="CASCADE"))
+    # Partition key, the table is partitioned by year
+    year: Mapped[int] = mapped_column(primary_key=True)
+    bank: Mapped[str] = mapped_column(nullable=False)
+    month: Mapped[date] = mapped_column(nullable=False)
+    total_trxns: Mapped[int] = mapped_column(nullable=False)
+    total_amount: Mapped[float] = mapped_column(nullable=False)
+    __table_args__ = (
+        UniqueConstraint('customer_id', 'year', 'bank', 'month', name='_customer_year_bank_month_uc'),
+        Index('ix_customers_trxn_monthly_year_bank', 'year', 'bank'),
+        {'postgresql_partition_by': 'LIST (year)'},
+    )
@@ -1,6 +1,6 @@
 import uuid
 from sqlalchemy.orm import Mapped, mapped_column
-from sqlalchemy import UniqueConstraint
+from sqlalchemy import UniqueConstraint, Index
 
 from .base import Base
 
@@ -12,4 +12,16 @@ class Upload(Base):
     status: Mapped[str] = mapped_column(nullable=False)
     progress: Mapped[int] = mapped_column(default=0)
     message: Mapped[str] = mapped_column()
-    __table_args__ = (UniqueConstraint('year', 'bank', name='_year_bank_uc'),)
\ No newline at end of file
+    __table_args__ = (
+        UniqueConstraint('year', 'bank', name='_year_bank_uc'),
+        Index('ix_uploads_status_updated_at', 'status', 'updated_at'),
+        Index('ix_uploads_year', 'year'),
+    )
+
+class UploadEvent(Base):
+    __tablename__ = 'upload_events'
+    year: Mapped[int] = mapped_column(nullable=False)
+    bank: Mapped[str] = mapped_column(nullable=False)
+    status: Mapped[str] = mapped_column(nullable=False)
+    progress: Mapped[int] = mapped_column(default=0)
+    message: Mapped[str] = mapped_column()
@@ -1,20 +1,101 @@
-from sqlalchemy import create_engine, URL
+from sqlalchemy import create_engine, event, Engine
 from sqlalchemy.orm import sessionmaker, scoped_session
 from contextlib import contextmanager
-import os
+from contextvars import ContextVar
+import threading
 
 from .helpers.database import get_database_url
+from . import instrumentation
 
 
 DATABASE_URL = get_database_url()
+# The replica endpoint, the same as the writer's when no reader is configured
+DATABASE_READER_URL = get_database_url(reader=True)
 
-engine = create_engine(DATABASE_URL, pool_pre_ping=True)
-SessionLocal = scoped_session(sessionmaker(autocommit=False, autoflush=False, bind=engine))
+# The engines are created on first use, so importing the helpers does not load the database driver
+_engine: Engine | None = None
+_reader_engine: Engine | None = None
+_engine_lock = threading.Lock()
+SessionLocal = scoped_session(sessionmaker(autocommit=False, autoflush=False))
+ReaderSessionLocal = scoped_session(sessionmaker(autocommit=False, autoflush=False))
+
+# Whether the read-only sessions go to the writer, see read_your_writes
+_read_your_writes: ContextVar[bool] = ContextVar('read_your_writes', default=False)
+
+
+def instrument(engine: Engine) -> Engine:
+    """
+    Record the statements of an engine in the track_statements scope they run in.
+
+    Args:
+        engine (Engine): The engine, the sync_engine of an async engine.
+    Returns:
+        Engine: The engine.
+    """
+    for name in ("before_cursor_execute", "after_cursor_execute", "handle_error"):
+        listener = getattr(instrumentation, name)
+        if not event.contains(engine, name, listener):
+            event.listen(engine, name, listener)
+    return engine
+
+def get_engine(readonly: bool = False) -> Engine:
+    """
+    Get the engine shared by the sessions, creating it on first use.
+
+    Args:
+        readonly (bool): Get the engine of the replica, whose transactions are read-only.
+
+    Returns:
+        Engine: The writer engine, or the reader engine when readonly is set.
+    """
+    global _engine, _reader_engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = instrument(create_engine(DATABASE_URL, pool_pre_ping=True))
+            SessionLocal.configure(bind=_engine)
+        if readonly and _reader_engine is None:
+            if DATABASE_READER_URL == DATABASE_URL:
+                # Share the writer's pool when there is no replica
+                _reader_engine = _engine.execution_options(postgresql_readonly=True)
+            else:
+                _reader_engine = instrument(create_engine(
+                    DATABASE_READER_URL,
+                    pool_pre_ping=True,
+                    execution_options={"postgresql_readonly": True},
+                ))
+            ReaderSessionLocal.configure(bind=_reader_engine)
+    return _reader_engine if readonly else _engine
+
+def __getattr__(name: str):
+    # Keep `from internal.database.session import engine` working
+    if name == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+@contextmanager
+def read_your_writes():
+    """
+    Send the read-only sessions opened in this context to the writer, for reads
+    that must see writes the replica may not have replayed yet.
+    """
+    token = _read_your_writes.set(True)
+    try:
+        yield
+    finally:
+        _read_your_writes.reset(token)
 
 @contextmanager
-def get_session():
-    """Provide a transactional scope around a series of operations."""
-    db = SessionLocal()
+def get_session(readonly: bool = False):
+    """
+    Provide a transactional scope around a series of operations.
+
+    Args:
+        readonly (bool): Run the operations in a read-only transaction on the
+            replica, or on the writer within read_your_writes.
+    """
+    readonly = readonly and not _read_your_writes.get()
+    get_engine(readonly)
+    db = (ReaderSessionLocal if readonly else SessionLocal)()
     try:
         yield db
         db.commit()
@@ -22,4 +103,4 @@ def get_session():
         db.rollback()
         raise
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
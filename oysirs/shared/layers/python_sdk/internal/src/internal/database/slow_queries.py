@@ -0,0 +1,144 @@
+from aws_lambda_powertools import Logger
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
+from typing import Any
+import random
+import re
+import sys
+import threading
+import os
+
+from .instrumentation import statement_shape, current_scope
+
+
+logger = Logger()
+
+# Share of the slow statements explained, above DATABASE_SLOW_QUERY_MS
+DATABASE_SLOW_QUERY_SAMPLE_RATE = float(os.getenv('DATABASE_SLOW_QUERY_SAMPLE_RATE', '0.1'))
+
+# Only queries are explained, EXPLAIN plans the others without running them but takes their locks
+_EXPLAINABLE = re.compile(r"\s*(SELECT|WITH)\b", re.IGNORECASE)
+_ASYNCPG_PLACEHOLDER = re.compile(r"\$(\d+)")
+# String and numeric constants of the plans, which hold the values of the parameters
+_PLAN_STRING = re.compile(r"'(?:[^']|'')*'")
+_PLAN_NUMBER = re.compile(r"(?<![\w.$])-?\d+(?:\.\d+)?(?![\w.])")
+# Keys of the plan nodes naming things rather than holding expressions
+_PLAN_NAMES = frozenset({
+    "Node Type", "Parent Relationship", "Subplan Name", "CTE Name", "Relation Name",
+    "Schema", "Alias", "Index Name", "Join Type", "Strategy", "Scan Direction",
+})
+
+# One EXPLAIN at a time in the background, the slow statements meanwhile are dropped
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="slow-queries")
+_pending = threading.Semaphore(1)
+# Set while explaining and recording, so these statements are never recorded themselves
+_recording: ContextVar[bool] = ContextVar('slow_query_recording', default=False)
+
+
+def calling_helper() -> str | None:
+    """
+    Get the innermost function of internal.database.helpers on the stack, which
+    issued the statement being executed. None when the statement was issued
+    from elsewhere, or from a coroutine, whose frames are not on the stack.
+    """
+    frame = sys._getframe(1)
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "")
+        if module.startswith("internal.database.helpers."):
+            return f"{module}.{frame.f_code.co_name}"
+        frame = frame.f_back
+    return None
+
+def redact_plan(plan: Any) -> Any:
+    """
+    Replace the string and numeric constants of the conditions of a JSON plan
+    with ?, as they hold the values of the parameters.
+
+    Args:
+        plan (Any): The plan, or one of its nodes or values.
+    Returns:
+        Any: The plan without the constants, the costs and row estimates are kept.
+    """
+    if isinstance(plan, dict):
+        return {key: value if key in _PLAN_NAMES else redact_plan(value) for key, value in plan.items()}
+    if isinstance(plan, list):
+        return [redact_plan(value) for value in plan]
+    if isinstance(plan, str):
+        return _PLAN_NUMBER.sub("?", _PLAN_STRING.sub("'?'", plan))
+    return plan
+
+def _to_pyformat(statement: str, parameters: tuple) -> tuple[str, tuple]:
+    """
+    Convert an asyncpg statement and its parameters to psycopg2's paramstyle.
+    """
+    ordered = []
+
+    def placeholder(match: re.Match) -> str:
+        ordered.append(parameters[int(match.group(1)) - 1])
+        return "%s"
+
+    statement = _ASYNCPG_PLACEHOLDER.sub(placeholder, statement.replace("%", "%%"))
+    return statement, tuple(ordered)
+
+def record_slow_query(conn, statement: str, parameters, duration: float, executemany: bool) -> None:
+    """
+    Explain a slow statement in the background and record its plan, on a
+    sampled basis. Called by the engine listeners of internal.database.session.
+
+    Args:
+        conn: The connection the statement ran on.
+        statement (str): The statement as sent to the driver.
+        parameters: The parameters of the statement, only used by EXPLAIN.
+        duration (float): The time the statement took in seconds.
+        executemany (bool): Whether the statement ran once per set of parameters.
+    """
+    if _recording.get() or executemany or not _EXPLAINABLE.match(statement):
+        return
+    if random.random() >= DATABASE_SLOW_QUERY_SAMPLE_RATE or not _pending.acquire(blocking=False):
+        return
+    try:
+        _executor.submit(
+            _explain_and_record,
+            statement,
+            parameters,
+            conn.dialect.driver,
+            duration,
+            calling_helper(),
+            current_scope(),
+        )
+    except Exception:
+        _pending.release()
+        raise
+
+def _explain_and_record(
+        statement: str,
+        parameters,
+        driver: str,
+        duration: float,
+        helper: str | None,
+        scope: str | None,
+) -> None:
+    from internal.database.session import get_engine
+    from internal.database.helpers.slow_query import insert_slow_query
+    from internal.database.models.slow_query import SlowQueryModel
+
+    _recording.set(True)
+    try:
+        explained, explained_parameters = statement, parameters
+        if driver == "asyncpg":
+            # The plan comes from the sync replica engine, whatever engine ran the statement
+            explained, explained_parameters = _to_pyformat(statement, tuple(parameters or ()))
+        with get_engine(readonly=True).connect() as conn:
+            plan = conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {explained}", explained_parameters).scalar()
+        insert_slow_query(SlowQueryModel(
+            statement=statement_shape(statement),
+            helper=helper,
+            scope=scope,
+            duration_ms=round(duration * 1000, 2),
+            plan=redact_plan(plan[0]),
+        ))
+        logger.info(f"Recorded a slow query of {helper or scope}: {duration * 1000:.0f} ms")
+    except Exception as e:
+        logger.warning(f"Failed to record a slow query of {helper or scope}: {e}")
+    finally:
+        _pending.release()
@@ -0,0 +1,28 @@
+from internal.database.models.export import *
+from internal.database.helpers.export import EXPORT_COLUMNS, iter_customer_export_batches
+from typing import BinaryIO
+import csv
+import gzip
+import io
+
+
+def write_customers_csv(filters: CustomerExportFiltersModel, fileobj: BinaryIO) -> int:
+    """
+    Write the customers matching the search filters as a gzip compressed CSV.
+    Rows are written batch by batch as they are read from the database.
+
+    Args:
+        filters (CustomerExportFiltersModel): The customer search filters.
+        fileobj (BinaryIO): The binary file to write the compressed CSV to.
+    Returns:
+        int: The number of customers written.
+    """
+    total_rows = 0
+    with gzip.GzipFile(fileobj=fileobj, mode="wb") as compressed:
+        with io.TextIOWrapper(compressed, encoding="utf-8", newline="") as text:
+            writer = csv.writer(text)
+            writer.writerow(EXPORT_COLUMNS)
+            for rows in iter_customer_export_batches(filters):
+                writer.writerows(rows)
+                total_rows += len(rows)
+    return total_rows
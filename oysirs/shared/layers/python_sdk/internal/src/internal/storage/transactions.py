@@ -0,0 +1,333 @@
+from internal.database.models.transaction import *
+from aws_lambda_powertools import Logger
+from concurrent.futures import ThreadPoolExecutor, wait
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.fs as pafs
+import pyarrow.parquet as pq
+from pathlib import PurePosixPath
+from typing import Protocol
+import os
+
+logger = Logger()
+
+TRANSACTION_COLUMNS = ["CUSTOMER_ID", "TRXN_AMOUNT", "TRXN_DATE"]
+# Bounds of the per-bank fan-out, the timeout is in seconds
+READ_MAX_WORKERS = int(os.getenv('TRANSACTIONS_READ_MAX_WORKERS', '8'))
+READ_TIMEOUT = float(os.getenv('TRANSACTIONS_READ_TIMEOUT', '10'))
+
+_filesystem: pafs.FileSystem | None = None
+
+
+class TableCache(Protocol):
+    def get_table(self, bucket: str, key: str, columns: list[str]) -> pa.Table | None:
+        """
+        Get the decoded columns of a parquet object, or None when it is not cached
+        and should be read from S3 directly. Raises FileNotFoundError when the
+        object does not exist.
+        """
+        ...
+
+
+def get_filesystem() -> pafs.FileSystem:
+    """
+    Get the S3 filesystem used to read the banks bucket.
+    Files opened through it are read with ranged GETs, so only the byte
+    ranges that are actually needed are downloaded. It is thread-safe and
+    shared by the concurrent per-bank reads.
+    The endpoint can be overridden with S3_ENDPOINT_URL for local stand-ins.
+
+    Returns:
+        pafs.FileSystem: The shared S3 filesystem.
+    """
+    global _filesystem
+    if _filesystem is None:
+        _filesystem = pafs.S3FileSystem(
+            region=os.getenv('AWS_REGION'),
+            endpoint_override=os.getenv('S3_ENDPOINT_URL'),
+            connect_timeout=READ_TIMEOUT,
+            request_timeout=READ_TIMEOUT,
+        )
+    return _filesystem
+
+
+def select_row_groups(metadata: pq.FileMetaData, column: str, value: int) -> list[int]:
+    """
+    Select the row groups that may contain a value, using their min/max statistics.
+    Row groups without statistics are always selected.
+
+    Args:
+        metadata (pq.FileMetaData): The parquet footer of the file.
+        column (str): The name of the column to match.
+        value (int): The value to look for.
+    Returns:
+        list[int]: The indexes of the row groups to read.
+    """
+    column_idx = metadata.schema.names.index(column)
+    row_groups = []
+    for idx in range(metadata.num_row_groups):
+        statistics = metadata.row_group(idx).column(column_idx).statistics
+        if statistics is None or not statistics.has_min_max:
+            row_groups.append(idx)
+        elif statistics.min <= value <= statistics.max:
+            row_groups.append(idx)
+    return row_groups
+
+
+def list_transaction_banks(bucket: str, year: int, filesystem: pafs.FileSystem | None = None) -> list[str]:
+    """
+    List the banks with a transactions file for a year.
+
+    Args:
+        bucket (str): The banks bucket name.
+        year (int): The year of the transactions.
+        filesystem (pafs.FileSystem | None): The filesystem to read from, S3 when None.
+    Returns:
+        list[str]: The bank names, sorted.
+    """
+    filesystem = filesystem or get_filesystem()
+    selector = pafs.FileSelector(f"{bucket}/{year}", allow_not_found=True)
+    return sorted(
+        PurePosixPath(info.path).stem
+        for info in filesystem.get_file_info(selector)
+        if info.type == pafs.FileType.File and info.path.endswith('.parquet')
+    )
+
+
+def list_transaction_files(bucket: str, filesystem: pafs.FileSystem | None = None) -> list[tuple[int, str]]:
+    """
+    List the years and banks with a transactions file, across all years.
+
+    Args:
+        bucket (str): The banks bucket name.
+        filesystem (pafs.FileSystem | None): The filesystem to read from, S3 when None.
+    Returns:
+        list[tuple[int, str]]: The (year, bank) of each `{year}/{bank}.parquet` file, sorted.
+    """
+    filesystem = filesystem or get_filesystem()
+    selector = pafs.FileSelector(bucket, recursive=True, allow_not_found=True)
+    files = []
+    for info in filesystem.get_file_info(selector):
+        path = PurePosixPath(info.path).relative_to(PurePosixPath(bucket))
+        if info.type == pafs.FileType.File and path.suffix == '.parquet' and len(path.parts) == 2 and path.parts[0].isdigit():
+            files.append((int(path.parts[0]), path.stem))
+    return sorted(files)
+
+
+def read_transactions(bucket: str, year: int, bank: str, filesystem: pafs.FileSystem | None = None) -> pd.DataFrame:
+    """
+    Read all the transactions of the `{year}/{bank}.parquet` file.
+
+    Args:
+        bucket (str): The banks bucket name.
+        year (int): The year of the transactions.
+        bank (str): The bank of the transactions.
+        filesystem (pafs.FileSystem | None): The filesystem to read from, S3 when None.
+    Returns:
+        pd.DataFrame: The transactions, as written by the banks raw processor.
+    """
+    filesystem = filesystem or get_filesystem()
+    return pq.read_table(f"{bucket}/{year}/{bank}.parquet", columns=TRANSACTION_COLUMNS, filesystem=filesystem).to_pandas()
+
+
+def transaction_rollups(df: pd.DataFrame) -> list[TransactionRollupModel]:
+    """
+    Compute the per-customer rollups of the transactions of an upload.
+
+    Args:
+        df (pd.DataFrame): The transactions, with the TRANSACTION_COLUMNS.
+    Returns:
+        list[TransactionRollupModel]: The rollups, one per customer.
+    """
+    rollups = df.groupby("CUSTOMER_ID").agg(
+        total_trxns=("TRXN_AMOUNT", "size"),
+        total_amount=("TRXN_AMOUNT", "sum"),
+    ).reset_index()
+    return [
+        TransactionRollupModel(
+            customer_id=row.CUSTOMER_ID,
+            total_trxns=row.total_trxns,
+            total_amount=row.total_amount,
+        )
+        for row in rollups.itertuples(index=False)
+    ]
+
+
+def transaction_monthly_rollups(df: pd.DataFrame) -> list[TransactionMonthlyRollupModel]:
+    """
+    Compute the per-customer monthly rollups of the transactions of an upload.
+    The transactions without a valid date are left out.
+
+    Args:
+        df (pd.DataFrame): The transactions, with the TRANSACTION_COLUMNS.
+    Returns:
+        list[TransactionMonthlyRollupModel]: The rollups, one per customer and month.
+    """
+    trxn_dates = pd.to_datetime(df["TRXN_DATE"], errors="coerce")
+    monthly = df.assign(MONTH=trxn_dates.dt.to_period("M").dt.start_time)
+    monthly = monthly[monthly["MONTH"].notna()].groupby(["CUSTOMER_ID", "MONTH"]).agg(
+        total_trxns=("TRXN_AMOUNT", "size"),
+        total_amount=("TRXN_AMOUNT", "sum"),
+    ).reset_index()
+    return [
+        TransactionMonthlyRollupModel(
+            customer_id=row.CUSTOMER_ID,
+            month=row.MONTH.date(),
+            total_trxns=row.total_trxns,
+            total_amount=row.total_amount,
+        )
+        for row in monthly.itertuples(index=False)
+    ]
+
+
+def read_customer_transactions(
+        bucket: str,
+        year: int,
+        bank: str,
+        customer_id: int,
+        filesystem: pafs.FileSystem | None = None,
+        cache: TableCache | None = None,
+) -> pa.Table:
+    """
+    Read the transactions of a customer from the `{year}/{bank}.parquet` file.
+    The file is served from the cache when it has it. Otherwise only the footer
+    and the row groups whose CUSTOMER_ID range contains the customer are fetched,
+    never the whole file.
+
+    Args:
+        bucket (str): The banks bucket name.
+        year (int): The year of the transactions.
+        bank (str): The bank of the transactions.
+        customer_id (int): The ID of the customer.
+        filesystem (pafs.FileSystem | None): The filesystem to read from, S3 when None.
+        cache (TableCache | None): The cache of decoded transaction files, if any.
+    Returns:
+        pa.Table: The customer's transactions, empty when the file does not exist.
+    """
+    key = f"{year}/{bank}.parquet"
+    try:
+        table = cache.get_table(bucket, key, TRANSACTION_COLUMNS) if cache else None
+        if table is None:
+            filesystem = filesystem or get_filesystem()
+            with filesystem.open_input_file(f"{bucket}/{key}") as source:
+                parquet_file = pq.ParquetFile(source, pre_buffer=True)
+                row_groups = select_row_groups(parquet_file.metadata, "CUSTOMER_ID", customer_id)
+                table = parquet_file.read_row_groups(row_groups, columns=TRANSACTION_COLUMNS)
+    except FileNotFoundError:
+        return pa.table({column: [] for column in TRANSACTION_COLUMNS})
+    return table.filter(pc.equal(table["CUSTOMER_ID"], customer_id))
+
+
+def read_banks_customer_transactions(
+        bucket: str,
+        year: int,
+        banks: list[str],
+        customer_id: int,
+        filesystem: pafs.FileSystem | None = None,
+        timeout: float = READ_TIMEOUT,
+        cache: TableCache | None = None,
+) -> tuple[dict[str, pa.Table], list[str]]:
+    """
+    Read the transactions of a customer from several banks' files concurrently.
+    The reads run on a bounded thread pool sharing one filesystem, and the
+    banks that fail or do not finish within the timeout are reported instead
+    of failing or delaying the whole read.
+
+    Args:
+        bucket (str): The banks bucket name.
+        year (int): The year of the transactions.
+        banks (list[str]): The banks to read.
+        customer_id (int): The ID of the customer.
+        filesystem (pafs.FileSystem | None): The filesystem to read from, S3 when None.
+        timeout (float): The time in seconds to wait for the reads.
+        cache (TableCache | None): The cache of decoded transaction files, if any.
+    Returns:
+        tuple[dict[str, pa.Table], list[str]]: The transactions of each bank that
+            was read, and the banks that could not be read.
+    """
+    filesystem = filesystem or get_filesystem()
+    executor = ThreadPoolExecutor(max_workers=max(1, min(READ_MAX_WORKERS, len(banks))))
+    try:
+        futures = {
+            executor.submit(read_customer_transactions, bucket, year, bank, customer_id, filesystem, cache): bank
+            for bank in banks
+        }
+        done, not_done = wait(futures, timeout=timeout)
+    finally:
+        # Do not wait for the reads that timed out
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    tables = {}
+    failed_banks = [futures[future] for future in not_done]
+    for future in done:
+        bank = futures[future]
+        try:
+            tables[bank] = future.result()
+        except Exception as e:
+            logger.warning(f"Failed to read transactions of {year}/{bank}: {e}")
+            failed_banks.append(bank)
+    if not_done:
+        logger.warning(f"Timed out reading transactions of {year} for banks: {[futures[f] for f in not_done]}")
+    return tables, sorted(failed_banks)
+
+
+def list_customer_transactions(
+        bucket: str,
+        customer_id: int,
+        year: int,
+        bank: str | None = None,
+        offset: int = 0,
+        limit: int = 10,
+        filesystem: pafs.FileSystem | None = None,
+        cache: TableCache | None = None,
+        banks: list[str] | None = None,
+) -> TransactionListModel:
+    """
+    List the transactions of a customer for a year, ordered by bank and date.
+    The banks that could not be read are listed in failed_banks and left out
+    of the results. When the banks containing the customer are known, only
+    their files are opened instead of every file of the year.
+
+    Args:
+        bucket (str): The banks bucket name.
+        customer_id (int): The ID of the customer.
+        year (int): The year of the transactions.
+        bank (str | None): The bank of the transactions, all banks when None.
+        offset (int): The offset for pagination.
+        limit (int): The maximum number of records to return.
+        filesystem (pafs.FileSystem | None): The filesystem to read from, S3 when None.
+        cache (TableCache | None): The cache of decoded transaction files, if any.
+        banks (list[str] | None): The banks whose files contain the customer, when known.
+    Returns:
+        TransactionListModel: A page of the customer's transactions.
+    """
+    filesystem = filesystem or get_filesystem()
+    if bank:
+        banks = [bank]
+    elif banks is None:
+        banks = list_transaction_banks(bucket, year, filesystem)
+    if not banks:
+        return TransactionListModel(transactions=[], total=0, offset=offset, limit=limit)
+    tables, failed_banks = read_banks_customer_transactions(bucket, year, banks, customer_id, filesystem, cache=cache)
+
+    rows = []
+    for bank_name in sorted(tables):
+        table = tables[bank_name].sort_by([("TRXN_DATE", "ascending")])
+        rows.extend((bank_name, row) for row in table.to_pylist())
+
+    return TransactionListModel(
+        transactions=[
+            TransactionModel(
+                bank=bank_name,
+                customer_id=row["CUSTOMER_ID"],
+                trxn_amount=row["TRXN_AMOUNT"],
+                trxn_date=row["TRXN_DATE"],
+            )
+            for bank_name, row in rows[offset:offset + limit]
+        ],
+        total=len(rows),
+        offset=offset,
+        limit=limit,
+        failed_banks=failed_banks,
+    )
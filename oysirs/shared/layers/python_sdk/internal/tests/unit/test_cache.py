@@ -0,0 +1,156 @@
+from unittest import TestCase, main, mock
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import time
+
+import internal.cache.backends as backends
+from internal.cache.backends import LRUCache, NullCache, RedisCache
+from internal.cache.tags import upload_tags, CUSTOMERS_TAG, transactions_tag
+
+
+class InMemoryRedis:
+    """
+    Stand-in for a redis.Redis client decoding the responses, with the commands used by RedisCache.
+    """
+
+    def __init__(self):
+        self.values: dict[str, tuple[float | None, str]] = {}
+        self.lock = threading.Lock()
+
+    def _get(self, key):
+        entry = self.values.get(key)
+        if entry and entry[0] is not None and entry[0] <= time.monotonic():
+            del self.values[key]
+            return None
+        return entry[1] if entry else None
+
+    def mget(self, keys):
+        with self.lock:
+            return [self._get(key) for key in keys]
+
+    def set(self, key, value, px=None, nx=False):
+        with self.lock:
+            if nx and self._get(key) is not None:
+                return None
+            self.values[key] = (time.monotonic() + px / 1000 if px else None, str(value))
+            return True
+
+    def delete(self, key):
+        with self.lock:
+            return int(self.values.pop(key, None) is not None)
+
+    def incr(self, key):
+        with self.lock:
+            value = int(self._get(key) or 0) + 1
+            self.values[key] = (None, str(value))
+            return value
+
+
+class CacheTests:
+    """Tests run against every backend."""
+
+    def make_cache(self):
+        raise NotImplementedError
+
+    def setUp(self):
+        self.cache = self.make_cache()
+
+    def test_ttl(self):
+        self.cache.set("a", "1", ttl=0.05)
+        self.assertEqual(self.cache.get("a"), "1")
+        time.sleep(0.06)
+        self.assertIsNone(self.cache.get("a"))
+
+    def test_add(self):
+        self.assertTrue(self.cache.add("lock", "x", ttl=10))
+        self.assertFalse(self.cache.add("lock", "y", ttl=10))
+        self.cache.delete("lock")
+        self.assertTrue(self.cache.add("lock", "y", ttl=10))
+
+    def test_invalidate(self):
+        compute = mock.Mock(side_effect=["v1", "v2", "v3"])
+        tags = [CUSTOMERS_TAG, transactions_tag(2024)]
+        self.assertEqual(self.cache.get_or_set("customer:1", compute, ttl=60, tags=tags), "v1")
+        self.assertEqual(self.cache.get_or_set("customer:1", compute, ttl=60, tags=tags), "v1")
+        self.cache.invalidate(transactions_tag(2023))
+        self.assertEqual(self.cache.get_or_set("customer:1", compute, ttl=60, tags=tags), "v1")
+        self.cache.invalidate(*upload_tags(2024))
+        self.assertEqual(self.cache.get_or_set("customer:1", compute, ttl=60, tags=tags), "v2")
+        self.assertEqual(compute.call_count, 2)
+
+    def test_none_is_not_cached(self):
+        compute = mock.Mock(return_value=None)
+        self.assertIsNone(self.cache.get_or_set("missing", compute, ttl=60))
+        self.assertIsNone(self.cache.get_or_set("missing", compute, ttl=60))
+        self.assertEqual(compute.call_count, 2)
+
+    def test_single_flight(self):
+        calls = []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.2)
+            return "report"
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(lambda _: self.cache.get_or_set("report", compute, ttl=60), range(8)))
+        self.assertEqual(results, ["report"] * 8)
+        self.assertEqual(len(calls), 1)
+        self.assertIsNone(self.cache.get("lock:report"))
+
+    def test_failed_computation_releases_lock(self):
+        with self.assertRaises(ZeroDivisionError):
+            self.cache.get_or_set("report", lambda: 1 / 0, ttl=60)
+        self.assertEqual(self.cache.get_or_set("report", lambda: "report", ttl=60), "report")
+
+
+class TestLRUCache(CacheTests, TestCase):
+    def make_cache(self):
+        return LRUCache(max_entries=3)
+
+    def test_eviction(self):
+        self.cache.invalidate("tag")
+        for key in "abcd":
+            self.cache.set(key, key, ttl=60)
+        self.assertEqual(self.cache.get_many(list("abcd")), [None, "b", "c", "d"])
+        # Tag generations are never evicted
+        self.assertEqual(self.cache.get("tag:tag"), "1")
+
+
+class TestRedisCache(CacheTests, TestCase):
+    def make_cache(self):
+        return RedisCache(InMemoryRedis(), prefix="test:")
+
+    def test_unavailable(self):
+        client = mock.Mock()
+        client.mget.side_effect = ConnectionError("down")
+        cache = RedisCache(client)
+        self.assertEqual(cache.get_or_set("report", lambda: "report", ttl=60, tags=["t"]), "report")
+        client.set.assert_not_called()
+
+
+class TestNullCache(TestCase):
+    def test_computes_every_time(self):
+        cache = NullCache()
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return "report"
+
+        self.assertEqual(cache.get_or_set("report", compute, ttl=60, tags=["t"]), "report")
+        self.assertEqual(cache.get_or_set("report", compute, ttl=60, tags=["t"]), "report")
+        self.assertEqual(len(calls), 2)
+        cache.invalidate("t")
+        self.assertIsNone(cache.get("report"))
+
+
+class TestGetCache(TestCase):
+    def test_default_backend(self):
+        with mock.patch.object(backends, "CACHE_URL", None), mock.patch.object(backends, "_cache", None):
+            self.assertIsInstance(backends.get_cache(), NullCache)
+            self.assertIs(backends.get_cache(), backends.get_cache())
+
+
+if __name__ == "__main__":
+    main()
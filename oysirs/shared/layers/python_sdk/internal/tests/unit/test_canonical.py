@@ -0,0 +1,34 @@
+from unittest import TestCase, main
+
+from internal.database.helpers.canonical import canonicalize
+
+
+class TestCanonicalize(TestCase):
+    def test_mobile_no(self):
+        for mobile_no in ["+2348031234567", "2348031234567", "08031234567", "0803 123 4567", "8031234567", "002348031234567"]:
+            self.assertEqual(canonicalize("mobile_no", mobile_no), "+2348031234567", mobile_no)
+        self.assertEqual(canonicalize("mobile_no", "+44 20 7946 0958"), "+442079460958")
+
+    def test_email(self):
+        self.assertEqual(canonicalize("email", " Ada.Obi@Example.COM "), "ada.obi@example.com")
+
+    def test_registration_nos(self):
+        self.assertEqual(canonicalize("tin", "1234-5678 001"), "12345678001")
+        self.assertEqual(canonicalize("tax_id", "ng/1234.56"), "NG123456")
+        self.assertEqual(canonicalize("rc", "RC-123456"), "123456")
+        self.assertEqual(canonicalize("rc", "rc 123456"), "123456")
+        self.assertEqual(canonicalize("rc", "123456"), "123456")
+
+    def test_without_key(self):
+        self.assertIsNone(canonicalize("tin", "--- / ."))
+        self.assertIsNone(canonicalize("rc", "-"))
+        self.assertIsNone(canonicalize("mobile_no", "+ n/a"))
+        self.assertIsNone(canonicalize("name", "  \t "))
+
+    def test_text(self):
+        self.assertEqual(canonicalize("name", "  Ada   OBI "), "ada obi")
+        self.assertEqual(canonicalize("address", "12 Broad\tStreet,\nLagos"), "12 broad street, lagos")
+
+
+if __name__ == "__main__":
+    main()
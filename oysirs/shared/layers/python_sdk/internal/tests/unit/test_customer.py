@@ -0,0 +1,416 @@
+from unittest import TestCase, main, skipUnless, mock
+import json
+import uuid
+
+from internal.database.helpers.database import get_database_url
+
+
+def shape(value):
+    """
+    Reduce a decoded JSON document to its keys (in order) and value types.
+    """
+    if isinstance(value, dict):
+        return {key: shape(item) for key, item in value.items()}, list(value)
+    if isinstance(value, list):
+        return [shape(item) for item in value]
+    return type(value).__name__
+
+
+@skipUnless(get_database_url(), "DATABASE_* environment variables are not set")
+class TestCustomerJson(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        from internal.database.session import engine
+        from internal.database.schemas.base import Base
+        from internal.database.models.customer import (
+            CustomerModel,
+            CustomerNameModel,
+            CustomerEmailModel,
+            CustomerMobileNoModel,
+            CustomerTinModel,
+        )
+        from internal.database.helpers.customer import insert_or_update_customer
+
+        Base.metadata.create_all(engine)
+        cls.marker = uuid.uuid4().hex[:12]
+        cls.national_no = f"8{uuid.uuid4().int % 10**9:09d}"
+        cls.customer_ids = [
+            insert_or_update_customer(CustomerModel(
+                names=[CustomerNameModel(name=f"{cls.marker} ada"), CustomerNameModel(name=f"{cls.marker} obi")],
+                emails=[CustomerEmailModel(email=f"ada.{cls.marker}@example.com")],
+                mobiles=[CustomerMobileNoModel(mobile_no=f"+234{cls.national_no}")],
+            )),
+            insert_or_update_customer(CustomerModel(
+                names=[CustomerNameModel(name=f"{cls.marker} bola")],
+                tins=[CustomerTinModel(tin=f"tin-{cls.marker}")],
+            )),
+        ]
+
+    def test_list_customers_json_matches_model(self):
+        from internal.database.models.customer import CustomerListModel
+        from internal.database.helpers.customer import list_customers, list_customers_json
+
+        expected = list_customers(name=self.marker, offset=0, limit=10)
+        actual = list_customers_json(name=self.marker, offset=0, limit=10)
+
+        self.assertEqual(shape(json.loads(actual)), shape(json.loads(expected.model_dump_json())))
+        self.assertEqual(CustomerListModel.model_validate_json(actual), expected)
+        self.assertEqual(expected.total, 2)
+
+    def test_list_customers_json_pagination(self):
+        from internal.database.models.customer import CustomerListModel
+        from internal.database.helpers.customer import list_customers, list_customers_json
+
+        expected = list_customers(name=self.marker, offset=1, limit=1)
+        actual = CustomerListModel.model_validate_json(list_customers_json(name=self.marker, offset=1, limit=1))
+        self.assertEqual(actual, expected)
+        self.assertEqual([c.id for c in actual.customers], self.customer_ids[1:])
+
+    def test_list_customers_json_empty(self):
+        from internal.database.helpers.customer import list_customers_json
+
+        actual = json.loads(list_customers_json(email=f"missing-{self.marker}"))
+        self.assertEqual(actual, {"customers": [], "total": 0, "offset": 0, "limit": 10})
+
+    def test_list_customers_filters(self):
+        from internal.database.helpers.customer import list_customers
+
+        first, second = self.customer_ids
+        actual = list_customers(name=self.marker, email=f" ADA.{self.marker}@Example.com")
+        self.assertEqual([c.id for c in actual.customers], [first])
+        self.assertEqual(actual.total, 1)
+        self.assertEqual(list_customers(name=f"{self.marker} bola", tin=f"TIN {self.marker}").total, 1)
+        self.assertEqual(list_customers(mobile_no=f"0{self.national_no}").total, 1)
+        self.assertEqual(list_customers(name=f"{self.marker} bola", email=self.marker).total, 0)
+
+    def test_resolve_customer_id(self):
+        from internal.database.helpers.customer import resolve_customer_id, get_customer_id_from_tins
+
+        first, second = self.customer_ids
+        email = f"ada.{self.marker}@example.com"
+        tin = f"tin-{self.marker}"
+        self.assertEqual(resolve_customer_id(emails=[email]), first)
+        # Emails are trusted before TINs
+        self.assertEqual(resolve_customer_id(emails=[email], tins=[tin]), first)
+        self.assertEqual(resolve_customer_id(emails=[f"missing.{self.marker}@example.com"], tins=[tin]), second)
+        self.assertEqual(get_customer_id_from_tins([tin]), second)
+        # Other ways of writing the identifiers resolve to the same customers
+        self.assertEqual(resolve_customer_id(mobile_nos=[f"0{self.national_no}"]), first)
+        self.assertEqual(resolve_customer_id(mobile_nos=[f"234 {self.national_no}"]), first)
+        self.assertEqual(resolve_customer_id(tins=[f"TIN {self.marker.upper()}"]), second)
+        self.assertIsNone(resolve_customer_id(emails=[], tins=[]))
+
+    def test_identifiers_without_key(self):
+        import sqlalchemy as sa
+        from internal.database.session import get_session
+        from internal.database.schemas.customer import CustomerIdentifier
+        from internal.database.models.customer import CustomerModel, CustomerTinModel
+        from internal.database.helpers.customer import insert_or_update_customer, resolve_customer_id, list_customers
+
+        first, _ = self.customer_ids
+        insert_or_update_customer(CustomerModel(id=first, tins=[CustomerTinModel(tin="--- / .")]))
+        with get_session() as session:
+            self.assertIsNone(session.scalar(
+                sa.select(CustomerIdentifier.canonical).where(CustomerIdentifier.kind == "tin", CustomerIdentifier.value == "--- / .")
+            ))
+        # Punctuation only matches nothing, not even the same value
+        self.assertIsNone(resolve_customer_id(tins=["--- / ."]))
+        self.assertIsNone(resolve_customer_id(tins=["."]))
+        self.assertEqual(list_customers(tin="--- / .").total, 0)
+
+    def test_backfill_canonical_identifiers(self):
+        from internal.database.session import get_session
+        from internal.database.schemas.customer import CustomerIdentifier
+        from internal.database.helpers.customer import backfill_canonical_identifiers, resolve_customer_id
+        import sqlalchemy as sa
+
+        first, second = self.customer_ids
+        rc = f"RC-{self.marker}"
+        with get_session() as session:
+            session.add(CustomerIdentifier(kind="rc", value=rc, customer_id=second))
+        self.assertEqual(resolve_customer_id(rcs=[rc]), second)
+        self.assertIsNone(resolve_customer_id(rcs=[self.marker]))
+
+        self.assertGreaterEqual(backfill_canonical_identifiers(batch_size=1), 1)
+        self.assertEqual(backfill_canonical_identifiers(), 0)
+        self.assertEqual(resolve_customer_id(rcs=[self.marker]), second)
+        with get_session() as session:
+            self.assertEqual(
+                session.scalar(sa.select(CustomerIdentifier.canonical).where(CustomerIdentifier.value == rc)),
+                self.marker.upper(),
+            )
+
+    def test_get_customer_json_by_id(self):
+        from internal.database.models.customer import CustomerModel
+        from internal.database.helpers.customer import get_customer_by_id, get_customer_json_by_id
+
+        expected = get_customer_by_id(self.customer_ids[0])
+        actual = get_customer_json_by_id(self.customer_ids[0])
+        self.assertEqual(shape(json.loads(actual)), shape(json.loads(expected.model_dump_json())))
+        self.assertEqual(CustomerModel.model_validate_json(actual), expected)
+        self.assertIsNone(get_customer_json_by_id(-1))
+
+    def test_customer_json_timestamps(self):
+        import re
+        import sqlalchemy as sa
+        from internal.database.session import get_session
+        from internal.database.schemas.customer import Customer, CustomerName
+        from internal.database.helpers.customer import get_customer_by_id, get_customer_json_by_id
+
+        customer_id = self.customer_ids[1]
+        with get_session() as session:
+            session.execute(
+                sa.update(Customer).where(Customer.id == customer_id)
+                .values(created_at="2026-01-02 03:04:05.5", updated_at="2026-01-02 03:04:05")
+            )
+            session.execute(
+                sa.update(CustomerName).where(CustomerName.customer_id == customer_id)
+                .values(created_at="2026-01-02 03:04:05.000123", updated_at="2026-01-02 03:04:05.12")
+            )
+            session.commit()
+
+        actual = get_customer_json_by_id(customer_id)
+        expected = get_customer_by_id(customer_id).model_dump_json()
+        timestamps = re.compile(r'"(?:created_at|updated_at)"\s*:\s*("[^"]*")')
+        self.assertEqual(timestamps.findall(actual)[:4], [
+            '"2026-01-02T03:04:05.500000"', '"2026-01-02T03:04:05"',
+            '"2026-01-02T03:04:05.000123"', '"2026-01-02T03:04:05.120000"',
+        ])
+        self.assertEqual(timestamps.findall(actual), timestamps.findall(expected))
+
+    def test_lookup_customers_json(self):
+        from internal.database.models.customer import CustomerLookupModel, CustomerLookupRequestModel
+        from internal.database.helpers.customer import get_customer_by_id, lookup_customers_json
+        import internal.database.helpers.customer as helpers
+
+        first, second = self.customer_ids
+        lookup = CustomerLookupRequestModel(
+            ids=[first, -1],
+            emails=[f"ada.{self.marker}@example.com", f"missing.{self.marker}@example.com"],
+            tins=[f"tin-{self.marker}"],
+        )
+        with mock.patch.object(helpers, "LOOKUP_CHUNK_SIZE", 1):
+            actual = lookup_customers_json(lookup)
+
+        expected = CustomerLookupModel(
+            customers={first: get_customer_by_id(first), second: get_customer_by_id(second)},
+            emails={f"ada.{self.marker}@example.com": first},
+            tins={f"tin-{self.marker}": second},
+        )
+        self.assertEqual(CustomerLookupModel.model_validate_json(actual), expected)
+        self.assertEqual(
+            json.loads(lookup_customers_json(CustomerLookupRequestModel())),
+            {"customers": {}, "emails": {}, "mobile_nos": {}, "tax_ids": {}, "tins": {}, "rcs": {}},
+        )
+
+    def test_customer_export(self):
+        from internal.database.models.export import CustomerExportFiltersModel, ExportStatus
+        from internal.database.helpers.export import (
+            create_customer_export,
+            get_customer_export,
+            update_customer_export,
+            iter_customer_export_batches,
+        )
+        from internal.storage.exports import write_customers_csv
+        import csv
+        import gzip
+        import io
+
+        filters = CustomerExportFiltersModel(name=self.marker)
+        export = create_customer_export(filters)
+        self.assertEqual(export.status, ExportStatus.PENDING)
+        self.assertEqual(get_customer_export(export.id).filters, filters)
+
+        batches = list(iter_customer_export_batches(filters, batch_size=1))
+        self.assertEqual([[row[0] for row in rows] for rows in batches], [[i] for i in self.customer_ids])
+
+        data = io.BytesIO()
+        self.assertEqual(write_customers_csv(filters, data), 2)
+        rows = list(csv.DictReader(io.StringIO(gzip.decompress(data.getvalue()).decode())))
+        self.assertEqual([int(row["id"]) for row in rows], self.customer_ids)
+        self.assertEqual(rows[0]["names"], f"{self.marker} ada; {self.marker} obi")
+        self.assertEqual(rows[1]["emails"], "")
+
+        update_customer_export(export.id, ExportStatus.COMPLETED, total_rows=2, key="customers/1.csv.gz")
+        export = get_customer_export(export.id)
+        self.assertEqual((export.status, export.total_rows, export.key), (ExportStatus.COMPLETED, 2, "customers/1.csv.gz"))
+
+    def test_get_customer_with_stats_json(self):
+        from internal.database.models.customer import CustomerWithStatsModel, TransactionSummaryModel
+        from internal.database.models.transaction import TransactionRollupModel
+        from internal.database.helpers.customer import get_customer_by_id, get_customer_with_stats_json
+        from internal.database.helpers.transaction import replace_trxn_summaries
+
+        customer_id = self.customer_ids[0]
+        bank = f"bank-{self.marker}"
+        replace_trxn_summaries(1900, bank, [TransactionRollupModel(customer_id=customer_id, total_trxns=9, total_amount=1.0)])
+        # Reloading a year and bank replaces its previous rollups
+        replace_trxn_summaries(1900, bank, [TransactionRollupModel(customer_id=customer_id, total_trxns=3, total_amount=15.5)])
+
+        expected = CustomerWithStatsModel(
+            customer=get_customer_by_id(customer_id),
+            trxn_summary=[TransactionSummaryModel(bank=bank, total_trxns=3, total_amount=15.5)],
+        )
+        actual = get_customer_with_stats_json(customer_id, year=1900, bank=bank)
+        self.assertEqual(shape(json.loads(actual)), shape(json.loads(expected.model_dump_json())))
+        self.assertEqual(CustomerWithStatsModel.model_validate_json(actual), expected)
+
+        actual = CustomerWithStatsModel.model_validate_json(get_customer_with_stats_json(customer_id, year=1901))
+        self.assertEqual(actual.trxn_summary, [])
+        self.assertIsNone(get_customer_with_stats_json(-1, year=1900))
+
+    def test_get_customer_with_stats_json_absent_bank(self):
+        from internal.database.models.customer import CustomerWithStatsModel, TransactionSummaryModel
+        from internal.database.models.transaction import TransactionRollupModel
+        from internal.database.models.upload import UploadModel, UploadStatus
+        from internal.database.helpers.customer import get_customer_with_stats_json, get_customer_version
+        from internal.database.helpers.transaction import replace_trxn_summaries
+        from internal.database.helpers.upload import insert_or_update_upload
+
+        customer_id = self.customer_ids[0]
+        present, absent = f"bank-a-{self.marker}", f"bank-b-{self.marker}"
+        for bank in (present, absent):
+            insert_or_update_upload(UploadModel(year=1902, bank=bank, status=UploadStatus.COMPLETED, progress=100))
+        replace_trxn_summaries(1902, present, [TransactionRollupModel(customer_id=customer_id, total_trxns=2, total_amount=7.5)])
+
+        # Banks with a completed upload of the year are listed with zero totals when the customer is absent from them
+        actual = CustomerWithStatsModel.model_validate_json(get_customer_with_stats_json(customer_id, year=1902))
+        self.assertEqual(
+            [summary for summary in actual.trxn_summary if summary.bank in (present, absent)],
+            [
+                TransactionSummaryModel(bank=present, total_trxns=2, total_amount=7.5),
+                TransactionSummaryModel(bank=absent, total_trxns=0, total_amount=0),
+            ],
+        )
+        actual = CustomerWithStatsModel.model_validate_json(get_customer_with_stats_json(customer_id, year=1902, bank=absent))
+        self.assertEqual(actual.trxn_summary, [TransactionSummaryModel(bank=absent, total_trxns=0, total_amount=0)])
+
+        # Banks without a completed upload are not listed, and completing one changes the version
+        other = f"bank-c-{self.marker}"
+        insert_or_update_upload(UploadModel(year=1902, bank=other, status=UploadStatus.IN_PROGRESS, progress=50))
+        self.assertEqual(get_customer_with_stats_json(customer_id, year=1902, bank=other).count('"bank"'), 0)
+        version = get_customer_version(customer_id, year=1902)
+        insert_or_update_upload(UploadModel(year=1902, bank=other, status=UploadStatus.COMPLETED, progress=100))
+        self.assertNotEqual(get_customer_version(customer_id, year=1902), version)
+
+    def test_get_customer_detail_async(self):
+        from internal.database.aio import run
+        from internal.database.helpers.customer import (
+            get_customer_detail_async,
+            get_customer_version,
+            get_customer_with_stats_json,
+        )
+
+        first = self.customer_ids[0]
+        self.assertEqual(
+            run(get_customer_detail_async(first, year=2024)),
+            (get_customer_version(first, year=2024), get_customer_with_stats_json(first, year=2024)),
+        )
+        self.assertEqual(run(get_customer_detail_async(-1, year=2024)), (None, None))
+
+    def test_customer_version(self):
+        from internal.database.models.customer import CustomerModel, CustomerRcModel
+        from internal.database.models.transaction import TransactionRollupModel
+        from internal.database.helpers.customer import get_customer_version, insert_or_update_customer
+        from internal.database.helpers.transaction import replace_trxn_summaries
+
+        customer_id = self.customer_ids[1]
+        year = 1600 + int(self.marker, 16) % 100
+        version = get_customer_version(customer_id, year)
+        self.assertEqual(get_customer_version(customer_id, year), version)
+        self.assertNotEqual(get_customer_version(customer_id, year + 1), version)
+        self.assertIsNone(get_customer_version(-1, year))
+
+        insert_or_update_customer(CustomerModel(id=customer_id, rcs=[CustomerRcModel(rc=f"rc-{self.marker}")]))
+        self.assertNotEqual(get_customer_version(customer_id, year), version)
+
+        version = get_customer_version(customer_id, year)
+        bank_version = get_customer_version(customer_id, year, bank="zenith")
+        replace_trxn_summaries(year, "gtb", [TransactionRollupModel(customer_id=customer_id, total_trxns=1, total_amount=1.0)])
+        self.assertNotEqual(get_customer_version(customer_id, year), version)
+        self.assertEqual(get_customer_version(customer_id, year, bank="zenith"), bank_version)
+
+    def test_leaderboards(self):
+        from internal.database.models.transaction import TransactionRollupModel
+        from concurrent.futures import ThreadPoolExecutor
+        from internal.database.helpers.transaction import (
+            replace_trxn_summaries,
+            refresh_leaderboards,
+            get_top_customers,
+            get_customer_banks,
+        )
+
+        first, second = self.customer_ids
+        year = 1800 + int(self.marker, 16) % 100
+        replace_trxn_summaries(year, "gtb", [
+            TransactionRollupModel(customer_id=first, total_trxns=1, total_amount=10.0),
+            TransactionRollupModel(customer_id=second, total_trxns=2, total_amount=30.0),
+        ])
+        refresh_leaderboards(year, "gtb")
+        replace_trxn_summaries(year, "zenith", [TransactionRollupModel(customer_id=first, total_trxns=4, total_amount=25.0)])
+        refresh_leaderboards(year, "zenith")
+        self.assertEqual(get_customer_banks(first, year), ["gtb", "zenith"])
+        self.assertEqual(get_customer_banks(second, year), ["gtb"])
+        self.assertEqual(get_customer_banks(second, year + 1), [])
+
+        result = get_top_customers(year)
+        self.assertEqual(
+            [(r.rank, r.customer_id, r.total_trxns, r.total_amount) for r in result.rows],
+            [(1, first, 5, 35.0), (2, second, 2, 30.0)],
+        )
+        self.assertEqual(result.rows[0].names, [f"{self.marker} ada", f"{self.marker} obi"])
+        self.assertEqual([r.customer_id for r in get_top_customers(year, bank="gtb").rows], [second, first])
+        self.assertEqual([r.customer_id for r in get_top_customers(year, bank="zenith", limit=1).rows], [first])
+
+        # Refreshing a bank replaces its leaderboard and the year's, without duplicates
+        refresh_leaderboards(year, "gtb")
+        self.assertEqual(len(get_top_customers(year).rows), 2)
+        self.assertEqual(len(get_top_customers(year, bank="zenith").rows), 1)
+
+        # Concurrent uploads of the year take turns replacing its leaderboard
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            list(executor.map(refresh_leaderboards, [year] * 8, ["gtb", "zenith"] * 4))
+        self.assertEqual([r.rank for r in get_top_customers(year).rows], [1, 2])
+
+    def test_customer_timeseries(self):
+        from datetime import date
+        from internal.database.models.transaction import TransactionRollupModel, TransactionMonthlyRollupModel
+        from internal.database.helpers.transaction import (
+            replace_trxn_summaries,
+            replace_trxn_monthly,
+            get_customer_timeseries,
+            has_trxn_rollups,
+        )
+
+        first, second = self.customer_ids
+        year = 1700 + int(self.marker, 16) % 100
+        replace_trxn_monthly(year, "gtb", [
+            TransactionMonthlyRollupModel(customer_id=first, month=date(year, 2, 1), total_trxns=1, total_amount=10.0),
+            TransactionMonthlyRollupModel(customer_id=second, month=date(year, 1, 1), total_trxns=2, total_amount=30.0),
+        ])
+        replace_trxn_monthly(year, "zenith", [
+            TransactionMonthlyRollupModel(customer_id=first, month=date(year, 1, 1), total_trxns=9, total_amount=1.0),
+        ])
+        # Reloading a year and bank replaces its previous rollups
+        replace_trxn_monthly(year, "zenith", [
+            TransactionMonthlyRollupModel(customer_id=first, month=date(year, 1, 1), total_trxns=4, total_amount=25.0),
+        ])
+
+        result = get_customer_timeseries(first, year)
+        self.assertEqual(
+            [(r.bank, r.month, r.total_trxns, r.total_amount) for r in result.rows],
+            [("zenith", date(year, 1, 1), 4, 25.0), ("gtb", date(year, 2, 1), 1, 10.0)],
+        )
+        self.assertEqual(len(get_customer_timeseries(first, year, bank="gtb").rows), 1)
+        self.assertEqual(get_customer_timeseries(first, year + 1).rows, [])
+
+        # The monthly rollups alone are not enough for the backfill to skip the upload
+        replace_trxn_summaries(year, "gtb", [])
+        self.assertFalse(has_trxn_rollups(year, "gtb"))
+        replace_trxn_summaries(year, "gtb", [TransactionRollupModel(customer_id=first, total_trxns=1, total_amount=10.0)])
+        self.assertTrue(has_trxn_rollups(year, "gtb"))
+        self.assertFalse(has_trxn_rollups(year, "access"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+from unittest import TestCase, main, mock
+from tempfile import TemporaryDirectory
+from pathlib import Path
+from datetime import date, datetime
+import pandas as pd
+
+from internal.analytics.reports import *
+
+
+class TestReports(TestCase):
+    """Runs the reports over a fixture bucket directory laid out like the banks bucket."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = TemporaryDirectory()
+        cls.dataset = cls.tmp.name
+        Path(cls.dataset, "2024").mkdir()
+        pd.DataFrame({
+            "CUSTOMER_ID": [1, 1, 2, 3],
+            "TRXN_AMOUNT": [100.0, -40.0, 50.0, 10.0],
+            "TRXN_DATE": pd.to_datetime(["2024-01-05", "2024-01-20", "2024-02-01", "2024-03-09"]),
+        }).to_parquet(Path(cls.dataset, "2024", "gtb.parquet"), engine="fastparquet")
+        pd.DataFrame({
+            "CUSTOMER_ID": [1, 2],
+            "TRXN_AMOUNT": [25.0, 70.0],
+            "TRXN_DATE": pd.to_datetime(["2024-01-06", "2024-02-11"]),
+        }).to_parquet(Path(cls.dataset, "2024", "zenith.parquet"), engine="fastparquet")
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def test_customer_inflows(self):
+        result = customer_inflows(self.dataset, 2024)
+        self.assertEqual(
+            [(r.customer_id, r.banks, r.total_trxns, r.total_amount) for r in result.rows],
+            [(1, 2, 2, 125.0), (2, 2, 2, 120.0), (3, 1, 1, 10.0)],
+        )
+        self.assertFalse(result.truncated)
+
+        result = customer_inflows(self.dataset, 2024, bank="gtb", min_amount=20, limit=1)
+        self.assertEqual([r.customer_id for r in result.rows], [1])
+        self.assertTrue(result.truncated)
+
+    def test_bank_totals(self):
+        result = bank_totals(self.dataset, 2024)
+        self.assertEqual(
+            [(r.bank, r.customers, r.total_trxns, r.total_amount) for r in result.rows],
+            [("gtb", 3, 4, 120.0), ("zenith", 2, 2, 95.0)],
+        )
+
+    def test_monthly_totals(self):
+        result = monthly_totals(self.dataset, 2024, customer_id=1)
+        self.assertEqual([(r.month, r.total_trxns, r.total_amount) for r in result.rows], [(date(2024, 1, 1), 3, 85.0)])
+
+    def test_missing_year(self):
+        self.assertEqual(customer_inflows(self.dataset, 2023).rows, [])
+
+    def test_limits(self):
+        result = customer_inflows(self.dataset, 2024, limit=10**9)
+        self.assertEqual(result.limit, MAX_REPORT_ROWS)
+        with self.assertRaises(ValueError):
+            customer_inflows(self.dataset, 2024, bank="../2023/gtb")
+
+    def test_s3_setup_once_per_credentials(self):
+        import internal.analytics.reports as reports
+
+        connection = mock.Mock()
+        session = mock.Mock()
+        frozen = session.return_value.get_credentials.return_value.get_frozen_credentials
+        frozen.return_value = mock.Mock(access_key="first", secret_key="secret", token=None)
+        with mock.patch.object(reports, "_connection", connection), \
+                mock.patch.object(reports, "_s3_access_key", None), \
+                mock.patch.object(reports.boto3, "Session", session):
+            get_cursor("s3://banks")
+            get_cursor("s3://banks")
+            get_cursor(self.dataset)
+            frozen.return_value = mock.Mock(access_key="second", secret_key="secret", token="token")
+            get_cursor("s3://banks")
+
+        statements = [" ".join(c.args[0].split()) for c in connection.execute.call_args_list]
+        self.assertEqual(statements[0], "LOAD httpfs")
+        self.assertNotIn("INSTALL httpfs", statements)
+        self.assertEqual([s.split(",")[1].strip() for s in statements[1:]], ["KEY_ID 'first'", "KEY_ID 'second'"])
+        self.assertEqual(connection.cursor.call_count, 4)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+from unittest import TestCase, main, skipUnless, mock
+import os
+
+from internal.database.helpers.database import get_database_url
+from internal.database.instrumentation import statement_shape, track_statements, current_statement_stats
+
+
+class TestDatabaseUrl(TestCase):
+    def test_reader_url(self):
+        env = {
+            "DATABASE_USERNAME": "oysirs",
+            "DATABASE_PASSWORD": "secret",
+            "DATABASE_HOST": "writer.example.com",
+            "DATABASE_PORT": "5432",
+            "DATABASE_NAME": "oysirsdb",
+        }
+        with mock.patch.dict(os.environ, env):
+            self.assertEqual(get_database_url(reader=True), get_database_url())
+            with mock.patch.dict(os.environ, {"DATABASE_READER_HOST": "reader.example.com"}):
+                self.assertEqual(get_database_url(reader=True).host, "reader.example.com")
+                self.assertEqual(get_database_url().host, "writer.example.com")
+
+
+@skipUnless(get_database_url(), "DATABASE_* environment variables are not set")
+class TestSession(TestCase):
+    """Both engines point at the same database here, the reader only differs by its read-only transactions."""
+
+    def test_readonly_session(self):
+        from internal.database.session import get_session
+        import sqlalchemy as sa
+
+        with get_session(readonly=True) as session:
+            self.assertEqual(session.scalar(sa.text("SHOW transaction_read_only")), "on")
+        with get_session() as session:
+            self.assertEqual(session.scalar(sa.text("SHOW transaction_read_only")), "off")
+        with self.assertRaises(sa.exc.InternalError):
+            with get_session(readonly=True) as session:
+                session.execute(sa.text("CREATE TEMPORARY SEQUENCE readonly_session_test"))
+
+    def test_read_your_writes(self):
+        from internal.database.session import get_session, read_your_writes
+        import sqlalchemy as sa
+
+        with read_your_writes():
+            with get_session(readonly=True) as session:
+                self.assertEqual(session.scalar(sa.text("SHOW transaction_read_only")), "off")
+        with get_session(readonly=True) as session:
+            self.assertEqual(session.scalar(sa.text("SHOW transaction_read_only")), "on")
+
+
+class TestStatementShape(TestCase):
+    def test_parameters_are_collapsed(self):
+        self.assertEqual(
+            statement_shape("SELECT id FROM customers\n  WHERE id IN (%(id_1_1)s, %(id_1_2)s, %(id_1_3)s) AND kind = %(kind_1)s"),
+            "SELECT id FROM customers WHERE id IN (?) AND kind = ?",
+        )
+        self.assertEqual(statement_shape("SELECT * FROM t WHERE a = $1 AND b IN ($2, $3)"), "SELECT * FROM t WHERE a = ? AND b IN (?)")
+        self.assertEqual(
+            statement_shape("UPDATE t SET c = v.c FROM (VALUES (%(p1)s, %(p2)s), (%(p3)s, %(p4)s)) AS v"),
+            "UPDATE t SET c = v.c FROM (VALUES (?)) AS v",
+        )
+
+    def test_sampling(self):
+        with track_statements("unsampled", sample_rate=0) as stats:
+            self.assertIsNone(stats)
+            self.assertIsNone(current_statement_stats())
+        with track_statements("outer", sample_rate=1) as outer:
+            with track_statements("inner", sample_rate=1) as inner:
+                self.assertIs(inner, outer)
+        self.assertIsNone(current_statement_stats())
+
+
+@skipUnless(get_database_url(), "DATABASE_* environment variables are not set")
+class TestStatementTracking(TestCase):
+    def test_repeated_statements(self):
+        from internal.database.session import get_session
+        import internal.database.instrumentation as instrumentation
+        import sqlalchemy as sa
+
+        with mock.patch.object(instrumentation, "DATABASE_N_PLUS_ONE_THRESHOLD", 5):
+            with track_statements("test", sample_rate=1) as stats:
+                for idx in range(6):
+                    with get_session(readonly=True) as session:
+                        session.execute(sa.text("SELECT :idx"), {"idx": idx})
+                with self.assertRaises(sa.exc.ProgrammingError):
+                    with get_session(readonly=True) as session:
+                        session.execute(sa.text("SELECT * FROM missing_table"))
+            summary = stats.summary()
+            self.assertEqual(stats.repeated(), {"SELECT ?": 6})
+        self.assertGreaterEqual(summary["statements"], 6)
+        self.assertGreater(summary["db_time_ms"], 0)
+        self.assertLessEqual(len(summary["slowest"]), instrumentation.DATABASE_SLOWEST_STATEMENTS)
+
+        # Untracked statements are not recorded
+        with get_session(readonly=True) as session:
+            session.execute(sa.text("SELECT 1"))
+        self.assertEqual(stats.shapes["SELECT ?"], 6)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+from unittest import TestCase, main
+from tempfile import TemporaryDirectory
+from pathlib import Path
+import numpy as np
+
+from internal.analytics.sketches import *
+
+
+class TestSketches(TestCase):
+    """Merges sketches written to a fixture bucket directory laid out like the banks bucket."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = TemporaryDirectory()
+        cls.dataset = cls.tmp.name
+        uploads = {
+            (2023, "gtb"): (np.arange(0, 1000), np.arange(1, 1001, dtype=float)),
+            (2024, "gtb"): (np.arange(500, 1500), np.arange(1, 1001, dtype=float)),
+            (2024, "zenith"): (np.repeat(np.arange(1000, 2000), 2), np.append(np.full(1999, 5.0), np.nan)),
+        }
+        for (year, bank), (customer_ids, amounts) in uploads.items():
+            path = Path(cls.dataset, sketches_key(year, bank))
+            path.parent.mkdir(exist_ok=True)
+            path.write_bytes(build_sketches(customer_ids, amounts))
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def test_merge_banks(self):
+        result = merge_sketches(self.dataset, [2024])
+        self.assertEqual(result.banks, ["gtb", "zenith"])
+        # 500..1999 across both banks, customers in both are counted once
+        self.assertAlmostEqual(result.distinct_customers, 1500, delta=1500 * 0.05)
+        self.assertLessEqual(result.distinct_customers_lower, result.distinct_customers)
+        self.assertGreaterEqual(result.distinct_customers_upper, result.distinct_customers)
+        self.assertEqual(result.total_trxns, 2999)
+        self.assertEqual(result.missing, [])
+
+    def test_merge_years(self):
+        result = merge_sketches(self.dataset, [2023, 2024], banks=["gtb"], ranks=[0.5])
+        self.assertAlmostEqual(result.distinct_customers, 1500, delta=1500 * 0.05)
+        self.assertEqual(result.total_trxns, 2000)
+        self.assertAlmostEqual(result.amount_quantiles[0].amount, 500, delta=1000 * 0.02)
+
+    def test_missing_sketches(self):
+        result = merge_sketches(self.dataset, [2023], banks=["gtb", "zenith"])
+        self.assertEqual(result.missing, ["2023/zenith"])
+        self.assertEqual(merge_sketches(self.dataset, [2022]).total_trxns, 0)
+        self.assertEqual(merge_sketches(self.dataset, [2022]).amount_quantiles, [])
+
+    def test_invalid_input(self):
+        with self.assertRaises(ValueError):
+            merge_sketches(self.dataset, [2024], banks=["../gtb"])
+        with self.assertRaises(ValueError):
+            merge_sketches(self.dataset, [2024], ranks=[1.5])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+from unittest import TestCase, main, skipUnless, mock
+import json
+import uuid
+
+from internal.database.helpers.database import get_database_url
+from internal.database.slow_queries import redact_plan, _to_pyformat
+
+
+class TestRedaction(TestCase):
+    def test_redact_plan(self):
+        plan = {
+            "Plan": {
+                "Node Type": "Index Scan",
+                "Relation Name": "customer_identifiers",
+                "Index Name": "ix_customer_identifiers_kind_canonical",
+                "Index Cond": "((kind)::text = 'email'::text) AND (canonical = 'ada@example.com'::text)",
+                "Filter": "(customer_id > 42) AND (customers_2024.total >= -1.5)",
+                "Total Cost": 8.3,
+                "Plan Rows": 1,
+                "Plans": [{"Node Type": "Result", "Subplan Name": "SubPlan 1", "One-Time Filter": "($0 = 7)"}],
+            },
+        }
+        redacted = redact_plan(plan)["Plan"]
+        self.assertEqual(redacted["Index Cond"], "((kind)::text = '?'::text) AND (canonical = '?'::text)")
+        self.assertEqual(redacted["Filter"], "(customer_id > ?) AND (customers_2024.total >= ?)")
+        self.assertEqual(redacted["Plans"][0], {"Node Type": "Result", "Subplan Name": "SubPlan 1", "One-Time Filter": "($0 = ?)"})
+        self.assertEqual((redacted["Total Cost"], redacted["Plan Rows"]), (8.3, 1))
+        self.assertEqual(redacted["Relation Name"], "customer_identifiers")
+
+    def test_asyncpg_parameters(self):
+        self.assertEqual(
+            _to_pyformat("SELECT $2 FROM t WHERE a LIKE '%' || $1 AND b = $2", ("a", 2)),
+            ("SELECT %s FROM t WHERE a LIKE '%%' || %s AND b = %s", (2, "a", 2)),
+        )
+
+
+@skipUnless(get_database_url(), "DATABASE_* environment variables are not set")
+class TestSlowQueries(TestCase):
+    def test_record_slow_query(self):
+        from internal.database.helpers.customer import list_customers
+        from internal.database.helpers.slow_query import list_slow_queries
+        from internal.database.instrumentation import track_statements
+        import internal.database.instrumentation as instrumentation
+        import internal.database.slow_queries as slow_queries
+
+        email = f"{uuid.uuid4().hex}@example.com"
+        with mock.patch.object(instrumentation, "DATABASE_SLOW_QUERY_MS", 0.001), \
+                mock.patch.object(slow_queries, "DATABASE_SLOW_QUERY_SAMPLE_RATE", 1):
+            with track_statements("GET /customers", sample_rate=0):
+                list_customers(email=email)
+            # Wait for the background EXPLAIN
+            slow_queries._executor.submit(lambda: None).result()
+
+        queries = list_slow_queries(helper="internal.database.helpers.customer.list_customers", limit=1).queries
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(queries[0].scope, "GET /customers")
+        self.assertGreater(queries[0].duration_ms, 0)
+        self.assertIn("Plan", queries[0].plan)
+        self.assertNotIn(email, queries[0].statement + json.dumps(queries[0].plan))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+from unittest import TestCase, main, mock
+from tempfile import TemporaryDirectory
+from pathlib import Path
+from datetime import datetime
+import time
+import pyarrow as pa
+import pyarrow.fs as pafs
+import pyarrow.parquet as pq
+
+import internal.storage.transactions as transactions
+from internal.storage.transactions import *
+
+
+def write_transactions(path: Path, customer_ids: list[int], row_group_size: int) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    pq.write_table(
+        pa.table({
+            "CUSTOMER_ID": customer_ids,
+            "TRXN_AMOUNT": [float(idx) for idx in range(len(customer_ids))],
+            "TRXN_DATE": [datetime(2024, 1, 1 + idx % 28) for idx in range(len(customer_ids))],
+        }),
+        path,
+        row_group_size=row_group_size,
+    )
+
+
+class TestTransactionReader(TestCase):
+    def setUp(self):
+        self.tmp = TemporaryDirectory()
+        self.bucket = self.tmp.name
+        self.filesystem = pafs.LocalFileSystem()
+        # Customer IDs are sorted, as written by the banks raw processor
+        write_transactions(Path(self.bucket, "2024", "gtb.parquet"), [1, 1, 2, 3, 3, 3, 4, 5], row_group_size=2)
+        write_transactions(Path(self.bucket, "2024", "zenith.parquet"), [3, 6], row_group_size=1)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_select_row_groups(self):
+        metadata = pq.ParquetFile(Path(self.bucket, "2024", "gtb.parquet")).metadata
+        self.assertEqual(select_row_groups(metadata, "CUSTOMER_ID", 1), [0])
+        self.assertEqual(select_row_groups(metadata, "CUSTOMER_ID", 3), [1, 2])
+        self.assertEqual(select_row_groups(metadata, "CUSTOMER_ID", 9), [])
+
+    def test_read_customer_transactions(self):
+        table = read_customer_transactions(self.bucket, 2024, "gtb", 3, self.filesystem)
+        self.assertEqual(table["CUSTOMER_ID"].to_pylist(), [3, 3, 3])
+        self.assertEqual(table["TRXN_AMOUNT"].to_pylist(), [3.0, 4.0, 5.0])
+
+    def test_read_missing_file(self):
+        table = read_customer_transactions(self.bucket, 2024, "access", 3, self.filesystem)
+        self.assertEqual(table.num_rows, 0)
+
+    def test_list_transaction_banks(self):
+        self.assertEqual(list_transaction_banks(self.bucket, 2024, self.filesystem), ["gtb", "zenith"])
+        self.assertEqual(list_transaction_banks(self.bucket, 2023, self.filesystem), [])
+
+    def test_list_transaction_files(self):
+        Path(self.bucket, "2024", "gtb.sketches").write_bytes(b"")
+        write_transactions(Path(self.bucket, "2023", "gtb.parquet"), [1], row_group_size=1)
+        self.assertEqual(
+            list_transaction_files(self.bucket, self.filesystem),
+            [(2023, "gtb"), (2024, "gtb"), (2024, "zenith")],
+        )
+
+    def test_transaction_rollups(self):
+        df = read_transactions(self.bucket, 2024, "zenith", self.filesystem)
+        self.assertEqual(
+            [(r.customer_id, r.total_trxns, r.total_amount) for r in transaction_rollups(df)],
+            [(3, 1, 0.0), (6, 1, 1.0)],
+        )
+        df = read_transactions(self.bucket, 2024, "gtb", self.filesystem)
+        self.assertEqual(
+            [(r.customer_id, r.total_trxns, r.total_amount) for r in transaction_rollups(df)],
+            [(1, 2, 1.0), (2, 1, 2.0), (3, 3, 12.0), (4, 1, 6.0), (5, 1, 7.0)],
+        )
+        monthly = transaction_monthly_rollups(df.assign(TRXN_DATE=df["TRXN_DATE"].where(df["CUSTOMER_ID"] != 5)))
+        self.assertEqual(
+            [(r.customer_id, r.month.isoformat(), r.total_trxns) for r in monthly],
+            [(1, "2024-01-01", 2), (2, "2024-01-01", 1), (3, "2024-01-01", 3), (4, "2024-01-01", 1)],
+        )
+
+    def test_list_customer_transactions(self):
+        result = list_customer_transactions(self.bucket, 3, 2024, offset=1, limit=3, filesystem=self.filesystem)
+        self.assertEqual(result.total, 4)
+        self.assertEqual([t.bank for t in result.transactions], ["gtb", "gtb", "zenith"])
+        self.assertEqual([t.trxn_amount for t in result.transactions], [4.0, 5.0, 0.0])
+
+        result = list_customer_transactions(self.bucket, 3, 2024, bank="zenith", filesystem=self.filesystem)
+        self.assertEqual(result.total, 1)
+
+    def test_list_customer_transactions_known_banks(self):
+        with mock.patch.object(transactions, "list_transaction_banks") as list_banks:
+            result = list_customer_transactions(self.bucket, 3, 2024, filesystem=self.filesystem, banks=["zenith"])
+            self.assertEqual(result.total, 1)
+            result = list_customer_transactions(self.bucket, 3, 2024, filesystem=self.filesystem, banks=[])
+            self.assertEqual(result.total, 0)
+        list_banks.assert_not_called()
+
+    def test_list_customer_transactions_partial_results(self):
+        Path(self.bucket, "2024", "access.parquet").write_bytes(b"not a parquet file")
+        read = transactions.read_customer_transactions
+
+        def slow_read(bucket, year, bank, customer_id, *args):
+            if bank == "zenith":
+                time.sleep(1)
+            return read(bucket, year, bank, customer_id, *args)
+
+        with mock.patch.object(transactions, "read_customer_transactions", slow_read):
+            tables, failed_banks = read_banks_customer_transactions(
+                self.bucket, 2024, ["access", "gtb", "zenith"], 3, self.filesystem, timeout=0.5
+            )
+        self.assertEqual(list(tables), ["gtb"])
+        self.assertEqual(failed_banks, ["access", "zenith"])
+
+        result = list_customer_transactions(self.bucket, 3, 2024, filesystem=self.filesystem)
+        self.assertEqual(result.total, 4)
+        self.assertEqual(result.failed_banks, ["access"])
+
+
+if __name__ == "__main__":
+    main()
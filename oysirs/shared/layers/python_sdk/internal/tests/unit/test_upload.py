@@ -0,0 +1,104 @@
+from unittest import TestCase, main, skipUnless
+import threading
+import time
+import uuid
+
+from internal.database.helpers.database import get_database_url
+
+
+@skipUnless(get_database_url(), "DATABASE_* environment variables are not set")
+class TestUploads(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        from internal.database.session import engine
+        from internal.database.schemas.base import Base
+
+        Base.metadata.create_all(engine)
+        cls.bank = f"bank-{uuid.uuid4().hex[:12]}"
+
+    def test_uploads_version(self):
+        from internal.database.models.upload import UploadModel, UploadStatus
+        from internal.database.helpers.upload import insert_or_update_upload, get_uploads_version
+
+        insert_or_update_upload(UploadModel(year=2024, bank=self.bank, status=UploadStatus.PENDING, progress=0))
+        version = get_uploads_version()
+        year_version = get_uploads_version(years=[2024])
+        other_year_version = get_uploads_version(years=[1999])
+        self.assertEqual(get_uploads_version(), version)
+
+        # Progress updates go through ON CONFLICT DO UPDATE and must change the version
+        insert_or_update_upload(UploadModel(year=2024, bank=self.bank, status=UploadStatus.IN_PROGRESS, progress=50))
+        self.assertNotEqual(get_uploads_version(), version)
+        self.assertNotEqual(get_uploads_version(years=[2024]), year_version)
+        self.assertEqual(get_uploads_version(years=[1999]), other_year_version)
+
+    def test_list_uploads(self):
+        from internal.database.models.upload import UploadModel, UploadStatus
+        from internal.database.helpers.upload import insert_or_update_upload, list_uploads
+
+        bank = f"{self.bank}-list"
+        for year, status in [(2019, UploadStatus.COMPLETED), (2020, UploadStatus.FAILED), (2021, UploadStatus.COMPLETED)]:
+            insert_or_update_upload(UploadModel(year=year, bank=bank, status=status, progress=100))
+
+        first = list_uploads(bank=bank, limit=2)
+        self.assertEqual(first.total, 3)
+        self.assertEqual([u.year for u in first.uploads], [2021, 2020])
+        second = list_uploads(bank=bank, cursor=first.next_cursor, limit=2)
+        self.assertEqual([u.year for u in second.uploads], [2019])
+        self.assertIsNone(second.next_cursor)
+
+        completed = list_uploads(bank=bank, status=UploadStatus.COMPLETED)
+        self.assertEqual(([u.year for u in completed.uploads], completed.total), ([2021, 2019], 2))
+        # Without a limit, all the uploads are listed in one page
+        everything = list_uploads(bank=bank)
+        self.assertEqual(([u.year for u in everything.uploads], everything.limit), ([2021, 2020, 2019], 3))
+        self.assertIsNone(everything.next_cursor)
+        self.assertNotIn("offset", everything.model_dump())
+        self.assertEqual(list_uploads(bank=bank, year=2020).total, 1)
+        with self.assertRaises(ValueError):
+            list_uploads(cursor="not a cursor")
+
+    def test_upload_events(self):
+        from internal.database.models.upload import UploadModel, UploadStatus
+        from internal.database.helpers.upload import insert_or_update_upload, list_upload_events
+
+        last_seq = self.latest_seq()
+        insert_or_update_upload(UploadModel(year=2023, bank=self.bank, status=UploadStatus.PENDING, progress=0))
+        insert_or_update_upload(UploadModel(year=2023, bank=self.bank, status=UploadStatus.IN_PROGRESS, progress=10))
+
+        events = list_upload_events(since=last_seq)
+        self.assertEqual([(e.status, e.progress) for e in events.events], [(UploadStatus.PENDING, 0), (UploadStatus.IN_PROGRESS, 10)])
+        self.assertEqual(events.last_seq, events.events[-1].id)
+        self.assertEqual(list_upload_events(since=events.last_seq).events, [])
+        self.assertEqual(list_upload_events(since=events.last_seq).last_seq, events.last_seq)
+        self.assertEqual(len(list_upload_events(since=last_seq, limit=1).events), 1)
+
+    def test_wait_for_upload_events(self):
+        from internal.database.models.upload import UploadModel, UploadStatus
+        from internal.database.helpers.upload import insert_or_update_upload, wait_for_upload_events
+
+        last_seq = self.latest_seq()
+        start = time.monotonic()
+        self.assertEqual(wait_for_upload_events(since=last_seq, timeout=0.3).events, [])
+        self.assertGreaterEqual(time.monotonic() - start, 0.3)
+
+        upload = UploadModel(year=2022, bank=self.bank, status=UploadStatus.IN_PROGRESS, progress=30)
+        timer = threading.Timer(0.2, insert_or_update_upload, [upload])
+        timer.start()
+        start = time.monotonic()
+        events = wait_for_upload_events(since=last_seq, timeout=10)
+        timer.join()
+        self.assertLess(time.monotonic() - start, 5)
+        self.assertEqual([(e.year, e.bank, e.progress) for e in events.events], [(2022, self.bank, 30)])
+
+    def latest_seq(self) -> int:
+        from internal.database.helpers.upload import list_upload_events
+
+        seq = 0
+        while (events := list_upload_events(since=seq, limit=1000)).events:
+            seq = events.last_seq
+        return seq
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+from unittest import TestCase, main, mock
+from cryptography.hazmat.primitives.asymmetric import rsa
+import json
+import time
+import jwt
+
+import internal.database.helpers.user as user
+from internal.database.models.user import UserGroup
+
+
+def generate_key(kid: str) -> tuple[rsa.RSAPrivateKey, dict]:
+    """
+    Generate an RSA signing key and its public JWK.
+    """
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    jwk = json.loads(jwt.algorithms.RSAAlgorithm.to_jwk(private_key.public_key()))
+    return private_key, {**jwk, "kid": kid, "alg": "RS256", "use": "sig"}
+
+
+def sign(private_key: rsa.RSAPrivateKey, kid: str, **claims) -> str:
+    claims = {
+        "sub": "sub-1",
+        "iss": user.issuer,
+        "token_use": "access",
+        "client_id": user.user_pool_client_id,
+        "exp": int(time.time()) + 3600,
+        "cognito:groups": ["staff"],
+        **claims,
+    }
+    return jwt.encode(claims, private_key, algorithm="RS256", headers={"kid": kid})
+
+
+class TestGetUser(TestCase):
+    """Verifies tokens signed with locally generated keys, Cognito is never called for the keys."""
+
+    def setUp(self):
+        self.key, self.jwk = generate_key("key-1")
+        self.jwks = {"keys": [self.jwk]}
+        jwks_client = jwt.PyJWKClient("https://example.invalid/jwks.json", cache_keys=True, cooldown_duration=0)
+        self.fetch_data = mock.Mock(side_effect=lambda: self.jwks)
+        self.cognito_client = mock.Mock()
+        self.cognito_client.get_user.return_value = {
+            "Username": "ada",
+            "UserAttributes": [
+                {"Name": "sub", "Value": "sub-1"},
+                {"Name": "email", "Value": "ada@example.com"},
+                {"Name": "given_name", "Value": "Ada"},
+                {"Name": "gender", "Value": "female"},
+            ],
+        }
+        self.patches = [
+            mock.patch.object(jwks_client, "fetch_data", self.fetch_data),
+            mock.patch.object(user, "jwks_client", jwks_client),
+            mock.patch.object(user, "cognito_client", self.cognito_client),
+            mock.patch.object(user, "_user_cache", {}),
+        ]
+        for patch in self.patches:
+            patch.start()
+
+    def tearDown(self):
+        for patch in reversed(self.patches):
+            patch.stop()
+
+    def test_get_user(self):
+        token = sign(self.key, "key-1", **{"cognito:groups": ["staff", "superuser"]})
+        result = user.get_user(token)
+        self.assertEqual(result.username, "ada")
+        self.assertEqual(result.groups, [UserGroup.STAFF, UserGroup.SUPERUSER])
+        self.cognito_client.admin_list_groups_for_user.assert_not_called()
+
+    def test_get_user_cached(self):
+        token = sign(self.key, "key-1")
+        self.assertEqual(user.get_user(token), user.get_user(token))
+        self.assertEqual(self.cognito_client.get_user.call_count, 1)
+        self.assertEqual(self.fetch_data.call_count, 1)
+
+        with mock.patch.object(user, "USER_CACHE_TTL", 0), mock.patch.object(user, "_user_cache", {}):
+            user.get_user(token)
+            user.get_user(token)
+        self.assertEqual(self.cognito_client.get_user.call_count, 3)
+
+    def test_key_rotation(self):
+        user.get_user(sign(self.key, "key-1"))
+        rotated_key, rotated_jwk = generate_key("key-2")
+        self.jwks = {"keys": [self.jwk, rotated_jwk]}
+
+        self.assertIsNotNone(user.get_user(sign(rotated_key, "key-2")))
+        self.assertEqual(self.fetch_data.call_count, 2)
+        self.assertIsNotNone(user.get_user(sign(self.key, "key-1")))
+        self.assertEqual(self.fetch_data.call_count, 2)
+
+    def test_invalid_tokens(self):
+        other_key, _ = generate_key("key-1")
+        self.assertIsNone(user.get_user(sign(other_key, "key-1")))
+        self.assertIsNone(user.get_user(sign(self.key, "key-1", exp=int(time.time()) - 60)))
+        self.assertIsNone(user.get_user(sign(self.key, "key-1", iss="https://example.invalid")))
+        self.assertIsNone(user.get_user(sign(self.key, "key-1", token_use="id")))
+        self.assertIsNone(user.get_user("not a token"))
+        self.cognito_client.get_user.assert_not_called()
+
+
+if __name__ == "__main__":
+    main()
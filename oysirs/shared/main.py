@@ -1,6 +1,7 @@
 from aws_cdk import (
     aws_ec2 as ec2,
     aws_lambda as _lambda,
+    aws_ecr_assets as ecr_assets,
     Aws,
     RemovalPolicy,
     ILocalBundling
@@ -28,6 +29,13 @@ class Shared(Construct):
             "POWERTOOLS_TRACE_DISABLED": "true",
             "POWERTOOLS_LOGGER_LOG_EVENT": "true",
             "POWERTOOLS_SERVICE_NAME": "the-law-service",
+            # Redis-protocol endpoint of the cache shared by the API containers and
+            # invalidated by the processor, nothing is cached without it
+            "CACHE_URL": os.getenv("CACHE_URL", ""),
+            # Share of the requests and ingest chunks whose SQL statements are counted and logged
+            "DATABASE_STATEMENT_SAMPLE_RATE": os.getenv("DATABASE_STATEMENT_SAMPLE_RATE", "0.1"),
+            # Statements slower than this are explained and listed at GET /admin/slow-queries, 0 disables it
+            "DATABASE_SLOW_QUERY_MS": os.getenv("DATABASE_SLOW_QUERY_MS", "0"),
         }
         self.removal_policy = RemovalPolicy.DESTROY
         # self.vpc = ec2.Vpc(
@@ -68,6 +76,31 @@ class Shared(Construct):
             )
         ).layer
 
+    def analytics_image_code(self, function_dir: str) -> _lambda.DockerImageCode:
+        """
+        Get the container image of a Lambda function importing the analytics
+        requirements (pyarrow, duckdb, datasketches). With them, the layers
+        exceed the 250 MB unzipped limit of Lambda, while images can be 10 GB.
+
+        Args:
+            function_dir (str): The directory of the function, from the project root.
+        Returns:
+            _lambda.DockerImageCode: The image, with the requirements of the
+                common and analytics layers, the internal package and Powertools.
+        """
+        return _lambda.DockerImageCode.from_image_asset(
+            directory=str(Path(__file__).parent.parent.parent.resolve()),
+            file="oysirs/shared/layers/analytics/Dockerfile",
+            build_args={"FUNCTION_DIR": function_dir},
+            platform=ecr_assets.Platform.LINUX_AMD64,
+            exclude=[
+                # Everything but the function and the layers
+                "*",
+                f"!{function_dir}/**",
+                "!oysirs/shared/layers/**",
+            ],
+        )
+
 
 # TODO: Improve generalization, error handling and logging
 @jsii.implements(ILocalBundling)
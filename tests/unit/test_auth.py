@@ -0,0 +1,38 @@
+import sys
+from pathlib import Path
+
+import pytest
+from aws_lambda_powertools.event_handler.exceptions import ForbiddenError
+from aws_lambda_powertools.utilities.data_classes import APIGatewayProxyEvent
+
+sys.path.insert(0, str(Path(__file__).parents[2] / "oysirs/api/functions/rest_handler"))
+sys.path.insert(0, str(Path(__file__).parents[2] / "oysirs/shared/layers/python_sdk/internal/src"))
+
+from internal.database.models.user import UserGroup
+from utils.auth import get_groups, require_group
+
+
+def request(claims: dict | None) -> APIGatewayProxyEvent:
+    return APIGatewayProxyEvent({
+        "headers": {},
+        "httpMethod": "GET",
+        "path": "/admin/slow-queries",
+        "requestContext": {"authorizer": {"claims": claims}},
+    })
+
+
+def test_get_groups():
+    assert get_groups(request({"cognito:groups": "[staff superuser]"})) == {"staff", "superuser"}
+    assert get_groups(request({"cognito:groups": "staff,superuser"})) == {"staff", "superuser"}
+    assert get_groups(request({"cognito:groups": "superuser"})) == {"superuser"}
+    assert get_groups(request({"cognito:groups": ["staff"]})) == {"staff"}
+    assert get_groups(request({"sub": "sub-1"})) == set()
+    assert get_groups(request(None)) == set()
+
+
+def test_require_group():
+    require_group(request({"cognito:groups": "[staff superuser]"}), UserGroup.SUPERUSER)
+    with pytest.raises(ForbiddenError):
+        require_group(request({"cognito:groups": "[staff]"}), UserGroup.SUPERUSER)
+    with pytest.raises(ForbiddenError):
+        require_group(request({"cognito:groups": "[superusers]"}), UserGroup.SUPERUSER)
@@ -0,0 +1,99 @@
+import io
+import sys
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+from botocore.exceptions import ClientError
+
+sys.path.insert(0, str(Path(__file__).parents[2] / "oysirs/api/functions/rest_handler"))
+
+from utils.dataset_cache import DatasetCache
+
+
+class FakeS3Client:
+    """In-memory stand-in for the few S3 calls the cache makes."""
+
+    def __init__(self):
+        self.objects = {}
+        self.get_calls = 0
+
+    def put(self, key, table):
+        body = io.BytesIO()
+        pq.write_table(table, body)
+        self.objects[key] = (body.getvalue(), f'"{len(self.objects)}-{key}-{table.num_rows}"')
+
+    def head_object(self, Bucket, Key):
+        if Key not in self.objects:
+            raise ClientError({"Error": {"Code": "404"}}, "HeadObject")
+        body, etag = self.objects[Key]
+        return {"ContentLength": len(body), "ETag": etag}
+
+    def get_object(self, Bucket, Key, IfMatch):
+        self.get_calls += 1
+        body, etag = self.objects[Key]
+        assert IfMatch == etag
+        return {"Body": io.BytesIO(body)}
+
+
+def make_cache(tmp_path, s3_client, **kwargs):
+    return DatasetCache(
+        s3_client,
+        directory=str(tmp_path),
+        max_memory_bytes=kwargs.get("max_memory_bytes", 1024 * 1024),
+        max_disk_bytes=kwargs.get("max_disk_bytes", 1024 * 1024),
+        max_object_bytes=kwargs.get("max_object_bytes", 1024 * 1024),
+    )
+
+
+def test_memory_and_disk_tiers(tmp_path):
+    s3_client = FakeS3Client()
+    s3_client.put("2024/gtb.parquet", pa.table({"CUSTOMER_ID": [1, 2], "TRXN_AMOUNT": [1.0, 2.0]}))
+    cache = make_cache(tmp_path, s3_client)
+
+    table = cache.get_table("banks", "2024/gtb.parquet", ["CUSTOMER_ID"])
+    assert table.column_names == ["CUSTOMER_ID"]
+    assert cache.get_table("banks", "2024/gtb.parquet", ["CUSTOMER_ID"]).equals(table)
+    assert s3_client.get_calls == 1
+
+    # A cold container only has the disk tier
+    cold_cache = make_cache(tmp_path, s3_client)
+    assert cold_cache.get_table("banks", "2024/gtb.parquet", ["CUSTOMER_ID"]).equals(table)
+    assert s3_client.get_calls == 1
+    assert cache.stats()["misses"] == 1 and cache.stats()["memory_hits"] == 1
+    assert cold_cache.stats()["disk_hits"] == 1
+
+
+def test_etag_change_invalidates(tmp_path):
+    s3_client = FakeS3Client()
+    s3_client.put("2024/gtb.parquet", pa.table({"CUSTOMER_ID": [1]}))
+    cache = make_cache(tmp_path, s3_client)
+    cache.get_table("banks", "2024/gtb.parquet", ["CUSTOMER_ID"])
+
+    s3_client.put("2024/gtb.parquet", pa.table({"CUSTOMER_ID": [1, 2, 3]}))
+    assert cache.get_table("banks", "2024/gtb.parquet", ["CUSTOMER_ID"]).num_rows == 3
+    assert cache.stats()["misses"] == 2
+
+
+def test_large_and_missing_objects(tmp_path):
+    s3_client = FakeS3Client()
+    s3_client.put("2024/gtb.parquet", pa.table({"CUSTOMER_ID": list(range(1000))}))
+    cache = make_cache(tmp_path, s3_client, max_object_bytes=10)
+
+    assert cache.get_table("banks", "2024/gtb.parquet", ["CUSTOMER_ID"]) is None
+    assert cache.stats()["bypasses"] == 1
+    with pytest.raises(FileNotFoundError):
+        cache.get_table("banks", "2024/zenith.parquet", ["CUSTOMER_ID"])
+
+
+def test_memory_and_disk_bounds(tmp_path):
+    s3_client = FakeS3Client()
+    for bank in ("access", "gtb", "zenith"):
+        s3_client.put(f"2024/{bank}.parquet", pa.table({"CUSTOMER_ID": list(range(100))}))
+    cache = make_cache(tmp_path, s3_client, max_memory_bytes=1000, max_disk_bytes=3000)
+
+    for bank in ("access", "gtb", "zenith"):
+        cache.get_table("banks", f"2024/{bank}.parquet", ["CUSTOMER_ID"])
+    assert cache.stats()["memory_bytes"] <= 1000
+    assert sum(f.stat().st_size for f in tmp_path.glob("*.arrow")) <= 3000
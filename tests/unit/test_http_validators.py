@@ -0,0 +1,35 @@
+import sys
+from pathlib import Path
+
+from aws_lambda_powertools.utilities.data_classes import APIGatewayProxyEvent
+
+sys.path.insert(0, str(Path(__file__).parents[2] / "oysirs/api/functions/rest_handler"))
+
+from utils.http import make_etag, not_modified
+
+
+def request(headers: dict) -> APIGatewayProxyEvent:
+    return APIGatewayProxyEvent({"headers": headers, "httpMethod": "GET", "path": "/uploads"})
+
+
+def test_make_etag():
+    assert make_etag("uploads", "1:2024") == make_etag("uploads", "1:2024")
+    assert make_etag("uploads", "1:2024") != make_etag("uploads", "2:2024")
+    assert make_etag("uploads", "1:2024").startswith('"')
+
+
+def test_not_modified():
+    etag = make_etag("uploads", "1:2024")
+    response = not_modified(request({"if-none-match": etag}), etag, "private, no-cache")
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+    assert response.headers["Cache-Control"] == "private, no-cache"
+
+    assert not_modified(request({"If-None-Match": f'"other", W/{etag}'}), etag, "no-cache") is not None
+    assert not_modified(request({"If-None-Match": "*"}), etag, "no-cache") is not None
+
+
+def test_modified():
+    etag = make_etag("uploads", "1:2024")
+    assert not_modified(request({}), etag, "no-cache") is None
+    assert not_modified(request({"If-None-Match": '"other"'}), etag, "no-cache") is None
@@ -1,8 +1,14 @@
 import aws_cdk as core
 import aws_cdk.assertions as assertions
+from pathlib import Path
 
 from oysirs.oysirs_stack import OysirsStack
 
+# Unzipped size limit of a Lambda function with all its layers
+LAMBDA_UNZIPPED_LIMIT = 250 * 2**20
+# Kept for the Powertools layer, referenced by ARN and not bundled here
+POWERTOOLS_LAYER_SIZE = 30 * 2**20
+
 # example tests. To run these tests, uncomment this file along with the example
 # resource in oysirs/oysirs_stack.py
 def test_sqs_queue_created():
@@ -13,3 +19,34 @@ def test_sqs_queue_created():
 #     template.has_resource_properties("AWS::SQS::Queue", {
 #         "VisibilityTimeout": 300
 #     })
+
+
+def asset_size(path: Path) -> int:
+    if path.is_file():
+        return path.stat().st_size
+    return sum(file.stat().st_size for file in path.rglob("*") if file.is_file())
+
+
+def test_lambda_layers_size():
+    app = core.App(context={"aws:cdk:enable-asset-metadata": True})
+    stack = OysirsStack(app, "oysirs", env=core.Environment(account="123456789012", region="us-east-1"))
+    assembly = app.synth()
+    resources = assembly.get_stack_artifact(stack.artifact_id).template["Resources"]
+
+    def bundled_size(logical_id: str) -> int:
+        asset_path = resources[logical_id].get("Metadata", {}).get("aws:asset:path")
+        return asset_size(Path(assembly.directory, asset_path)) if asset_path else 0
+
+    functions = {
+        logical_id: resource
+        for logical_id, resource in resources.items()
+        if resource["Type"] == "AWS::Lambda::Function" and "ImageUri" not in resource["Properties"]["Code"]
+    }
+    assert functions
+    for logical_id, resource in functions.items():
+        layers = resource["Properties"].get("Layers", [])
+        size = bundled_size(logical_id) + sum(
+            bundled_size(layer["Ref"]) if isinstance(layer, dict) and "Ref" in layer else POWERTOOLS_LAYER_SIZE
+            for layer in layers
+        )
+        assert size < LAMBDA_UNZIPPED_LIMIT, f"{logical_id} and its layers take {size / 2**20:.0f} MB unzipped"
@@ -0,0 +1,57 @@
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).parents[2]
+HANDLER_DIR = ROOT / "oysirs/api/functions/rest_handler"
+INTERNAL_SRC = ROOT / "oysirs/shared/layers/python_sdk/internal/src"
+
+# Cold import budget of the REST handler module, in milliseconds
+IMPORT_BUDGET_MS = float(os.getenv("REST_HANDLER_IMPORT_BUDGET_MS", "1000"))
+# Dependencies only some routes need, they must be imported on first use
+LAZY_MODULES = {"sqlalchemy", "psycopg2", "asyncpg", "redis", "pyarrow", "pandas", "duckdb", "datasketches", "boto3"}
+
+IMPORT_TIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)")
+
+
+def import_handler() -> dict[str, int]:
+    """
+    Import the handler in a fresh interpreter with -X importtime.
+
+    Returns:
+        dict[str, int]: The cumulative import time in microseconds of each imported module.
+    """
+    env = {
+        **os.environ,
+        "PYTHONPATH": os.pathsep.join(filter(None, [str(INTERNAL_SRC), os.getenv("PYTHONPATH")])),
+        "AWS_REGION": os.getenv("AWS_REGION", "af-south-1"),
+    }
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=HANDLER_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    modules = {}
+    for line in result.stderr.splitlines():
+        match = IMPORT_TIME_LINE.match(line)
+        if match:
+            modules[match.group(4)] = int(match.group(2))
+    return modules
+
+
+def test_heavy_dependencies_are_lazy():
+    modules = import_handler()
+    assert "main" in modules
+    loaded = {name for name in modules if name.split(".")[0] in LAZY_MODULES}
+    assert not loaded, f"Imported at cold start: {sorted(loaded)}"
+
+
+def test_cold_import_budget():
+    # The best of a few runs, to leave out the noise of a busy machine
+    import_ms = min(import_handler()["main"] for _ in range(3)) / 1000
+    assert import_ms <= IMPORT_BUDGET_MS, f"Cold import took {import_ms:.0f} ms, budget is {IMPORT_BUDGET_MS:.0f} ms"